@@ -0,0 +1,71 @@
+"""
+Gunicorn serving profiles; picked up automatically by `gunicorn` run from
+this directory (or pass -c gunicorn.conf.py).
+
+SERVE_PROFILE selects the worker model:
+
+sync      seatingbackend.wsgi, one request per worker process (default)
+gthread   seatingbackend.wsgi, GUNICORN_THREADS requests per process
+uvicorn   seatingbackend.asgi on uvicorn workers (async views, see asgi.py)
+
+Every setting can be overridden from the environment:
+PORT, WEB_CONCURRENCY / GUNICORN_WORKERS, GUNICORN_THREADS,
+GUNICORN_TIMEOUT, GUNICORN_GRACEFUL_TIMEOUT, GUNICORN_KEEPALIVE,
+GUNICORN_MAX_REQUESTS, GUNICORN_PRELOAD (1/0). Database connection reuse
+is configured in settings.py (DB_CONN_MAX_AGE, DB_CONN_HEALTH_CHECKS);
+each worker thread holds at most one connection, so Postgres sees up to
+workers x threads of them.
+`manage.py loadtest_profiles` compares the profiles locally.
+"""
+import multiprocessing
+import os
+
+PROFILES = {
+    # worker class, workers per CPU (+1), threads
+    "sync": ("sync", 2, 1),
+    "gthread": ("gthread", 1, 4),
+    "uvicorn": ("uvicorn_worker.UvicornWorker", 1, 1),
+}
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+profile = os.environ.get("SERVE_PROFILE", "sync")
+if profile not in PROFILES:
+    raise RuntimeError(f"SERVE_PROFILE must be one of: {', '.join(PROFILES)}")
+worker_class, per_cpu, default_threads = PROFILES[profile]
+cpus = multiprocessing.cpu_count()
+
+wsgi_app = "seatingbackend.asgi:application" if profile == "uvicorn" else "seatingbackend.wsgi:application"
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = _env_int("GUNICORN_WORKERS", _env_int("WEB_CONCURRENCY", per_cpu * cpus + 1))
+threads = _env_int("GUNICORN_THREADS", default_threads)
+# generation and uploads run inside the request unless posted with async=1
+# (then run_seating_worker does them); large synchronous runs need a higher timeout
+timeout = _env_int("GUNICORN_TIMEOUT", 60)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 2000)   # recycle workers to bound memory growth
+max_requests_jitter = max_requests // 10
+
+# load the app once in the master and fork (see seatingbackend/wsgi.py)
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+if preload_app:
+    os.environ.setdefault("SEATING_PRELOAD_IMPORTS", "1")
+if profile == "uvicorn":
+    # Django advises against persistent connections under ASGI (they are
+    # not closed reliably outside the request cycle)
+    os.environ.setdefault("DB_CONN_MAX_AGE", "0")
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # never share a database socket opened in the preloading master with the workers
+    if server.cfg.preload_app:
+        from django.db import connections
+        connections.close_all()
@@ -1,23 +1,78 @@
 from django.contrib import admin
-from .models import UploadedFile, Student, TimetableRow, Room, Seating
+from .models import UploadedFile, Student, TimetableRow, Room, RoomUnavailability, Seating, SeatingVersion, Job, RoomSeating, SeatAssignment, SeatingSummary, RosterVersion, ExamSession
+from .services.roster import bump_roster_version
 
 @admin.register(UploadedFile)
 class UploadedFileAdmin(admin.ModelAdmin):
-    list_display = ('file','description','uploaded_at')
+    list_display = ('file','kind','description','uploaded_at')
 
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
     list_display = ('roll','year','uploaded_file')
 
+    # keep the generator's roster cache in step with edits made here
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        bump_roster_version(*{obj.year, form.initial.get('year', obj.year)})   # old and new year
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump_roster_version(obj.year)
+
+    def delete_queryset(self, request, queryset):
+        years = set(queryset.values_list('year', flat=True))
+        super().delete_queryset(request, queryset)
+        bump_roster_version(*years)
+
 @admin.register(TimetableRow)
 class TimetableRowAdmin(admin.ModelAdmin):
     list_display = ('date','i_year_subject','ii_year_subject','iii_year_subject')
 
+@admin.register(ExamSession)
+class ExamSessionAdmin(admin.ModelAdmin):
+    list_display = ('date','session','year','subject')
+    list_filter = ('session','year')
+
 @admin.register(Room)
 class RoomAdmin(admin.ModelAdmin):
-    list_display = ('code','capacity')
+    list_display = ('code','capacity','columns','is_active')
+    list_filter = ('is_active',)
+
+@admin.register(RoomUnavailability)
+class RoomUnavailabilityAdmin(admin.ModelAdmin):
+    list_display = ('room','start_date','end_date','reason')
+    list_filter = ('room',)
 
 @admin.register(Seating)
 class SeatingAdmin(admin.ModelAdmin):
-    list_display = ('roll','year','room','exam_date','row_index','col_index')
-    list_filter = ('exam_date','room')
+    list_display = ('roll','year','room','exam_date','session','row_index','col_index')
+    list_filter = ('exam_date','session','room')
+
+@admin.register(RoomSeating)
+class RoomSeatingAdmin(admin.ModelAdmin):
+    list_display = ('room','exam_date','session','rows','columns')
+    list_filter = ('exam_date','session')
+
+@admin.register(SeatAssignment)
+class SeatAssignmentAdmin(admin.ModelAdmin):
+    list_display = ('roll','room','exam_date','session','row_index','col_index')
+    list_filter = ('exam_date','session')
+    search_fields = ('roll',)
+
+@admin.register(SeatingSummary)
+class SeatingSummaryAdmin(admin.ModelAdmin):
+    list_display = ('room','exam_date','session','students','seats','years','first_roll','last_roll')
+    list_filter = ('exam_date','session')
+
+@admin.register(SeatingVersion)
+class SeatingVersionAdmin(admin.ModelAdmin):
+    list_display = ('exam_date','version','session','updated_at')
+
+@admin.register(RosterVersion)
+class RosterVersionAdmin(admin.ModelAdmin):
+    list_display = ('year','version','updated_at')
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id','kind','status','progress','total','created_at','finished_at')
+    list_filter = ('kind','status')
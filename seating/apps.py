@@ -1,6 +1,20 @@
+import importlib
+
 from django.apps import AppConfig
+from django.conf import settings
+
+# libraries only the upload, export and balanced-allocator paths need;
+# imported lazily unless settings.SEATING_PRELOAD_IMPORTS is on
+HEAVY_MODULES = ("numpy", "openpyxl", "openpyxl.cell", "openpyxl.styles", "openpyxl.utils")
 
 
 class SeatingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'seating'
+
+    def ready(self):
+        # connect the metrics query hook before any database connection opens
+        from . import middleware  # noqa: F401
+        if getattr(settings, "SEATING_PRELOAD_IMPORTS", False):
+            for name in HEAVY_MODULES:
+                importlib.import_module(name)
@@ -0,0 +1,136 @@
+"""
+Async (ASGI) versions of the read endpoints, mounted under
+/api/seating/async/. They return the same bodies and cache headers as the
+DRF views in views.py, but an ASGI worker holds a waiting request as a
+coroutine rather than a thread, so one worker can keep many exam-morning
+connections open. Django's async ORM still runs queries on one thread per
+worker, so this buys connection concurrency, not parallel queries; compare
+against the sync views with the loadtest_reads command before switching.
+Under WSGI they still work, just without that benefit.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .services.response_cache import acached_json_response
+from .services.seat_lookup import afind_seats
+from .services.storage import aroom_codes, aroom_grids, aseat_tuples
+from .services.exam_calendar import SESSION_ORDER
+from .views import parse_exam_date, seating_key
+
+_jwt = JWTAuthentication()
+
+
+async def authenticate(request):
+    """
+    The JWT user for request, as DRF's JWTAuthentication would find it, or
+    None when no token was sent. Raises DRF's AuthenticationFailed /
+    InvalidToken for bad tokens.
+    """
+    header = _jwt.get_header(request)
+    raw_token = _jwt.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    token = _jwt.get_validated_token(raw_token)
+    return await sync_to_async(_jwt.get_user)(token)
+
+
+def jwt_required(view):
+    """IsAuthenticated for async function views, with DRF-shaped 401s."""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            user = await authenticate(request)
+        except APIException as e:
+            return _unauthorized(e.detail if isinstance(e.detail, dict) else {"detail": e.detail})
+        if user is None:
+            return _unauthorized({"detail": "Authentication credentials were not provided."})
+        request.user = user
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def _unauthorized(body):
+    response = JsonResponse(body, status=401)
+    response["WWW-Authenticate"] = _jwt.authenticate_header(None)
+    return response
+
+
+def _invalid_date():
+    return JsonResponse({"detail": "Invalid date"}, status=400)
+
+
+def _seating_key(request, date):
+    """views.seating_key() with its 400 as a JsonResponse."""
+    key = seating_key(date, request.GET)
+    if isinstance(key, Response):
+        return JsonResponse(key.data, status=key.status_code)
+    return key
+
+
+# ---------------------- ROOMS FOR DATE ----------------------
+@jwt_required
+async def rooms_for_date(request, date):
+    key = _seating_key(request, date)
+    if isinstance(key, JsonResponse):
+        return key
+    exam_date, session = key
+    return await acached_json_response(request, "rooms", exam_date, lambda: aroom_codes(exam_date, session), session)
+
+
+# ---------------------- VIEW SEATING (FLAT LIST) ----------------------
+async def _flat_seating(exam_date, session):
+    return [
+        {"room": room, "row": row, "col": col, "roll": roll}
+        for room, row, col, roll in await aseat_tuples(exam_date, session)
+    ]
+
+
+@jwt_required
+async def view_seating(request, date):
+    key = _seating_key(request, date)
+    if isinstance(key, JsonResponse):
+        return key
+    exam_date, session = key
+    return await acached_json_response(request, "flat", exam_date, lambda: _flat_seating(exam_date, session), session)
+
+
+# ---------------------- VIEW SEATING GROUPED (TABLE FORMAT) ----------------------
+async def _grouped_seating(exam_date, session):
+    return dict(await aroom_grids(exam_date, session))
+
+
+@jwt_required
+async def view_seating_grouped(request, date):
+    key = _seating_key(request, date)
+    if isinstance(key, JsonResponse):
+        return key
+    exam_date, session = key
+    return await acached_json_response(
+        request, "grouped", exam_date, lambda: _grouped_seating(exam_date, session), session
+    )
+
+
+# ---------------------- FIND SEAT BY ROLL ----------------------
+@jwt_required
+async def find_seat(request, roll):
+    roll = roll.strip()
+    if not roll:
+        return JsonResponse({"detail": "No seating found for this roll"}, status=404)
+    exam_date = None
+    if request.GET.get("date"):
+        exam_date = parse_exam_date(request.GET["date"])
+        if exam_date is None:
+            return _invalid_date()
+    session = request.GET.get("session") or None
+    if session not in (None, *SESSION_ORDER):
+        return JsonResponse({"detail": f"session must be one of: {', '.join(SESSION_ORDER)}"}, status=400)
+
+    result = await afind_seats(roll, exam_date, session=session)
+    if result["seat"] is None and not result["upcoming"]:
+        return JsonResponse({"detail": "No seating found for this roll"}, status=404)
+    return JsonResponse(result)
@@ -0,0 +1,299 @@
+"""
+Shared helpers for the benchmark management commands: a throwaway
+database, synthetic data and timing/size measurements. Benchmarks never
+touch the configured database's data.
+"""
+import asyncio
+import datetime
+import io
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from django.db import connection
+
+from .models import ExamSession, Student, TimetableRow
+from .services import xlsx
+from .services.roster import bump_roster_version
+
+
+@contextmanager
+def temporary_database():
+    """Run the block against a freshly migrated test database."""
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def synthetic_rolls(year, count):
+    """Roll numbers shaped like the real registers (25g00001 for year I)."""
+    prefix = 26 - year
+    return [f"{prefix}g{i:05d}" for i in range(1, count + 1)]
+
+
+def seed_students(total, years=(1, 2, 3)):
+    """Create total students spread evenly over years."""
+    per_year = total // len(years)
+    for y in years:
+        Student.objects.bulk_create(
+            [Student(roll=r, year=y) for r in synthetic_rolls(y, per_year)], batch_size=2000
+        )
+    bump_roster_version(*years)
+    return per_year * len(years)
+
+
+def seed_timetable(days, start=datetime.date(2025, 11, 20)):
+    """days consecutive exam dates, every year sitting each day."""
+    dates = [start + datetime.timedelta(days=i) for i in range(days)]
+    TimetableRow.objects.bulk_create([
+        TimetableRow(date=d, i_year_subject=f"Paper {i}", ii_year_subject=f"Paper {i}",
+                     iii_year_subject=f"Paper {i}")
+        for i, d in enumerate(dates)
+    ])
+    ExamSession.objects.bulk_create([
+        ExamSession(date=d, year=y, subject=f"Paper {i}") for i, d in enumerate(dates) for y in (1, 2, 3)
+    ])
+    return dates
+
+
+def timed(fn, repeat=5):
+    """Median wall time of fn() in seconds over repeat runs."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def table_size(model):
+    """Bytes used by a model's table and its indexes, or None if unknown."""
+    table = model._meta.db_table
+    with connection.cursor() as cur:
+        if connection.vendor == "postgresql":
+            cur.execute("SELECT pg_total_relation_size(%s)", [table])
+            return cur.fetchone()[0]
+        if connection.vendor == "sqlite":
+            try:
+                cur.execute(
+                    "SELECT SUM(pgsize) FROM dbstat WHERE name = %s OR name IN "
+                    "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s)",
+                    [table, table],
+                )
+            except Exception:   # SQLite built without dbstat
+                return None
+            return cur.fetchone()[0] or 0
+    return None
+
+
+def rolls_xlsx(rolls, name="students.xlsx"):
+    """An in-memory .xlsx upload with a 'Roll No' column."""
+    wb = xlsx.new_workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(["Roll No"])
+    for r in rolls:
+        ws.append([r])
+    buf = io.BytesIO()
+    wb.save(buf)
+    buf.name = name
+    buf.seek(0)
+    return buf
+
+
+class QueryCounter:
+    """execute_wrapper counting queries run on a connection."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(fn, setup=None, repeat=3):
+    """
+    Median wall time, query count and peak Python memory of fn().
+
+    setup() runs before every call, untimed, to reset state. Memory is
+    taken in one extra run under tracemalloc so its overhead does not
+    skew the timings.
+    Returns {"wall_s", "queries", "peak_mb"}.
+    """
+    samples = []
+    queries = 0
+    for _ in range(repeat):
+        if setup:
+            setup()
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            t0 = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - t0)
+        queries = counter.count
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "wall_s": round(statistics.median(samples), 6),
+        "queries": queries,
+        "peak_mb": round(peak / 2**20, 3),
+    }
+
+
+def compare_results(baseline, current, threshold=0.2, floor=0.005):
+    """
+    Regressions of current against baseline (both as written by
+    `manage.py benchmark_seating --output`): benchmarks whose wall time
+    grew by more than threshold (a fraction) and by more than floor
+    seconds, or whose query count grew at all.
+    Returns a list of human-readable lines, empty when nothing regressed.
+    """
+    regressions = []
+    for scale, benches in current["results"].items():
+        for name, now in benches.items():
+            before = baseline.get("results", {}).get(scale, {}).get(name)
+            if before is None:
+                continue
+            slower = now["wall_s"] - before["wall_s"]
+            if slower > floor and now["wall_s"] > before["wall_s"] * (1 + threshold):
+                growth = f" (+{slower / before['wall_s']:.0%})" if before["wall_s"] else ""
+                regressions.append(
+                    f"{name} @ {scale}: {before['wall_s']:.4f}s -> {now['wall_s']:.4f}s{growth}"
+                )
+            if now["queries"] > before["queries"]:
+                regressions.append(f"{name} @ {scale}: {before['queries']} -> {now['queries']} queries")
+    return regressions
+
+
+# ---------------------- HTTP LOAD ----------------------
+# A small keep-alive HTTP/1.1 client for loadtest_reads / loadtest_profiles.
+def rss_bytes(pid):
+    """Resident memory of pid and its children (Linux /proc), or None."""
+    total = 0
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids += [int(p) for p in f.read().split()]
+    except OSError:
+        pass
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+        except OSError:
+            return None
+    return total
+
+
+async def read_response(reader):
+    """Status code and body length of one HTTP/1.1 response."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("server closed the connection")
+    status = int(status_line.split()[1])
+    length, chunked, close = None, False, False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value:
+            chunked = True
+        elif name == "connection" and value == "close":
+            close = True
+    size = 0
+    if chunked:
+        while True:
+            chunk = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(chunk + 2)
+            size += chunk
+            if not chunk:
+                break
+    elif length is not None:
+        await reader.readexactly(length)
+        size = length
+    return status, size, close
+
+
+async def client(host, port, requests, headers, latencies, errors, deadline):
+    reader = writer = None
+    while True:
+        try:
+            path = requests.pop()
+        except IndexError:
+            break
+        if time.monotonic() > deadline:
+            break
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n{headers}\r\n".encode())
+            await writer.drain()
+            status, _, close = await read_response(reader)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            errors.append(type(e).__name__)
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            continue
+        latencies.append(time.perf_counter() - start)
+        if status >= 400:
+            errors.append(str(status))
+        if close:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(url, paths, total, concurrency, token, timeout):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    headers = "Connection: keep-alive\r\n"
+    if token:
+        headers += f"Authorization: Bearer {token}\r\n"
+    requests = [parts.path.rstrip("/") + paths[i % len(paths)] for i in range(total)]
+    requests.reverse()
+    latencies, errors = [], []
+    deadline = time.monotonic() + timeout
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        client(host, port, requests, headers, latencies, errors, deadline) for _ in range(concurrency)
+    ])
+    return time.perf_counter() - start, latencies, errors
+
+
+def load_summary(elapsed, latencies, errors):
+    """Throughput, latency percentiles (ms) and errors of one run_load()."""
+    latencies = sorted(latencies)
+    done = len(latencies)
+    pct = lambda q: round(latencies[min(int(q * done), done - 1)] * 1000, 2) if done else None
+    return {
+        "requests": done,
+        "errors": len(errors),
+        "error_kinds": sorted(set(errors)),
+        "seconds": round(elapsed, 3),
+        "req_per_s": round(done / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies) * 1000, 2) if done else None,
+            "p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99),
+        },
+    }
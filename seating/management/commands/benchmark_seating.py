@@ -0,0 +1,178 @@
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+
+import django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from seating.benchmarks import (
+    temporary_database, synthetic_rolls, seed_students, seed_timetable, rolls_xlsx, measure, compare_results,
+)
+from seating.models import (
+    Student, TimetableRow, ExamSession, Room, Seating, RoomSeating, SeatAssignment, SeatingSummary,
+    SeatingVersion, UploadedFile,
+)
+from seating.services.excel_export import build_seating_workbook
+from seating.services.response_cache import seating_cache
+from seating.services.roster import bump_roster_version, clear_roster_cache
+from seating.services.seat_lookup import LOOKUP_CACHE
+from seating.services.seating_generator import generate_seating_for_date, parse_rolls_from_dataframe
+from seating.services.storage import has_seating, storage_mode
+
+BENCHMARKS = ("parse_rolls", "upload_students", "generate_seating", "view_grouped", "excel_export")
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def reset_tables():
+    for model in (Seating, SeatAssignment, RoomSeating, SeatingSummary, SeatingVersion, Room, TimetableRow,
+                  ExamSession, Student, UploadedFile):
+        model.objects.all().delete()
+    seating_cache().clear()
+    LOOKUP_CACHE.clear()
+    clear_roster_cache()
+
+
+class Command(BaseCommand):
+    help = ("Time the upload, generation and read paths on synthetic data in a throwaway database: "
+            "python manage.py benchmark_seating --scales 1000,10000 --output bench.json "
+            "[--compare baseline.json --threshold 0.2]")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', type=str, default='1000,10000,100000',
+                            help='Comma-separated student counts')
+        parser.add_argument('--only', type=str, default='',
+                            help=f"Comma-separated subset of {', '.join(BENCHMARKS)}")
+        parser.add_argument('--capacity', type=int, default=90)
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--output', type=str, help='Write results as JSON to this file ("-" for stdout)')
+        parser.add_argument('--compare', type=str, help='Baseline JSON from an earlier --output run')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Allowed wall-time growth over the baseline, as a fraction (default 0.2)')
+
+    def handle(self, *args, **options):
+        try:
+            scales = [int(s) for s in options['scales'].split(',') if s.strip()]
+        except ValueError:
+            raise CommandError("--scales takes comma-separated integers")
+        only = [b for b in options['only'].split(',') if b]
+        unknown = set(only) - set(BENCHMARKS)
+        if unknown:
+            raise CommandError(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+        selected = [b for b in BENCHMARKS if not only or b in only]
+
+        media_root = tempfile.mkdtemp(prefix="seating-bench-")
+        results = {}
+        try:
+            with override_settings(MEDIA_ROOT=media_root, SEATING_SLOW_REQUEST_MS=None), temporary_database():
+                meta = {
+                    "commit": git_commit(),
+                    "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "django": django.get_version(),
+                    "database": connection.vendor,
+                    "storage": storage_mode(),
+                    "capacity": options['capacity'],
+                    "repeat": options['repeat'],
+                }
+                for scale in scales:
+                    self.stderr.write(f"{scale} students...")
+                    results[str(scale)] = self.run_scale(scale, selected, options, media_root)
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+
+        report = {"meta": meta, "results": results}
+        self.write_report(report, options['output'])
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+            regressions = compare_results(baseline, report, options['threshold'])
+            if regressions:
+                raise CommandError("Regressions against baseline:\n  " + "\n  ".join(regressions))
+            self.stderr.write(self.style.SUCCESS(
+                f"No regressions against {options['compare']} (threshold {options['threshold']:.0%})"
+            ))
+
+    def run_scale(self, scale, selected, options, media_root):
+        reset_tables()
+        exam_date = seed_timetable(1)[0]
+        seed_students(scale)
+        capacity, repeat = options['capacity'], options['repeat']
+        client = APIClient(HTTP_HOST="localhost")   # runs outside the test runner's ALLOWED_HOSTS
+        client.force_authenticate(User.objects.get_or_create(username="bench", is_staff=True)[0])
+        upload_rolls = synthetic_rolls(1, scale)
+
+        def clear_uploads():
+            Student.objects.filter(year=1).delete()
+            bump_roster_version(1)
+            UploadedFile.objects.all().delete()
+
+        def upload():
+            resp = client.post("/api/seating/upload/students/", {"file": rolls_xlsx(upload_rolls), "year": 1})
+            assert resp.status_code == 200, resp.content
+
+        def clear_seating():
+            for model in (Seating, SeatAssignment, RoomSeating, SeatingSummary, SeatingVersion):
+                model.objects.all().delete()
+
+        def view_grouped():
+            resp = client.get(f"/api/seating/view_grouped/{exam_date}/")
+            assert resp.status_code == 200, resp.content
+
+        def parse_rolls():
+            import pandas as pd   # only this benchmark uses the DataFrame helper
+            parse_rolls_from_dataframe(pd.DataFrame({"Roll No": upload_rolls}))
+
+        export_path = os.path.join(media_root, "bench.xlsx")
+        benches = {
+            "parse_rolls": (parse_rolls, None),
+            "upload_students": (upload, clear_uploads),
+            "generate_seating": (lambda: generate_seating_for_date(exam_date, capacity, 999), clear_seating),
+            "view_grouped": (view_grouped, seating_cache().clear),
+            "excel_export": (lambda: build_seating_workbook(exam_date, export_path), None),
+        }
+
+        out = {}
+        for name in selected:
+            if name in ("view_grouped", "excel_export") and not has_seating(exam_date):
+                generate_seating_for_date(exam_date, capacity, 999)
+            fn, setup = benches[name]
+            out[name] = measure(fn, setup, repeat)
+            if name == "upload_students":
+                # put back the seeded year I cohort so later benchmarks see scale students
+                clear_uploads()
+                seed_students(scale // 3, years=(1,))
+            self.stderr.write(f"  {name}: {out[name]['wall_s']:.4f}s, {out[name]['queries']} queries, "
+                              f"{out[name]['peak_mb']} MiB peak")
+        return out
+
+    def write_report(self, report, output):
+        text = json.dumps(report, indent=2)
+        if output == "-":
+            self.stdout.write(text)
+        elif output:
+            with open(output, "w") as f:
+                f.write(text + "\n")
+            self.stderr.write(f"Wrote {output}")
+        else:
+            for scale, benches in report["results"].items():
+                self.stdout.write(f"{scale} students")
+                for name, r in benches.items():
+                    self.stdout.write(f"  {name:<17} {r['wall_s']:>9.4f}s {r['queries']:>6} queries "
+                                      f"{r['peak_mb']:>9.3f} MiB")
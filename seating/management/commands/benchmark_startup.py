@@ -0,0 +1,178 @@
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# run in a fresh interpreter: what a worker pays before serving its first request
+IMPORT_SNIPPET = """
+import json, sys, time
+t0 = time.perf_counter()
+import seatingbackend.wsgi
+from django.urls import get_resolver
+get_resolver().url_patterns
+wall = time.perf_counter() - t0
+app_rss = _rss()
+heavy = sorted(m for m in ("numpy", "openpyxl", "pandas") if m in sys.modules)
+lazy = {}
+for name in sys.argv[1:]:
+    rss = _rss()
+    t = time.perf_counter()
+    __import__(name)
+    lazy[name] = {"wall_s": time.perf_counter() - t, "rss_mb": _rss() - rss}
+print(json.dumps({
+    "wall_s": wall,
+    "rss_mb": app_rss,
+    "heavy_loaded": heavy,
+    "lazy": lazy,
+}))
+"""
+
+RSS_SNIPPET = """
+def _rss():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+"""
+
+LAZY_MODULES = ("numpy", "openpyxl", "pandas")
+
+
+def memory_mb(pid):
+    """{"rss_mb", "pss_mb"} of a process from /proc/<pid>/smaps_rollup (Linux)."""
+    out = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("Rss", "Pss"):
+                out[key.lower() + "_mb"] = round(int(value.split()[0]) / 1024, 1)
+    return out
+
+
+def children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = ("Measure app import time and memory per worker: "
+            "python manage.py benchmark_startup [--gunicorn --workers 3] [--output startup.json]. "
+            "Run it on two commits to compare before and after.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters to time')
+        parser.add_argument('--gunicorn', action='store_true',
+                            help='Also boot gunicorn with and without --preload and read worker memory (Linux)')
+        parser.add_argument('--workers', type=int, default=3)
+        parser.add_argument('--output', type=str, help='Write results as JSON to this file ("-" for stdout)')
+
+    def handle(self, *args, **options):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "")
+               or "seatingbackend.settings", "PYTHONPATH": str(settings.BASE_DIR)}
+        env.pop("SEATING_PRELOAD_IMPORTS", None)
+
+        runs = [self.import_run(env) for _ in range(options['repeat'])]
+        report = {
+            "python": sys.version.split()[0],
+            "import": {
+                "wall_s": round(statistics.median(r["wall_s"] for r in runs), 4),
+                "rss_mb": round(statistics.median(r["rss_mb"] for r in runs), 1),
+                "heavy_loaded": runs[0]["heavy_loaded"],
+            },
+            "lazy": {
+                name: {
+                    "wall_s": round(statistics.median(r["lazy"][name]["wall_s"] for r in runs), 4),
+                    "rss_mb": round(statistics.median(r["lazy"][name]["rss_mb"] for r in runs), 1),
+                }
+                for name in runs[0]["lazy"]
+            },
+        }
+        if options['gunicorn']:
+            report["gunicorn"] = {
+                "plain": self.gunicorn_memory(env, options['workers'], preload=False),
+                "preload": self.gunicorn_memory(env, options['workers'], preload=True),
+            }
+        self.write_report(report, options['output'])
+
+    def import_run(self, env):
+        proc = subprocess.run(
+            [sys.executable, "-c", RSS_SNIPPET + IMPORT_SNIPPET, *LAZY_MODULES],
+            env=env, cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        if proc.returncode:
+            raise CommandError(f"Importing the app failed:\n{proc.stderr}")
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+
+    def gunicorn_memory(self, env, workers, preload):
+        """Boot gunicorn, wait for its workers and read their memory; PSS counts shared pages once."""
+        port = free_port()
+        cmd = [sys.executable, "-m", "gunicorn", "seatingbackend.wsgi:application",
+               "-w", str(workers), "-b", f"127.0.0.1:{port}", "--log-level", "warning"]
+        # gunicorn also reads gunicorn.conf.py from the working directory; pin its profile
+        env = {**env, "SERVE_PROFILE": "sync", "GUNICORN_PRELOAD": "1" if preload else "0"}
+        if preload:
+            cmd.append("--preload")
+            env["SEATING_PRELOAD_IMPORTS"] = "1"
+        server = subprocess.Popen(cmd, env=env, cwd=settings.BASE_DIR,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        try:
+            deadline = time.monotonic() + 60
+            while len(children(server.pid)) < workers:
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise CommandError(f"gunicorn did not start:\n{server.stderr.read()}")
+                time.sleep(0.2)
+            time.sleep(2)   # let workers finish importing the app
+            for _ in range(workers * 4):   # a first request to (most likely) every worker
+                try:
+                    urllib.request.urlopen(f"http://127.0.0.1:{port}/api/seating/rooms/2025-01-01/", timeout=10)
+                except OSError:
+                    pass   # 401 without a token; the request still ran
+            master = memory_mb(server.pid)
+            worker_mem = [memory_mb(pid) for pid in children(server.pid)]
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+        return {
+            "workers": workers,
+            "master": master,
+            "worker_rss_mb": round(statistics.mean(w["rss_mb"] for w in worker_mem), 1),
+            "worker_pss_mb": round(statistics.mean(w["pss_mb"] for w in worker_mem), 1),
+            "total_pss_mb": round(master["pss_mb"] + sum(w["pss_mb"] for w in worker_mem), 1),
+        }
+
+    def write_report(self, report, output):
+        text = json.dumps(report, indent=2)
+        if output == "-":
+            self.stdout.write(text)
+            return
+        if output:
+            with open(output, "w") as f:
+                f.write(text + "\n")
+            self.stderr.write(f"Wrote {output}")
+            return
+        imp = report["import"]
+        self.stdout.write(f"app import   {imp['wall_s']:.3f}s  {imp['rss_mb']:.1f} MiB  "
+                          f"heavy modules loaded: {', '.join(imp['heavy_loaded']) or 'none'}")
+        for name, r in report["lazy"].items():
+            self.stdout.write(f"  + {name:<10} {r['wall_s']:.3f}s  {r['rss_mb']:.1f} MiB on first use")
+        for mode, g in report.get("gunicorn", {}).items():
+            self.stdout.write(f"gunicorn {mode:<8} {g['workers']} workers: {g['worker_rss_mb']} MiB RSS / "
+                              f"{g['worker_pss_mb']} MiB PSS each, {g['total_pss_mb']} MiB PSS in total")
@@ -0,0 +1,52 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from seating.benchmarks import temporary_database, seed_students, seed_timetable, timed, table_size
+from seating.models import Seating, RoomSeating, SeatAssignment
+from seating.services.seating_generator import generate_seating_batch
+from seating.services.storage import SEAT, GRID, room_grids
+
+
+class Command(BaseCommand):
+    help = ("Compare per-seat and per-room (grid) seating storage on a throwaway database: "
+            "python manage.py benchmark_storage --students 10000 --days 10")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=10000)
+        parser.add_argument('--days', type=int, default=10)
+        parser.add_argument('--capacity', type=int, default=90)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        results = {}
+        with temporary_database():
+            students = seed_students(options['students'])
+            dates = seed_timetable(options['days'])
+            for mode, tables in ((SEAT, [Seating]), (GRID, [RoomSeating, SeatAssignment])):
+                with override_settings(SEATING_STORAGE=mode):
+                    write = timed(
+                        lambda: generate_seating_batch(None, options['capacity'], 999, workers=1), repeat=1
+                    )
+                    read = timed(lambda: list(room_grids(dates[0])), repeat=options['repeat'])
+                    sizes = {m.__name__: table_size(m) for m in tables}
+                    results[mode] = {
+                        "generate_s": round(write, 4),
+                        "read_grouped_ms": round(read * 1000, 3),
+                        "rows": {m.__name__: m.objects.count() for m in tables},
+                        "bytes": sizes,
+                        "total_bytes": sum(v for v in sizes.values() if v is not None),
+                    }
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f"{students} students, {len(dates)} exam days")
+        for mode, r in results.items():
+            rows = ", ".join(f"{k}={v}" for k, v in r["rows"].items())
+            self.stdout.write(
+                f"{mode:>5}: generate {r['generate_s']}s, read one day {r['read_grouped_ms']}ms, "
+                f"{r['total_bytes'] / 1024:.0f} KiB ({rows})"
+            )
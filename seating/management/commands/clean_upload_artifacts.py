@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from seating.services.uploads import evict_artifacts
+import datetime
+
+class Command(BaseCommand):
+    help = ("Evict cached parse artifacts of uploads, least recently used first, until they fit a size "
+            "budget: python manage.py clean_upload_artifacts --max-mb 200 [--older-than-days 30] [--dry-run]. "
+            "The uploads themselves are kept; an evicted artifact is rebuilt on the next import.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-mb', type=float, default=200, help='Size budget for all artifacts')
+        parser.add_argument('--older-than-days', type=int, help='Also evict artifacts unused for this long')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['max_mb'] < 0:
+            raise CommandError("--max-mb must not be negative")
+        older_than = None
+        if options['older_than_days'] is not None:
+            older_than = timezone.now() - datetime.timedelta(days=options['older_than_days'])
+
+        evicted, freed, kept = evict_artifacts(int(options['max_mb'] * 2**20), older_than, options['dry_run'])
+
+        verb = "Would evict" if options['dry_run'] else "Evicted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {evicted} artifact(s), {freed / 2**20:.2f} MiB; {kept / 2**20:.2f} MiB kept"
+        ))
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from seating.models import Seating, RoomSeating, SeatAssignment
+from seating.services.storage import (
+    SEAT, GRID, BATCH_SIZE, seat_rows_to_grids, write_room_grids, grids_to_seat_rows,
+)
+from seating.services.versions import bump_seating_version, lock_seating_date
+import datetime
+
+class Command(BaseCommand):
+    help = ("Copy generated seating between storage layouts: "
+            "python manage.py convert_seating_storage --to grid [--date 2025-11-20] [--drop-source]. "
+            "Set SEATING_STORAGE to the new layout afterwards.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--to', choices=[SEAT, GRID], required=True)
+        parser.add_argument('--date', type=str, help='Only this exam date (YYYY-MM-DD)')
+        parser.add_argument('--drop-source', action='store_true', help='Delete the converted source rows')
+
+    def handle(self, *args, **options):
+        source = Seating if options['to'] == GRID else RoomSeating
+        # one conversion per stored seating: (exam_date, session)
+        keys = source.objects.order_by('exam_date', 'session').values_list('exam_date', 'session').distinct()
+        if options['date']:
+            try:
+                keys = keys.filter(exam_date=datetime.date.fromisoformat(options['date']))
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        for exam_date, session in list(keys):
+            stored = {'exam_date': exam_date, 'session': session}
+            with transaction.atomic():
+                lock_seating_date(exam_date, session)
+                if options['to'] == GRID:
+                    counts = write_room_grids(exam_date, seat_rows_to_grids(exam_date, session), session=session)
+                    detail = f"{counts['inserted']} rooms written"
+                    if options['drop_source']:
+                        Seating.objects.filter(**stored).delete()
+                else:
+                    seats = grids_to_seat_rows(exam_date, session)
+                    Seating.objects.filter(**stored).delete()
+                    Seating.objects.bulk_create(seats, batch_size=BATCH_SIZE)
+                    detail = f"{len(seats)} seats written"
+                    if options['drop_source']:
+                        RoomSeating.objects.filter(**stored).delete()
+                        SeatAssignment.objects.filter(**stored).delete()
+                bump_seating_version(exam_date, session)
+            self.stdout.write(f"{exam_date}{' ' + session if session else ''}: {detail}")
+
+        self.stdout.write(self.style.SUCCESS(f"Converted seating to '{options['to']}' storage"))
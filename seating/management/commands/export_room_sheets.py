@@ -0,0 +1,59 @@
+import datetime
+import shutil
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from seating.services.exam_calendar import SESSION_ORDER
+from seating.services.room_sheets import get_room_sheets, parse_formats, stream_archives
+from seating.services.seating_generator import timetable_dates
+
+
+class Command(BaseCommand):
+    help = ("Export printable per-room seating sheets (HTML and XLSX) as a ZIP: "
+            "python manage.py export_room_sheets 2025-11-20 --output sheets.zip, or --all / --from/--to "
+            "for a ZIP of per-date ZIPs")
+
+    def add_arguments(self, parser):
+        parser.add_argument('date', nargs='?', type=str, help='Exam date YYYY-MM-DD')
+        parser.add_argument('--from', dest='date_from', type=str, help='First exam date YYYY-MM-DD')
+        parser.add_argument('--to', dest='date_to', type=str, help='Last exam date YYYY-MM-DD')
+        parser.add_argument('--all', action='store_true', help='Every date in the timetable')
+        parser.add_argument('--session', type=str, choices=SESSION_ORDER,
+                            help="That session's seating (default: the whole day's)")
+        parser.add_argument('--formats', type=str, default='html,xlsx')
+        parser.add_argument('--workers', type=int, default=None, help='Renderer processes (default: CPU count)')
+        parser.add_argument('--output', type=str, help='ZIP to write (default: room_sheets[_DATE].zip)')
+
+    def handle(self, *args, **options):
+        try:
+            formats = parse_formats(options['formats'])
+            if options['date']:
+                dates = [datetime.date.fromisoformat(options['date'])]
+            elif options['all'] or options['date_from'] or options['date_to']:
+                dates = timetable_dates(
+                    datetime.date.fromisoformat(options['date_from']) if options['date_from'] else None,
+                    datetime.date.fromisoformat(options['date_to']) if options['date_to'] else None,
+                )
+            else:
+                raise CommandError("Pass a date, --all or a --from/--to date range")
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        session = options['session'] or ''
+        suffix = f"_{session}" if session else ""
+        started = time.perf_counter()
+        archives = get_room_sheets(dates, formats, workers=options['workers'], session=session)
+        if not archives:
+            raise CommandError("No seating for the selected dates")
+
+        single = options['date'] is not None
+        output = options['output'] or (f"room_sheets_{dates[0]}{suffix}.zip" if single else "room_sheets.zip")
+        if single:
+            shutil.copyfile(archives[0][1], output)
+        else:
+            with open(output, "wb") as f:
+                for chunk in stream_archives((f"room_sheets_{d}{suffix}.zip", path) for d, path in archives):
+                    f.write(chunk)
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {output}: {len(archives)} date(s) in {time.perf_counter() - started:.2f}s"
+        ))
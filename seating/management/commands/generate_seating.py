@@ -1,5 +1,8 @@
 from django.core.management.base import BaseCommand
-from seating.services.seating_generator import generate_seating_for_date
+from seating.services.allocators import STRATEGIES
+from seating.services.exam_calendar import SESSION_ORDER
+from seating.services.rooms import available_rooms
+from seating.services.seating_generator import generate_seating_for_date, plan_for_date
 import datetime
 
 class Command(BaseCommand):
@@ -10,10 +13,33 @@ class Command(BaseCommand):
         parser.add_argument('--capacity', type=int, default=90)
         parser.add_argument('--rooms', type=int, default=0)
         parser.add_argument('--start', type=str, default='MC101')
+        parser.add_argument('--inventory', action='store_true',
+                            help='Use the stored rooms available on the date instead of --capacity/--rooms/--start')
+        parser.add_argument('--strategy', type=str, default='cyclic', choices=sorted(STRATEGIES),
+                            help='Seat allocator')
+        parser.add_argument('--session', type=str, choices=SESSION_ORDER,
+                            help='Seat only the years sitting this session (default: everyone that day)')
+        parser.add_argument('--dry-run', action='store_true', help='Plan only, do not write seating')
 
     def handle(self, *args, **options):
         date = datetime.date.fromisoformat(options['date'])
         capacity = options['capacity']
         rooms = options['rooms']
-        created = generate_seating_for_date(date, capacity, rooms or 999, start_room_code=options['start'])
-        self.stdout.write(self.style.SUCCESS(f"Created {len(created)} seating entries"))
+        if options['dry_run']:
+            plan = plan_for_date(date, capacity, rooms or 999, start_room_code=options['start'],
+                                 strategy=options['strategy'],
+                                 rooms=available_rooms(date) if options['inventory'] else None,
+                                 session=options['session'])
+            self.stdout.write(
+                f"Would seat {plan.students} students in {len(plan.room_codes)} rooms "
+                f"({', '.join(plan.room_codes)})"
+            )
+            return
+        counts = generate_seating_for_date(date, capacity, rooms or 999, start_room_code=options['start'],
+                                           strategy=options['strategy'], inventory=options['inventory'],
+                                           session=options['session'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Seated {counts['students']} students in {counts['rooms']} rooms: "
+            f"{counts['inserted']} inserted, {counts['updated']} updated, "
+            f"{counts['deleted']} deleted, {counts['moved']} moved"
+        ))
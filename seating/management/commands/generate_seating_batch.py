@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from seating.services.allocators import STRATEGIES
+from seating.services.exam_calendar import SESSION_ORDER
+from seating.services.seating_generator import generate_seating_batch, timetable_dates
+import datetime
+
+class Command(BaseCommand):
+    help = ("Generate seating for many dates in one pass: "
+            "python manage.py generate_seating_batch --from 2025-11-20 --to 2025-12-05 --capacity 90")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', type=str, help='First exam date YYYY-MM-DD')
+        parser.add_argument('--to', dest='date_to', type=str, help='Last exam date YYYY-MM-DD')
+        parser.add_argument('--all', action='store_true', help='Every date in the timetable')
+        parser.add_argument('--capacity', type=int, default=90)
+        parser.add_argument('--rooms', type=int, default=0)
+        parser.add_argument('--start', type=str, default='MC101')
+        parser.add_argument('--inventory', action='store_true',
+                            help='Use the stored rooms available on the date instead of --capacity/--rooms/--start')
+        parser.add_argument('--strategy', type=str, default='cyclic', choices=sorted(STRATEGIES),
+                            help='Seat allocator')
+        parser.add_argument('--session', type=str, choices=SESSION_ORDER,
+                            help='Seat only the years sitting this session (default: everyone that day)')
+        parser.add_argument('--workers', type=int, default=None, help='Planner processes (default: CPU count)')
+
+    def handle(self, *args, **options):
+        dates = None
+        if not options['all']:
+            if not (options['date_from'] or options['date_to']):
+                raise CommandError("Pass --all or a --from/--to date range")
+            try:
+                dates = timetable_dates(
+                    datetime.date.fromisoformat(options['date_from']) if options['date_from'] else None,
+                    datetime.date.fromisoformat(options['date_to']) if options['date_to'] else None,
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        results = generate_seating_batch(
+            dates, options['capacity'], options['rooms'] or 999, options['start'], workers=options['workers'],
+            strategy=options['strategy'], inventory=options['inventory'], session=options['session'],
+        )
+        for r in results:
+            if "error" in r:
+                self.stdout.write(self.style.WARNING(f"{r['date']}: {r['error']}"))
+            else:
+                self.stdout.write(f"{r['date']}: {r['students']} students in {r['rooms']} rooms")
+        done = sum(1 for r in results if "error" not in r)
+        self.stdout.write(self.style.SUCCESS(f"Generated seating for {done} of {len(results)} dates"))
+
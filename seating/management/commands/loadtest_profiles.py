@@ -0,0 +1,136 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from seating.benchmarks import load_summary, run_load
+
+PROFILES = ("sync", "gthread", "uvicorn")
+
+# run against the load-test database in a subprocess: seed it, print date, roll and a token
+SEED_SNIPPET = """
+import json, sys
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import AccessToken
+from seating.benchmarks import seed_students, seed_timetable
+from seating.models import Student, TimetableRow
+from seating.services.seating_generator import generate_seating_for_date
+
+students = int(sys.argv[1])
+if students and not Student.objects.exists():
+    exam_date = seed_timetable(1)[0]
+    seed_students(students)
+    generate_seating_for_date(exam_date, 90, 999)
+row = TimetableRow.objects.order_by("date").first()
+if row is None:
+    sys.exit("no timetable in the load-test database; pass --seed")
+roll = Student.objects.order_by("roll").values_list("roll", flat=True).first()
+user, _ = User.objects.get_or_create(username="loadtest")
+print(json.dumps({"date": row.date.isoformat(), "roll": roll, "token": str(AccessToken.for_user(user))}))
+"""
+
+
+class Command(BaseCommand):
+    help = ("Boot gunicorn with each serving profile from gunicorn.conf.py against a local database and "
+            "load the read endpoints: python manage.py loadtest_profiles "
+            "[--profiles sync,gthread,uvicorn] [--conn-max-age 0,60] [--database-url postgres://...]. "
+            "Defaults to a throwaway SQLite database seeded with --seed students.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', type=str, default=",".join(PROFILES))
+        parser.add_argument('--conn-max-age', type=str, default='0,60',
+                            help='Comma-separated DB_CONN_MAX_AGE values to try (uvicorn always uses 0)')
+        parser.add_argument('--workers', type=int, help='GUNICORN_WORKERS (default: per profile and CPU count)')
+        parser.add_argument('--database-url', type=str,
+                            help='e.g. a local Postgres; migrated and seeded if empty (default: temp SQLite)')
+        parser.add_argument('--seed', type=int, default=3000, help='Students to seed into an empty database')
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--port', type=int, default=8199)
+        parser.add_argument('--output', type=str, help='Write results as JSON to this file')
+
+    def handle(self, *args, **options):
+        profiles = [p for p in options['profiles'].split(',') if p]
+        unknown = set(profiles) - set(PROFILES)
+        if unknown:
+            raise CommandError(f"Unknown profile(s): {', '.join(sorted(unknown))}")
+        ages = [int(a) for a in options['conn_max_age'].split(',') if a]
+
+        with tempfile.TemporaryDirectory(prefix="seating-loadtest-") as tmp:
+            env = {
+                **os.environ,
+                "DATABASE_URL": options['database_url'] or f"sqlite:///{tmp}/loadtest.db",
+                "DJANGO_SETTINGS_MODULE": "seatingbackend.settings",
+                "SEATING_SLOW_REQUEST_MS": "100000",
+                "PORT": str(options['port']),
+            }
+            if options['workers']:
+                env["GUNICORN_WORKERS"] = str(options['workers'])
+            fixture = self.prepare_database(env, options['seed'])
+            date, roll = fixture["date"], fixture["roll"]
+            paths = [f"/find/{roll}/?date={date}", f"/view_grouped/{date}/", f"/summary/{date}/",
+                     f"/rooms/{date}/"]
+
+            results = []
+            for profile in profiles:
+                for age in ([0] if profile == "uvicorn" else ages):
+                    self.stderr.write(f"{profile}, DB_CONN_MAX_AGE={age}...")
+                    run_env = {**env, "SERVE_PROFILE": profile, "DB_CONN_MAX_AGE": str(age)}
+                    result = self.run_profile(run_env, paths, fixture["token"], options)
+                    results.append({"profile": profile, "conn_max_age": age, **result})
+
+        if options['output']:
+            with open(options['output'], "w") as f:
+                json.dump({"paths": paths, "results": results}, f, indent=2)
+            self.stderr.write(f"Wrote {options['output']}")
+        self.stdout.write(f"{'profile':<9} {'conn_max_age':>12} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+        for r in results:
+            lat = r["latency_ms"]
+            self.stdout.write(f"{r['profile']:<9} {r['conn_max_age']:>12} {r['req_per_s']:>8} "
+                              f"{lat['p50']:>8} {lat['p95']:>8} {r['errors']:>7}")
+
+    def manage(self, env, *args):
+        proc = subprocess.run([sys.executable, "manage.py", *args], env=env, cwd=settings.BASE_DIR,
+                              capture_output=True, text=True)
+        if proc.returncode:
+            raise CommandError(f"manage.py {args[0]} failed:\n{proc.stderr}")
+        return proc.stdout
+
+    def prepare_database(self, env, seed):
+        self.stderr.write("Migrating and seeding the load-test database...")
+        self.manage(env, "migrate", "--noinput")
+        out = self.manage(env, "shell", "-c", SEED_SNIPPET.replace("sys.argv[1]", repr(str(seed))))
+        return json.loads(out.strip().splitlines()[-1])
+
+    def run_profile(self, env, paths, token, options):
+        base = f"http://127.0.0.1:{options['port']}"
+        server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-b",
+                                   f"127.0.0.1:{options['port']}"],
+                                  env=env, cwd=settings.BASE_DIR, stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.PIPE, text=True)
+        try:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    urllib.request.urlopen(f"{base}/api/seating/health/", timeout=5)
+                    break
+                except OSError:
+                    if server.poll() is not None or time.monotonic() > deadline:
+                        raise CommandError(f"gunicorn did not start:\n{server.stderr.read()}")
+                    time.sleep(0.3)
+            url = f"{base}/api/seating"
+            asyncio.run(run_load(url, paths, 100, 10, token, 30))   # warm caches and connections
+            elapsed, latencies, errors = asyncio.run(run_load(
+                url, paths, options['requests'], options['concurrency'], token, 300,
+            ))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        return load_summary(elapsed, latencies, errors)
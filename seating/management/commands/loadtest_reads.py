@@ -0,0 +1,65 @@
+import asyncio
+import json
+import os
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from seating.benchmarks import load_summary, rss_bytes, run_load
+
+
+class Command(BaseCommand):
+    help = ("Concurrent GET load against a running server, e.g. gunicorn (WSGI) vs uvicorn (ASGI): "
+            "python manage.py loadtest_reads --url http://127.0.0.1:8000/api/seating "
+            "--path /view_grouped/2025-11-20/ --path /async/view_grouped/2025-11-20/ --user admin")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', type=str, default='http://127.0.0.1:8000/api/seating')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Path under --url to request; repeat to rotate through several')
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--timeout', type=float, default=120, help='Stop after this many seconds')
+        parser.add_argument('--user', type=str, help='Mint a JWT for this username')
+        parser.add_argument('--token', type=str, help='Or pass an access token')
+        parser.add_argument('--pid', type=int, help='Server master pid, to report its memory (Linux)')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        if not options['paths']:
+            raise CommandError("Pass at least one --path")
+        token = options['token'] or os.environ.get("SEATING_TOKEN")
+        if options['user']:
+            try:
+                token = str(AccessToken.for_user(User.objects.get(username=options['user'])))
+            except User.DoesNotExist:
+                raise CommandError(f"No user '{options['user']}'")
+
+        rss_before = rss_bytes(options['pid']) if options['pid'] else None
+        elapsed, latencies, errors = asyncio.run(run_load(
+            options['url'], options['paths'], options['requests'], options['concurrency'], token,
+            options['timeout'],
+        ))
+        rss_after = rss_bytes(options['pid']) if options['pid'] else None
+
+        result = {
+            **load_summary(elapsed, latencies, errors),
+            "concurrency": options['concurrency'],
+            "server_rss_mb": {
+                "before": round(rss_before / 2**20, 1) if rss_before else None,
+                "after": round(rss_after / 2**20, 1) if rss_after else None,
+            },
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(result, indent=2))
+            return
+        lat = result["latency_ms"]
+        self.stdout.write(
+            f"{result['requests']} requests in {result['seconds']}s at concurrency {options['concurrency']}: "
+            f"{result['req_per_s']} req/s, p50 {lat['p50']} ms, p95 {lat['p95']} ms, p99 {lat['p99']} ms, "
+            f"{result['errors']} errors {result['error_kinds'] or ''}"
+        )
+        if rss_after:
+            self.stdout.write(f"server RSS {result['server_rss_mb']['before']} -> {result['server_rss_mb']['after']} MiB")
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from seating.models import Seating, RoomSeating, SeatingSummary
+from seating.services.exam_calendar import session_rank
+from seating.services.storage import grid_storage
+from seating.services.summary import stored_summaries, write_summaries
+from seating.services.versions import bump_seating_version, lock_seating_date
+import datetime
+
+class Command(BaseCommand):
+    help = ("Recompute SeatingSummary rows from the stored seating, e.g. for dates generated before "
+            "the summary existed: python manage.py rebuild_seating_summary [--date 2025-11-20]")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=str, help='Only this exam date (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        source = RoomSeating if grid_storage() else Seating
+        # (exam_date, session) of every stored seating, and of summaries left without one
+        keys = set(source.objects.values_list('exam_date', 'session').distinct())
+        keys |= set(SeatingSummary.objects.values_list('exam_date', 'session').distinct())
+        if options['date']:
+            try:
+                exam_date = datetime.date.fromisoformat(options['date'])
+            except ValueError as e:
+                raise CommandError(str(e))
+            keys = {(d, s) for d, s in keys if d == exam_date} or {(exam_date, '')}
+
+        changed = 0
+        for exam_date, session in sorted(keys, key=lambda k: (k[0], session_rank(k[1]))):
+            with transaction.atomic():
+                lock_seating_date(exam_date, session)
+                if write_summaries(exam_date, stored_summaries(exam_date, session), session):
+                    bump_seating_version(exam_date, session)   # drop cached summary responses
+                    changed += 1
+                    self.stdout.write(f"{exam_date}{' ' + session if session else ''}: rebuilt")
+
+        self.stdout.write(self.style.SUCCESS(f"Summaries checked for {len(keys)} seating(s), {changed} rebuilt"))
@@ -0,0 +1,49 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from seating.services.jobs import claim_next_job, run_job
+
+
+def _run_in_thread(job):
+    try:
+        run_job(job)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = "Run queued seating jobs: python manage.py run_seating_worker --threads 2"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=2, help='Jobs run concurrently')
+        parser.add_argument('--poll', type=float, default=1.0, help='Seconds between polls when idle')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        threads = max(1, options['threads'])
+        running = set()
+        self.stdout.write(f"Seating worker started with {threads} thread(s)")
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            try:
+                while True:
+                    close_old_connections()
+                    while len(running) < threads:
+                        job = claim_next_job()
+                        if job is None:
+                            break
+                        self.stdout.write(f"Running {job}")
+                        running.add(pool.submit(_run_in_thread, job))
+
+                    if not running:
+                        if options['once']:
+                            break
+                        time.sleep(options['poll'])
+                        continue
+                    done, running = wait(running, timeout=options['poll'], return_when=FIRST_COMPLETED)
+                    running = set(running)
+            except KeyboardInterrupt:
+                self.stdout.write("Stopping; waiting for running jobs to finish")
@@ -0,0 +1,144 @@
+"""
+Request instrumentation: latency, DB queries and response size per view,
+recorded into services.metrics.METRICS and served at /api/seating/metrics/.
+
+Queries are counted by an execute_wrapper installed on every database
+connection, reporting to the current request's QueryRecorder through a
+context variable (so async views, whose queries run on other threads'
+connections, are counted too). Works with DEBUG off and costs one
+perf_counter pair and a dict update per query.
+Requests slower than settings.SEATING_SLOW_REQUEST_MS are logged to the
+"seating.slow" logger with their most expensive SQL statements.
+"""
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .services.metrics import METRICS
+
+slow_logger = logging.getLogger("seating.slow")
+
+SLOW_SQL_TOP = 5
+SLOW_SQL_CHARS = 300   # bulk INSERTs repeat their VALUES placeholders thousands of times
+
+
+class QueryRecorder:
+    """execute_wrapper collecting {sql: [count, seconds]} for one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.seconds += elapsed
+            stat = self.statements.get(sql)
+            if stat is None:
+                self.statements[sql] = [1, elapsed]
+            else:
+                stat[0] += 1
+                stat[1] += elapsed
+
+    def top(self, n=SLOW_SQL_TOP):
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return [(sql, count, seconds) for sql, (count, seconds) in ranked[:n]]
+
+
+_recorder = ContextVar("seating_query_recorder", default=None)
+
+
+def record_queries(execute, sql, params, many, context):
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_hook(connection, **kwargs):
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_queries)
+
+
+connection_created.connect(install_query_hook)
+
+
+def view_label(request):
+    """View class (or function) name of the resolved URL, else "unmatched"."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    func = match.func
+    view_class = getattr(func, "view_class", None) or getattr(func, "cls", None)
+    return (view_class or func).__name__
+
+
+def response_size(response):
+    if response.streaming:
+        length = response.get("Content-Length")
+        return int(length) if length else None
+    return len(response.content)
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        # a connection opened before the app was ready has no hook yet
+        for alias in connections:
+            install_query_hook(connections[alias])
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        self.record(request, response, recorder, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        self.record(request, response, recorder, time.perf_counter() - start)
+        return response
+
+    def record(self, request, response, recorder, elapsed):
+        view = view_label(request)
+        METRICS.observe(view, request.method, response.status_code, elapsed,
+                        recorder.count, recorder.seconds, response_size(response))
+
+        threshold = getattr(settings, "SEATING_SLOW_REQUEST_MS", 1000)
+        if threshold is not None and elapsed * 1000 >= threshold:
+            lines = [
+                f"  {seconds * 1000:.1f} ms x{count}: {sql[:SLOW_SQL_CHARS]}" for sql, count, seconds in recorder.top()
+            ]
+            slow_logger.warning(
+                "Slow request %s %s (%s) %.0f ms, %d queries in %.0f ms\n%s",
+                request.method, request.path, view, elapsed * 1000,
+                recorder.count, recorder.seconds * 1000, "\n".join(lines),
+            )
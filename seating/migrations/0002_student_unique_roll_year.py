@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:15
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def drop_duplicate_students(apps, schema_editor):
+    """Keep the oldest row of each (roll, year) so the constraint can be added."""
+    Student = apps.get_model('seating', 'Student')
+    dupes = (
+        Student.objects.values('roll', 'year')
+        .annotate(n=Count('id'), keep=Min('id'))
+        .filter(n__gt=1)
+    )
+    for d in dupes:
+        Student.objects.filter(roll=d['roll'], year=d['year']).exclude(id=d['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seating', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_students, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='student',
+            constraint=models.UniqueConstraint(fields=('roll', 'year'), name='unique_student_roll_year'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seating', '0003_seatingversion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='seating',
+            index=models.Index(fields=['roll', 'exam_date'], name='seating_sea_roll_75ac62_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seating', '0005_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='job',
+            name='kind',
+            field=models.CharField(choices=[('generate_seating', 'Generate seating'), ('generate_batch', 'Generate seating for many dates'), ('upload_students', 'Upload students'), ('upload_timetable', 'Upload timetable')], max_length=32),
+        ),
+    ]
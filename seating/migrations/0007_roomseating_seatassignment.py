@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seating', '0006_job_generate_batch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomSeating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('exam_date', models.DateField()),
+                ('rows', models.PositiveIntegerField()),
+                ('columns', models.PositiveIntegerField(default=9)),
+                ('rolls', models.JSONField(default=list)),
+                ('years', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='seating.room')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('exam_date', 'room'), name='unique_room_seating_date_room')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SeatAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('roll', models.CharField(max_length=128)),
+                ('exam_date', models.DateField()),
+                ('row_index', models.PositiveIntegerField()),
+                ('col_index', models.PositiveIntegerField()),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='seating.room')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['roll', 'exam_date'], name='seating_sea_roll_aec89f_idx'), models.Index(fields=['exam_date', 'room'], name='seating_sea_exam_da_e064b0_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seating', '0007_roomseating_seatassignment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomUnavailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('reason', models.CharField(blank=True, max_length=255)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='columns',
+            field=models.PositiveSmallIntegerField(default=9),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['is_active', 'capacity'], name='seating_roo_is_acti_709be0_idx'),
+        ),
+        migrations.AddField(
+            model_name='roomunavailability',
+            name='room',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unavailable', to='seating.room'),
+        ),
+        migrations.AddIndex(
+            model_name='roomunavailability',
+            index=models.Index(fields=['start_date', 'end_date'], name='seating_roo_start_d_9d381c_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seating', '0008_room_inventory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatingSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('exam_date', models.DateField()),
+                ('seats', models.PositiveIntegerField()),
+                ('students', models.PositiveIntegerField()),
+                ('year_1', models.PositiveIntegerField(default=0)),
+                ('year_2', models.PositiveIntegerField(default=0)),
+                ('year_3', models.PositiveIntegerField(default=0)),
+                ('first_roll', models.CharField(blank=True, max_length=128)),
+                ('last_roll', models.CharField(blank=True, max_length=128)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='seating.room')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('exam_date', 'room'), name='unique_seating_summary_date_room')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seating', '0010_upload_dedupe'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RosterVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(choices=[(1, 'I'), (2, 'II'), (3, 'III')], unique=True)),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['year', 'roll'], name='student_year_roll_idx'),
+        ),
+    ]
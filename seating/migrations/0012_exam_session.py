@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:00
+
+from django.db import migrations, models
+
+
+def sessions_from_timetable(apps, schema_editor):
+    """Each existing timetable row becomes a forenoon session per year with a paper."""
+    TimetableRow = apps.get_model('seating', 'TimetableRow')
+    ExamSession = apps.get_model('seating', 'ExamSession')
+    sessions = []
+    for row in TimetableRow.objects.all():
+        for year, subject in enumerate((row.i_year_subject, row.ii_year_subject, row.iii_year_subject), 1):
+            subject = (subject or "").strip()
+            if subject and subject not in ("-", "\u2014"):
+                sessions.append(ExamSession(date=row.date, session='FN', year=year, subject=subject))
+    ExamSession.objects.bulk_create(sessions, batch_size=1000, ignore_conflicts=True)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seating', '0011_roster_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('session', models.CharField(choices=[('FN', 'Forenoon'), ('AN', 'Afternoon')], default='FN', max_length=2)),
+                ('year', models.PositiveSmallIntegerField()),
+                ('subject', models.CharField(max_length=255)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('date', 'session', 'year'), name='unique_exam_session_year')],
+            },
+        ),
+        migrations.RunPython(sessions_from_timetable, migrations.RunPython.noop),
+    ]
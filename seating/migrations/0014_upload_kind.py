@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:19
+
+from django.db import migrations, models
+
+
+def kind_from_description(apps, schema_editor):
+    """Timetable uploads were the ones described as "timetable"."""
+    UploadedFile = apps.get_model('seating', 'UploadedFile')
+    UploadedFile.objects.filter(description='timetable').update(kind='timetable')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seating', '0013_job_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadedfile',
+            name='kind',
+            field=models.CharField(choices=[('students', 'Students'), ('timetable', 'Timetable')], default='students', max_length=16),
+        ),
+        migrations.RunPython(kind_from_description, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:21
+
+from django.db import migrations, models
+
+
+def years_from_columns(apps, schema_editor):
+    """year_1..year_3 -> {"1": n, ...}, leaving out years with nobody seated."""
+    SeatingSummary = apps.get_model('seating', 'SeatingSummary')
+    rows = list(SeatingSummary.objects.all())
+    for row in rows:
+        counts = (row.year_1, row.year_2, row.year_3)
+        row.years = {str(year): n for year, n in enumerate(counts, 1) if n}
+    SeatingSummary.objects.bulk_update(rows, ['years'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seating', '0014_upload_kind'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seatingsummary',
+            name='years',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(years_from_columns, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='seatingsummary',
+            name='year_1',
+        ),
+        migrations.RemoveField(
+            model_name='seatingsummary',
+            name='year_2',
+        ),
+        migrations.RemoveField(
+            model_name='seatingsummary',
+            name='year_3',
+        ),
+        migrations.AddField(
+            model_name='seatingversion',
+            name='session',
+            field=models.CharField(blank=True, max_length=2),
+        ),
+        migrations.AlterField(
+            model_name='rosterversion',
+            name='year',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'I'), (2, 'II'), (3, 'III'), (4, 'IV'), (5, 'V'), (6, 'VI'), (7, 'VII'), (8, 'VIII')], unique=True),
+        ),
+        migrations.AlterField(
+            model_name='seating',
+            name='year',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'I'), (2, 'II'), (3, 'III'), (4, 'IV'), (5, 'V'), (6, 'VI'), (7, 'VII'), (8, 'VIII')]),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='year',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'I'), (2, 'II'), (3, 'III'), (4, 'IV'), (5, 'V'), (6, 'VI'), (7, 'VII'), (8, 'VIII')]),
+        ),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:31
+
+from django.db import migrations, models
+
+
+def sessions_from_versions(apps, schema_editor):
+    """Seating stored for one session (SeatingVersion.session) moves under that session's key."""
+    SeatingVersion = apps.get_model('seating', 'SeatingVersion')
+    for exam_date, session in SeatingVersion.objects.exclude(session='').values_list('exam_date', 'session'):
+        for name in ('Seating', 'RoomSeating', 'SeatAssignment', 'SeatingSummary'):
+            apps.get_model('seating', name).objects.filter(exam_date=exam_date).update(session=session)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seating', '0015_session_and_generic_years'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='roomseating',
+            name='unique_room_seating_date_room',
+        ),
+        migrations.RemoveConstraint(
+            model_name='seatingsummary',
+            name='unique_seating_summary_date_room',
+        ),
+        migrations.RemoveIndex(
+            model_name='seatassignment',
+            name='seating_sea_roll_aec89f_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='seatassignment',
+            name='seating_sea_exam_da_e064b0_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='seating',
+            name='seating_sea_exam_da_dbe3b6_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='seating',
+            name='seating_sea_roll_75ac62_idx',
+        ),
+        migrations.AddField(
+            model_name='roomseating',
+            name='session',
+            field=models.CharField(blank=True, default='', max_length=2),
+        ),
+        migrations.AddField(
+            model_name='seatassignment',
+            name='session',
+            field=models.CharField(blank=True, default='', max_length=2),
+        ),
+        migrations.AddField(
+            model_name='seating',
+            name='session',
+            field=models.CharField(blank=True, default='', max_length=2),
+        ),
+        migrations.AddField(
+            model_name='seatingsummary',
+            name='session',
+            field=models.CharField(blank=True, default='', max_length=2),
+        ),
+        migrations.AlterField(
+            model_name='seatingversion',
+            name='exam_date',
+            field=models.DateField(),
+        ),
+        migrations.AlterField(
+            model_name='seatingversion',
+            name='session',
+            field=models.CharField(blank=True, default='', max_length=2),
+        ),
+        migrations.RunPython(sessions_from_versions, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='seatassignment',
+            index=models.Index(fields=['roll', 'exam_date', 'session'], name='seating_sea_roll_d3d468_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seatassignment',
+            index=models.Index(fields=['exam_date', 'session', 'room'], name='seating_sea_exam_da_68e665_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seating',
+            index=models.Index(fields=['exam_date', 'session', 'room'], name='seating_sea_exam_da_9d7b03_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seating',
+            index=models.Index(fields=['roll', 'exam_date', 'session'], name='seating_sea_roll_cc2297_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='roomseating',
+            constraint=models.UniqueConstraint(fields=('exam_date', 'session', 'room'), name='unique_room_seating_date_session_room'),
+        ),
+        migrations.AddConstraint(
+            model_name='seatingsummary',
+            constraint=models.UniqueConstraint(fields=('exam_date', 'session', 'room'), name='unique_seating_summary_date_session_room'),
+        ),
+        migrations.AddConstraint(
+            model_name='seatingversion',
+            constraint=models.UniqueConstraint(fields=('exam_date', 'session'), name='unique_seating_version_date_session'),
+        ),
+    ]
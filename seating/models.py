@@ -1,10 +1,22 @@
 from django.db import models
 
+# years I-VIII, as the timetable import reads them
+YEAR_CHOICES = [(1,'I'),(2,'II'),(3,'III'),(4,'IV'),(5,'V'),(6,'VI'),(7,'VII'),(8,'VIII')]
+
 class UploadedFile(models.Model):
     """Store uploaded Excel files (students or timetable)."""
+    STUDENTS = 'students'
+    TIMETABLE = 'timetable'
+    KIND_CHOICES = [(STUDENTS, 'Students'), (TIMETABLE, 'Timetable')]
+
     file = models.FileField(upload_to='uploads/%Y/%m/%d/')
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES, default=STUDENTS)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     description = models.CharField(max_length=255, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True)   # content hash, for dedupe
+    size = models.BigIntegerField(blank=True, null=True)
+    result = models.JSONField(blank=True, null=True)                      # latest import result
+    last_used_at = models.DateTimeField(blank=True, null=True)            # last re-upload or re-import
 
     def __str__(self):
         return f"{self.description or self.file.name} ({self.uploaded_at})"
@@ -12,10 +24,19 @@ class UploadedFile(models.Model):
 
 class Student(models.Model):
     roll = models.CharField(max_length=128, db_index=True)
-    year = models.PositiveSmallIntegerField(choices=[(1,'I'),(2,'II'),(3,'III')])
+    year = models.PositiveSmallIntegerField(choices=YEAR_CHOICES)
     uploaded_file = models.ForeignKey(UploadedFile, on_delete=models.SET_NULL, null=True, blank=True)
     extra = models.JSONField(blank=True, null=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['roll','year'], name='unique_student_roll_year'),
+        ]
+        indexes = [
+            # one cohort's rolls in order, read from the index alone (services/roster.py)
+            models.Index(fields=['year', 'roll'], name='student_year_roll_idx'),
+        ]
+
     def __str__(self):
         return f"{self.roll} (Year {self.year})"
 
@@ -30,19 +51,68 @@ class TimetableRow(models.Model):
         return str(self.date)
 
 
+class ExamSession(models.Model):
+    """One year's paper in one session of an exam day; written by the timetable import."""
+    FORENOON = 'FN'
+    AFTERNOON = 'AN'
+    SESSIONS = [(FORENOON, 'Forenoon'), (AFTERNOON, 'Afternoon')]
+
+    date = models.DateField()
+    session = models.CharField(max_length=2, choices=SESSIONS, default=FORENOON)
+    year = models.PositiveSmallIntegerField()
+    subject = models.CharField(max_length=255)
+
+    class Meta:
+        constraints = [
+            # also the calendar's (date, session) range index
+            models.UniqueConstraint(fields=['date','session','year'], name='unique_exam_session_year'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.session} Year {self.year}: {self.subject}"
+
+
 class Room(models.Model):
     code = models.CharField(max_length=64, unique=True)
     capacity = models.PositiveIntegerField()
+    columns = models.PositiveSmallIntegerField(default=9)   # seats per row
+    is_active = models.BooleanField(default=True)            # part of the inventory used for seating
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_active','capacity']),
+        ]
+
+    @property
+    def rows(self):
+        return self.capacity // self.columns if self.columns else 0
+
     def __str__(self):
         return f"{self.code} ({self.capacity})"
 
 
+class RoomUnavailability(models.Model):
+    """Availability calendar: room cannot be used from start_date to end_date (inclusive)."""
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='unavailable')
+    start_date = models.DateField()
+    end_date = models.DateField()
+    reason = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['start_date','end_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.room} unavailable {self.start_date}..{self.end_date}"
+
+
 class Seating(models.Model):
     room = models.ForeignKey(Room, on_delete=models.CASCADE)
     exam_date = models.DateField()
-    year = models.PositiveSmallIntegerField(choices=[(1,'I'),(2,'II'),(3,'III')])
+    session = models.CharField(max_length=2, blank=True, default='')   # "FN"/"AN", "" for the whole day
+    year = models.PositiveSmallIntegerField(choices=YEAR_CHOICES)
     roll = models.CharField(max_length=128, blank=True)
     row_index = models.PositiveIntegerField()   # 0-indexed row in that room
     col_index = models.PositiveIntegerField()   # 0-indexed column (0..8)
@@ -50,8 +120,145 @@ class Seating(models.Model):
 
     class Meta:
         indexes = [
-            models.Index(fields=['exam_date','room']),
+            models.Index(fields=['exam_date','session','room']),
+            models.Index(fields=['roll','exam_date','session']),
+        ]
+
+    def __str__(self):
+        return f"{self.roll} in {self.room} on {self.exam_date} r{self.row_index}c{self.col_index}"
+
+
+class RoomSeating(models.Model):
+    """
+    Compact storage (SEATING_STORAGE = "grid"): one record per exam date,
+    session and room holding the whole grid, row-major, empty seats as "".
+    """
+    room = models.ForeignKey(Room, on_delete=models.CASCADE)
+    exam_date = models.DateField()
+    session = models.CharField(max_length=2, blank=True, default='')
+    rows = models.PositiveIntegerField()
+    columns = models.PositiveIntegerField(default=9)
+    rolls = models.JSONField(default=list)    # rows*columns rolls
+    years = models.JSONField(default=list)    # rows*columns years
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['exam_date','session','room'], name='unique_room_seating_date_session_room'),
+        ]
+
+    def __str__(self):
+        return f"{self.room} on {self.exam_date} ({self.rows}x{self.columns})"
+
+
+class SeatAssignment(models.Model):
+    """Roll lookup derived from RoomSeating: one row per occupied seat."""
+    roll = models.CharField(max_length=128)
+    exam_date = models.DateField()
+    session = models.CharField(max_length=2, blank=True, default='')
+    room = models.ForeignKey(Room, on_delete=models.CASCADE)
+    row_index = models.PositiveIntegerField()
+    col_index = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['roll','exam_date','session']),
+            models.Index(fields=['exam_date','session','room']),
         ]
 
     def __str__(self):
         return f"{self.roll} in {self.room} on {self.exam_date} r{self.row_index}c{self.col_index}"
+
+
+class SeatingSummary(models.Model):
+    """
+    Per (exam_date, session, room) occupancy, written with the seating
+    itself so summary endpoints read one row per room instead of every seat.
+    """
+    room = models.ForeignKey(Room, on_delete=models.CASCADE)
+    exam_date = models.DateField()
+    session = models.CharField(max_length=2, blank=True, default='')
+    seats = models.PositiveIntegerField()
+    students = models.PositiveIntegerField()
+    years = models.JSONField(default=dict, blank=True)   # {"1": students of year I, ...}
+    first_roll = models.CharField(max_length=128, blank=True)
+    last_roll = models.CharField(max_length=128, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['exam_date','session','room'], name='unique_seating_summary_date_session_room'),
+        ]
+
+    @property
+    def empty_seats(self):
+        return self.seats - self.students
+
+    def __str__(self):
+        return f"{self.room} on {self.exam_date}: {self.students}/{self.seats}"
+
+
+class SeatingVersion(models.Model):
+    """Bumped every time seating for (exam_date, session) is (re)generated; keys caches and exports."""
+    exam_date = models.DateField()
+    session = models.CharField(max_length=2, blank=True, default='')   # "FN"/"AN", "" for the whole day
+    version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['exam_date','session'], name='unique_seating_version_date_session'),
+        ]
+
+    def __str__(self):
+        return f"{self.exam_date} {self.session or 'day'} v{self.version}"
+
+
+class RosterVersion(models.Model):
+    """Bumped every time a year's students change; keys the generator's roster cache."""
+    year = models.PositiveSmallIntegerField(unique=True, choices=YEAR_CHOICES)
+    version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Year {self.year} v{self.version}"
+
+
+class Job(models.Model):
+    """Background work item, claimed and run by `manage.py run_seating_worker`."""
+    GENERATE_SEATING = 'generate_seating'
+    GENERATE_BATCH = 'generate_batch'
+    UPLOAD_STUDENTS = 'upload_students'
+    UPLOAD_TIMETABLE = 'upload_timetable'
+    KIND_CHOICES = [
+        (GENERATE_SEATING, 'Generate seating'),
+        (GENERATE_BATCH, 'Generate seating for many dates'),
+        (UPLOAD_STUDENTS, 'Upload students'),
+        (UPLOAD_TIMETABLE, 'Upload timetable'),
+    ]
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    payload = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True)
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    # refreshed while the job runs; see services/jobs.py
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status','created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
@@ -0,0 +1,281 @@
+"""
+Seat allocation strategies for the planner.
+
+A strategy is a function
+
+    allocate(counts, shapes) -> iterator of rooms
+
+where counts is {year: number of students} and shapes lists the (rows,
+columns) of the rooms that may be opened, in order of preference; a
+strategy fills a prefix of them, using as few as it can. Each room it
+yields is a pair (years, rolls) of flat sequences of length rows*columns
+in column-major order (index = col * rows + row): the year of every seat
+and the index of its roll within that year's roll list, or EMPTY. Rolls of
+a year must be handed out in order (0, 1, 2, ...) across rooms.
+Strategies only deal in counts and indexes, so they stay pure and cheap
+to run in a process pool.
+
+Register new strategies with @register("name").
+"""
+from math import ceil
+
+EMPTY = -1
+
+STRATEGIES = {}
+
+
+def register(name):
+    def wrap(fn):
+        STRATEGIES[name] = fn
+        return fn
+    return wrap
+
+
+def get_allocator(name):
+    try:
+        return STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown seating strategy '{name}' (choose from {', '.join(sorted(STRATEGIES))})")
+
+
+# ---------------------- CYCLIC ----------------------
+def build_pattern(counts, columns):
+    """Cycle years across the columns, largest cohort first."""
+    sorted_years = sorted(counts, key=lambda y: counts[y], reverse=True)
+    pattern = []
+    while len(pattern) < columns:
+        pattern.extend(sorted_years)
+    return pattern[:columns]
+
+
+@register("cyclic")
+def allocate_cyclic(counts, shapes):
+    """
+    The original layout: whole columns per year following build_pattern(),
+    rooms filled one after another; a column whose year has run out is
+    left empty.
+    """
+    remaining = dict(counts)
+    taken = dict.fromkeys(counts, 0)
+    for rows, columns in shapes:
+        if not any(remaining.values()):
+            return
+        years, rolls = [], []
+        for yr in build_pattern(counts, columns):
+            n = min(rows, remaining[yr])
+            start = taken[yr]
+            rolls.extend(range(start, start + n))
+            rolls.extend([EMPTY] * (rows - n))
+            years.extend([yr] * rows)
+            taken[yr] += n
+            remaining[yr] -= n
+        yield years, rolls
+
+
+# ---------------------- BALANCED ----------------------
+def apportion(total, weights):
+    """Split total in proportion to weights (largest remainder method)."""
+    weight_sum = sum(weights)
+    if not weight_sum:
+        return [0] * len(weights)
+    exact = [total * w / weight_sum for w in weights]
+    shares = [int(x) for x in exact]
+    by_remainder = sorted(range(len(weights)), key=lambda i: shares[i] - exact[i])
+    for i in by_remainder[:total - sum(shares)]:
+        shares[i] += 1
+    return shares
+
+
+def row_cap(rows, columns):
+    """Most students of one year a room seats with none side by side: every other seat of a row."""
+    return rows * ceil(columns / 2)
+
+
+def apportion_capped(total, weights, caps):
+    """
+    apportion() with shares[i] <= caps[i]: what a capped share cannot take
+    is spread over the others, again in proportion to weights (or to
+    their room left once their weights run out). Never more than sum(caps).
+    """
+    shares = [0] * len(weights)
+    left = min(total, sum(caps))
+    open_ = [i for i, cap in enumerate(caps) if cap > 0]
+    while left and open_:
+        part = [weights[i] for i in open_]
+        if not sum(part):
+            part = [caps[i] - shares[i] for i in open_]
+        for i, n in zip(open_, apportion(left, part)):
+            n = min(n, caps[i] - shares[i])
+            shares[i] += n
+            left -= n
+        open_ = [i for i in open_ if shares[i] < caps[i]]
+    return shares
+
+
+def split_counts(counts, shapes):
+    """
+    Per-room year counts for rooms of the given (rows, columns) shapes.
+    Rooms are filled in proportion to their seats; years are shared out
+    largest first, each in proportion to the quota a room has left, but
+    never more than row_cap() of one year per room. Students beyond every
+    room's cap are seated wherever seats are left (no layout keeps them
+    apart); students beyond the seats are left out.
+    """
+    seats = [rows * columns for rows, columns in shapes]
+    caps = [row_cap(rows, columns) for rows, columns in shapes]
+    quota = apportion(min(sum(counts.values()), sum(seats)), seats)
+    per_room = [dict.fromkeys(counts, 0) for _ in shapes]
+    for y in sorted(counts, key=lambda y: counts[y], reverse=True):
+        shares = apportion_capped(counts[y], quota, [min(c, s) for c, s in zip(caps, seats)])
+        extra = apportion_capped(counts[y] - sum(shares), quota, [s - n for s, n in zip(seats, shares)])
+        for i, n in enumerate(map(sum, zip(shares, extra))):
+            per_room[i][y] = n
+            quota[i] = max(quota[i] - n, 0)
+            seats[i] -= n
+    return per_room
+
+
+def _fits(counts, shapes):
+    """True if split_counts() seats everyone with no room over a year's row_cap()."""
+    per_room = split_counts(counts, shapes)
+    return all(
+        sum(room[y] for room in per_room) == n for y, n in counts.items()
+    ) and all(
+        max(room.values(), default=0) <= row_cap(rows, columns) for room, (rows, columns) in zip(per_room, shapes)
+    )
+
+
+def _greedy_room(room_counts, rows, columns):
+    """
+    Row-major greedy fill of one room: each seat takes the year with the
+    most students left that differs from its left neighbour; when only the
+    neighbour's year is left an empty seat is used as a separator if any
+    remain. Returns a rows x columns int array (0 = empty).
+    """
+    import numpy as np   # imported here so only the balanced strategy loads numpy
+    grid = np.zeros((rows, columns), dtype=np.int16)
+    left = dict(room_counts)
+    empties = rows * columns - sum(left.values())
+    for r in range(rows):
+        prev = 0
+        for c in range(columns):
+            choices = [y for y in left if left[y] and y != prev]
+            if not choices:
+                if empties:
+                    empties -= 1
+                    prev = 0
+                    continue
+                choices = [y for y in left if left[y]]   # unavoidable conflict
+            y = max(choices, key=lambda y: left[y])
+            grid[r, c] = y
+            left[y] -= 1
+            prev = y
+    return grid
+
+
+def _conflicts(grid):
+    """Mask of seats with the same (non-empty) year as their right neighbour."""
+    import numpy as np
+    same = (grid[:, 1:] == grid[:, :-1]) & (grid[:, 1:] != 0)
+    mask = np.zeros(grid.shape, dtype=bool)
+    mask[:, :-1] = same
+    return mask
+
+
+def _neighbours(grid):
+    import numpy as np
+    left = np.zeros_like(grid)
+    right = np.zeros_like(grid)
+    left[:, 1:] = grid[:, :-1]
+    right[:, :-1] = grid[:, 1:]
+    return left, right
+
+
+def _local_search(grid, max_passes=3):
+    """
+    Repair same-year horizontal neighbours by swapping one of the pair with
+    a seat elsewhere in the room (possibly an empty one) when the swap
+    creates no new conflict. Stops when clean or no swap helps.
+    """
+    import numpy as np
+    for _ in range(max_passes):
+        conflicts = np.argwhere(_conflicts(grid))
+        if not len(conflicts):
+            return grid
+        improved = False
+        for r, c in conflicts:
+            c = c + 1   # move the right-hand seat of the pair
+            y = grid[r, c]
+            if grid[r, c - 1] != y:
+                continue   # already fixed by an earlier swap
+            left, right = _neighbours(grid)
+            ln = grid[r, c - 1]
+            rn = grid[r, c + 1] if c + 1 < grid.shape[1] else 0
+            ok = (
+                (grid != y)
+                & ((grid != ln) | (grid == 0))
+                & ((grid != rn) | (grid == 0))
+                & (left != y)
+                & (right != y)
+            )
+            # the target's own neighbours change if it is next to (r, c)
+            ok[r, max(c - 1, 0):c + 2] = False
+            candidates = np.argwhere(ok)
+            if not len(candidates):
+                continue
+            r2, c2 = candidates[0]
+            grid[r, c], grid[r2, c2] = grid[r2, c2], grid[r, c]
+            improved = True
+        if not improved:
+            break
+    return grid
+
+
+def rooms_needed(counts, shapes):
+    """
+    Fewest leading shapes that can seat everyone with no same-year
+    horizontal neighbours (no room holds more than row_cap() of a year),
+    or all of them when that is not possible.
+    """
+    total = sum(counts.values())
+    largest = max(counts.values(), default=0)
+    seats = alternate = 0
+    for n, (rows, columns) in enumerate(shapes, 1):
+        seats += rows * columns
+        alternate += row_cap(rows, columns)
+        # the totals are cheap to check; the per-room split only once they pass
+        if seats >= total and alternate >= largest and _fits(counts, shapes[:n]):
+            return n
+    return len(shapes)
+
+
+@register("balanced")
+def allocate_balanced(counts, shapes):
+    """
+    Open the fewest rooms in which no two same-year students sit side by
+    side (falling back to every room in shapes when that is not enough),
+    fill them in proportion to their size, give each room its share of
+    every year within its row_cap() (split_counts) and place seats
+    greedily, then repair leftover conflicts with local search swaps.
+    Empty seats are used as separators when one year dominates.
+    """
+    import numpy as np
+    if not sum(counts.values()):
+        return
+    shapes = shapes[:rooms_needed(counts, shapes)]
+    taken = dict.fromkeys(counts, 0)
+    for (rows, columns), room_counts in zip(shapes, split_counts(counts, shapes)):
+        grid = _local_search(_greedy_room(room_counts, rows, columns))
+
+        # rolls go out in reading order (row-major) within each year
+        roll_grid = np.full(grid.shape, EMPTY, dtype=np.int64)
+        for y, n in room_counts.items():
+            if n:
+                positions = np.nonzero(grid == y)
+                roll_grid[positions] = np.arange(taken[y], taken[y] + n)
+                taken[y] += n
+
+        # empty seats carry the room's main year
+        main_year = max(room_counts, key=lambda y: room_counts[y])
+        years = np.where(grid == 0, main_year, grid)
+        yield years.T.ravel().tolist(), roll_grid.T.ravel().tolist()
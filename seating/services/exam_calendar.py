@@ -0,0 +1,76 @@
+"""
+The exam calendar: which years sit which session on which day.
+
+The timetable import writes one ExamSession per (date, session, year), so
+readers get the calendar from one indexed range query instead of string
+checks on every TimetableRow. Timetable rows entered without sessions
+(through the admin, or created directly) count as a single forenoon
+session for years I-III.
+"""
+from ..models import ExamSession, TimetableRow
+
+SESSION_ORDER = [code for code, _ in ExamSession.SESSIONS]
+LEGACY_COLUMNS = ("i_year_subject", "ii_year_subject", "iii_year_subject")
+
+
+def session_rank(session):
+    """Sort key for stored seating's sessions: the whole day (""), then SESSION_ORDER."""
+    return SESSION_ORDER.index(session) + 1 if session else 0
+
+
+def has_exam(cell_value):
+    if cell_value is None or cell_value != cell_value: return False   # blank or NaN
+    if str(cell_value).strip() in ["", "-", "—"]: return False
+    return True
+
+
+def sittings(dates=None, date_from=None, date_to=None):
+    """
+    {date: [(session, year, subject), ...]} for every timetable date
+    (in dates, if given, and within [date_from, date_to]), in session then
+    year order. A date whose row lists no papers maps to []. Two queries.
+    """
+    rows = TimetableRow.objects.all()
+    sessions = ExamSession.objects.all()
+    if dates is not None:
+        dates = list(dates)
+        rows = rows.filter(date__in=dates)
+        sessions = sessions.filter(date__in=dates)
+    if date_from:
+        rows = rows.filter(date__gte=date_from)
+        sessions = sessions.filter(date__gte=date_from)
+    if date_to:
+        rows = rows.filter(date__lte=date_to)
+        sessions = sessions.filter(date__lte=date_to)
+
+    by_date = {}
+    for d, session, year, subject in sessions.values_list("date", "session", "year", "subject"):
+        by_date.setdefault(d, []).append((session, year, subject))
+    for d, *subjects in rows.values_list("date", *LEGACY_COLUMNS):
+        if d not in by_date:
+            by_date[d] = [(ExamSession.FORENOON, year, s.strip())
+                          for year, s in enumerate(subjects, 1) if has_exam(s)]
+
+    return {
+        d: sorted(by_date[d], key=lambda s: (SESSION_ORDER.index(s[0]), s[1]))
+        for d in sorted(by_date)
+    }
+
+
+def years_sitting(day_sittings, session=None):
+    """Years sitting on a day (all sessions, or just session), ascending."""
+    return sorted({year for s, year, _ in day_sittings if session is None or s == session})
+
+
+def exam_calendar(date_from=None, date_to=None):
+    """The calendar endpoint's payload: per date, per session, the years sitting and their papers."""
+    calendar = []
+    for d, day in sittings(date_from=date_from, date_to=date_to).items():
+        sessions = {}
+        for session, year, subject in day:
+            sessions.setdefault(session, []).append({"year": year, "subject": subject})
+        calendar.append({
+            "date": d.isoformat(),
+            "sessions": [{"session": s, "years": years} for s, years in sessions.items()],
+        })
+    return {"dates": calendar}
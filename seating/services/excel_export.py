@@ -0,0 +1,131 @@
+"""
+Excel export of a date's seating.
+
+Workbooks are built with openpyxl's write-only mode (rows are flushed to
+disk as they are appended) and cached under MEDIA_ROOT/exports, keyed by
+exam date, session and seating version, so repeat downloads are served
+from disk.
+"""
+import os
+import re
+import tempfile
+
+from django.conf import settings
+
+from . import xlsx
+from .planner import TOTAL_COLUMNS
+from .storage import has_seating, room_grids
+from .versions import get_seating_version
+
+EXPORT_DIR = "exports"
+
+
+def export_dir():
+    path = os.path.join(settings.MEDIA_ROOT, EXPORT_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def export_stem(exam_date, session=""):
+    """seating-2025-11-20, or seating-2025-11-20-FN for one session's seating."""
+    return f"seating-{exam_date}-{session}" if session else f"seating-{exam_date}"
+
+
+def export_path(exam_date, version, session=""):
+    return os.path.join(export_dir(), f"{export_stem(exam_date, session)}-v{version}.xlsx")
+
+
+def sheet_title(room_code):
+    """Excel sheet titles: max 31 chars, none of []:*?/\\"""
+    return re.sub(r"[\[\]:*?/\\]", "-", room_code)[:31] or "Room"
+
+
+def _cell(ws, value, bold=False, border=True):
+    box, center, bold_font = xlsx.cell_styles()
+    c = xlsx.write_only_cell(ws, value)
+    c.alignment = center
+    if border:
+        c.border = box
+    if bold:
+        c.font = bold_font
+    return c
+
+
+def seating_title(exam_date, session=""):
+    return f"{exam_date} {session}" if session else str(exam_date)
+
+
+def write_room_sheet(ws, exam_date, room_code, grid, session=""):
+    columns = max((len(r) for r in grid), default=TOTAL_COLUMNS)
+    for c in range(1, columns + 1):
+        ws.column_dimensions[xlsx.column_letter(c)].width = 14
+    ws.append([_cell(ws, f"Room {room_code} - {seating_title(exam_date, session)}", bold=True, border=False)])
+    ws.append([_cell(ws, f"Column {c}", bold=True) for c in range(1, columns + 1)])
+    for row in grid:
+        ws.append([_cell(ws, roll) for roll in row])
+
+
+def build_seating_workbook(exam_date, path, session=""):
+    """Write the workbook for (exam_date, session) to path; returns the number of rooms."""
+    wb = xlsx.new_workbook(write_only=True)
+    summary = wb.create_sheet("Summary")
+    summary_rows = []
+    for code, grid in room_grids(exam_date, session=session):
+        ws = wb.create_sheet(sheet_title(code))
+        write_room_sheet(ws, exam_date, code, grid, session)
+        students = sum(1 for row in grid for roll in row if roll)
+        seats = sum(len(row) for row in grid)
+        summary_rows.append((code, students, seats - students))
+
+    summary.column_dimensions["A"].width = 16
+    summary.append([_cell(summary, f"Seating for {seating_title(exam_date, session)}", bold=True, border=False)])
+    summary.append([_cell(summary, h, bold=True) for h in ("Room", "Students", "Empty seats")])
+    for row in summary_rows:
+        summary.append([_cell(summary, v) for v in row])
+    summary.append([
+        _cell(summary, "Total", bold=True),
+        _cell(summary, sum(r[1] for r in summary_rows), bold=True),
+        _cell(summary, sum(r[2] for r in summary_rows), bold=True),
+    ])
+    wb.save(path)
+    return len(summary_rows)
+
+
+def get_seating_export(exam_date, session=""):
+    """
+    Path of the cached workbook for (exam_date, session), building it if
+    needed. Returns None when no such seating has been generated.
+    """
+    version, _ = get_seating_version(exam_date, session)
+    if not version and not has_seating(exam_date, session):
+        return None
+    path = export_path(exam_date, version, session)
+    if os.path.exists(path):
+        return path
+
+    save_export(path, lambda tmp: build_seating_workbook(exam_date, tmp, session))
+    # drop exports of older versions of this seating
+    prune_exports(f"{export_stem(exam_date, session)}-v", keep=os.path.basename(path))
+    return path
+
+
+def save_export(path, build):
+    """Run build(tmp_path) and move the file into place, so readers never see a partial export."""
+    fd, tmp = tempfile.mkstemp(suffix=os.path.splitext(path)[1], dir=export_dir())
+    os.close(fd)
+    try:
+        build(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def prune_exports(prefix, keep):
+    """Delete the exports whose file name starts with prefix but not with keep."""
+    for name in os.listdir(export_dir()):
+        if name.startswith(prefix) and not name.startswith(keep):
+            try:
+                os.unlink(os.path.join(export_dir(), name))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,215 @@
+"""
+DB-backed job queue for seating generation and uploads.
+
+Jobs are rows in the Job table; `manage.py run_seating_worker` claims
+pending jobs with a conditional UPDATE (safe with several workers on both
+SQLite and Postgres) and runs them on a thread pool. No broker needed.
+A running job's heartbeat is refreshed while it runs; one whose heartbeat
+goes stale (its worker died) is claimed again like a pending job.
+"""
+import datetime
+import logging
+import queue
+import threading
+
+from django.db import DatabaseError, connection
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import Job, UploadedFile
+from .seating_generator import generate_seating_for_date, generate_seating_batch
+from .spreadsheet import iter_rolls
+from .student_import import import_students
+from .timetable_import import import_timetable
+from .uploads import record_result, upload_rows
+
+logger = logging.getLogger(__name__)
+
+# seconds between heartbeats of a running job
+HEARTBEAT_INTERVAL = 30
+# a running job whose heartbeat is older than this is reclaimed; generous,
+# since on SQLite heartbeats wait for the job's own write transaction
+STALE_AFTER = datetime.timedelta(minutes=10)
+
+
+class ProgressReporter:
+    """
+    Writes job progress and heartbeats from a side thread with its own DB
+    connection, so they are visible to the status endpoint and other
+    workers while the job's own transaction is still open. Best effort:
+    failures (e.g. SQLite write locks) are ignored and the final progress
+    is written when the job finishes.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self._queue = queue.Queue()
+        self._latest = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __call__(self, done, total):
+        self._queue.put((done, total))
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    self._write(self._latest)
+                    continue
+                if item is None:
+                    return
+                # coalesce to the latest value
+                while not self._queue.empty():
+                    nxt = self._queue.get_nowait()
+                    if nxt is None:
+                        self._write(item)
+                        return
+                    item = nxt
+                self._write(item)
+        finally:
+            connection.close()
+
+    def _write(self, item):
+        """Heartbeat, with the progress (done, total) when item is given."""
+        self._latest = item or self._latest
+        fields = {"progress": item[0], "total": item[1]} if item else {}
+        try:
+            Job.objects.filter(pk=self.job_id).update(heartbeat_at=timezone.now(), **fields)
+        except DatabaseError:
+            pass
+
+
+# ---------------------- HANDLERS ----------------------
+def _generate_seating(payload, progress):
+    counts = generate_seating_for_date(
+        datetime.date.fromisoformat(payload["date"]),
+        payload["capacity"],
+        payload["rooms"] or 999,
+        payload["start"],
+        progress=progress,
+        strategy=payload.get("strategy", "cyclic"),
+        inventory=payload.get("inventory", False),
+        session=payload.get("session"),
+    )
+    return counts, counts["rooms"]
+
+
+def _generate_batch(payload, progress):
+    dates = payload.get("dates")
+    results = generate_seating_batch(
+        [datetime.date.fromisoformat(d) for d in dates] if dates is not None else None,
+        payload["capacity"],
+        payload["rooms"] or 999,
+        payload["start"],
+        progress=progress,
+        strategy=payload.get("strategy", "cyclic"),
+        inventory=payload.get("inventory", False),
+        session=payload.get("session"),
+    )
+    return {"dates": results}, len(results)
+
+
+def _upload_students(payload, progress):
+    uf = UploadedFile.objects.get(pk=payload["uploaded_file"])
+    counts = import_students(iter_rolls(upload_rows(uf)), payload["year"], uploaded_file=uf)
+    record_result(uf, counts)
+    return counts, counts["inserted"]
+
+
+def _upload_timetable(payload, progress):
+    uf = UploadedFile.objects.get(pk=payload["uploaded_file"])
+    rows = import_timetable(upload_rows(uf))
+    record_result(uf, {"rows": rows})
+    return {"rows": rows}, rows
+
+
+HANDLERS = {
+    Job.GENERATE_SEATING: _generate_seating,
+    Job.GENERATE_BATCH: _generate_batch,
+    Job.UPLOAD_STUDENTS: _upload_students,
+    Job.UPLOAD_TIMETABLE: _upload_timetable,
+}
+
+
+# ---------------------- QUEUE ----------------------
+def enqueue(kind, payload):
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    return Job.objects.create(kind=kind, payload=payload)
+
+
+def _claimable(now):
+    """Pending jobs, and running ones whose worker stopped sending heartbeats."""
+    stale = now - STALE_AFTER
+    return Q(status=Job.PENDING) | Q(status=Job.RUNNING) & (
+        Q(heartbeat_at__lt=stale) | Q(heartbeat_at__isnull=True, started_at__lt=stale)
+    )
+
+
+def claim_next_job():
+    """
+    Atomically move the oldest pending (or orphaned running) job to running;
+    None if the queue is empty.
+    """
+    while True:
+        now = timezone.now()
+        job = (
+            Job.objects.filter(_claimable(now))
+            .order_by("created_at", "id")
+            .values_list("id", "status")
+            .first()
+        )
+        if job is None:
+            return None
+        job_id, status = job
+        claimed = Job.objects.filter(_claimable(now), pk=job_id).update(
+            status=Job.RUNNING, started_at=now, heartbeat_at=now
+        )
+        if claimed:
+            if status == Job.RUNNING:
+                logger.warning("Reclaiming job %s: its worker stopped sending heartbeats", job_id)
+            return Job.objects.get(pk=job_id)
+        # another worker won the race; try the next one
+
+
+def run_job(job):
+    """Run a claimed job and record its result or error."""
+    reporter = ProgressReporter(job.pk)
+    try:
+        result, total = HANDLERS[job.kind](job.payload, reporter)
+    except Exception as e:
+        reporter.close()
+        logger.exception("Job %s failed", job.pk)
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.FAILED,
+            error=str(e) or type(e).__name__,
+            finished_at=timezone.now(),
+        )
+        return
+    reporter.close()
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.DONE, result=result, progress=total, total=total, finished_at=timezone.now()
+    )
+
+
+def job_status(job):
+    return {
+        "id": job.pk,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "total": job.total,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "heartbeat_at": job.heartbeat_at,
+        "finished_at": job.finished_at,
+    }
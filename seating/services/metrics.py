@@ -0,0 +1,110 @@
+"""
+In-process request metrics, exported in Prometheus text format.
+
+MetricsMiddleware (seating/middleware.py) calls observe() once per
+request with the view's latency, DB query count/time and response size;
+everything is kept in a few dicts behind one lock, so recording costs a
+handful of dict updates. Metrics are per process: with several gunicorn
+workers each scrape sees the worker that served it.
+"""
+import bisect
+import threading
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # last slot is +Inf
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self.requests = {}     # (view, method, status) -> count
+        self.latency = {}      # view -> Histogram
+        self.sizes = {}        # view -> Histogram
+        self.queries = {}      # view -> number of queries
+        self.query_time = {}   # view -> seconds
+
+    def reset(self):
+        with self._lock:
+            self._clear()
+
+    def observe(self, view, method, status, seconds, queries, query_time, size):
+        with self._lock:
+            key = (view, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            if view not in self.latency:
+                self.latency[view] = Histogram(LATENCY_BUCKETS)
+                self.sizes[view] = Histogram(SIZE_BUCKETS)
+                self.queries[view] = 0
+                self.query_time[view] = 0.0
+            self.latency[view].observe(seconds)
+            if size is not None:
+                self.sizes[view].observe(size)
+            self.queries[view] += queries
+            self.query_time[view] += query_time
+
+    def render(self, extra=()):
+        """Prometheus text exposition format (version 0.0.4)."""
+        out = []
+        with self._lock:
+            out += _header("seating_requests_total", "counter", "Requests by view, method and status.")
+            for (view, method, status), n in sorted(self.requests.items()):
+                out.append(f"seating_requests_total{_labels(view=view, method=method, status=status)} {n}")
+            out += _histogram("seating_request_duration_seconds", "Request latency by view.", self.latency)
+            out += _histogram("seating_response_size_bytes", "Response body size by view.", self.sizes)
+            out += _header("seating_db_queries_total", "counter", "Database queries by view.")
+            for view, n in sorted(self.queries.items()):
+                out.append(f"seating_db_queries_total{_labels(view=view)} {n}")
+            out += _header("seating_db_query_seconds_total", "counter", "Database time by view.")
+            for view, t in sorted(self.query_time.items()):
+                out.append(f"seating_db_query_seconds_total{_labels(view=view)} {t:.6f}")
+        for name, kind, help_text, value in extra:
+            out += _header(name, kind, help_text)
+            out.append(f"{name} {value}")
+        return "\n".join(out) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _header(name, kind, help_text):
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+def _histogram(name, help_text, histograms):
+    out = _header(name, "histogram", help_text)
+    for view, h in sorted(histograms.items()):
+        if not h.count:
+            continue
+        cumulative = 0
+        for le, n in zip(h.buckets + ("+Inf",), h.counts):
+            cumulative += n
+            out.append(f"{name}_bucket{_labels(view=view, le=le)} {cumulative}")
+        out.append(f"{name}_sum{_labels(view=view)} {float(h.sum)}")
+        out.append(f"{name}_count{_labels(view=view)} {h.count}")
+    return out
+
+
+METRICS = Metrics()
@@ -0,0 +1,161 @@
+"""
+Pure in-memory seating planner.
+
+No Django imports: it takes plain roll sequences per year and returns a
+column-oriented SeatingPlan, so layouts can be planned, reused and
+benchmarked without a database.
+"""
+import re
+from array import array
+from math import ceil
+
+from .allocators import EMPTY, get_allocator
+
+TOTAL_COLUMNS = 9
+
+
+def next_room_code(room_code):
+    """MC101 -> MC102 (increments the trailing number, else appends 'a')."""
+    m = re.search(r'(\D*)(\d+)$', room_code)
+    if m:
+        prefix, num = m.group(1), int(m.group(2))
+        return f"{prefix}{num+1}"
+    return f"{room_code}a"
+
+
+class SeatingPlan:
+    """
+    Array-backed plan, one entry per seat (empty seats included).
+
+    room/row/col/year are parallel arrays; roll holds an index into
+    rolls[year] or EMPTY. room is an index into room_codes and
+    room_shapes, which holds each room's (rows, columns).
+    """
+    __slots__ = ("room_codes", "room_shapes", "rolls",
+                 "room", "row", "col", "year", "roll")
+
+    def __init__(self, rolls):
+        self.rolls = rolls
+        self.room_codes = []
+        self.room_shapes = []
+        self.room = array("I")
+        self.row = array("H")
+        self.col = array("H")
+        self.year = array("B")
+        self.roll = array("l")
+
+    def __len__(self):
+        return len(self.roll)
+
+    @property
+    def students(self):
+        return len(self.roll) - self.roll.count(EMPTY)
+
+    def roll_at(self, i):
+        idx = self.roll[i]
+        return "" if idx == EMPTY else self.rolls[self.year[i]][idx]
+
+    def seats(self):
+        """Yield (room_code, row, col, year, roll) tuples."""
+        codes, rolls = self.room_codes, self.rolls
+        for room, row, col, yr, idx in zip(self.room, self.row, self.col, self.year, self.roll):
+            yield codes[room], row, col, yr, ("" if idx == EMPTY else rolls[yr][idx])
+
+
+def _fill_plan(rolls_by_year, rooms, strategy):
+    """
+    Run the allocator over rooms, a sequence of (code, rows, columns) in
+    order of preference, and collect the rooms it opens into a plan.
+    """
+    allocate = get_allocator(strategy)
+    plan = SeatingPlan(rolls_by_year)
+    counts = {y: len(r) for y, r in rolls_by_year.items()}
+    shapes = [(rows, columns) for _, rows, columns in rooms]
+    layouts = {}
+    for room_index, (years, rolls) in enumerate(allocate(counts, shapes)):
+        code, rows, columns = rooms[room_index]
+        if (rows, columns) not in layouts:
+            # column-major seat order, as the allocators return it
+            layouts[rows, columns] = (
+                array("H", range(rows)) * columns,
+                array("H", [c for c in range(columns) for _ in range(rows)]),
+            )
+        seat_rows, seat_cols = layouts[rows, columns]
+        plan.room_codes.append(code)
+        plan.room_shapes.append((rows, columns))
+        plan.room.extend([room_index] * (rows * columns))
+        plan.row.extend(seat_rows)
+        plan.col.extend(seat_cols)
+        plan.year.extend(years)
+        plan.roll.extend(rolls)
+    return plan
+
+
+def plan_seating(rolls_by_year, capacity, num_rooms, start_room_code="MC101", strategy="cyclic"):
+    """
+    Plan seating for the given cohorts in up to num_rooms identical rooms
+    named from start_room_code on.
+
+    rolls_by_year: {year: sequence of rolls}, in seating order; only years
+    sitting the exam should be passed.
+    strategy names an allocator in allocators.STRATEGIES: "cyclic" (the
+    original whole-column layout) or "balanced".
+    """
+    if capacity % TOTAL_COLUMNS != 0 or capacity == 0:
+        raise ValueError("Room capacity must be a non-zero multiple of 9")
+    get_allocator(strategy)
+
+    rows_per_room = capacity // TOTAL_COLUMNS
+    total_students = sum(len(r) for r in rolls_by_year.values())
+    recommended_rooms = ceil(total_students / capacity)
+    if num_rooms < recommended_rooms:
+        raise ValueError(f"Need at least {recommended_rooms} rooms based on students and capacity")
+
+    rooms = []
+    room_code = start_room_code
+    for _ in range(num_rooms):
+        rooms.append((room_code, rows_per_room, TOTAL_COLUMNS))
+        room_code = next_room_code(room_code)
+    return _fill_plan(rolls_by_year, rooms, strategy)
+
+
+def pack_rooms(students, rooms):
+    """
+    Order an inventory of (code, rows, columns) rooms so that the fewest
+    rooms able to seat students come first: the largest rooms are taken
+    until the rest fits in one room, then the smallest room that holds the
+    rest. Unused rooms follow, largest first, for allocators that need
+    more space than the seat count alone suggests.
+    """
+    spare = sorted(rooms, key=lambda r: (-r[1] * r[2], r[0]))
+    chosen = []
+    left = students
+    while left > 0 and spare:
+        fits = [r for r in spare if r[1] * r[2] >= left]
+        room = min(fits, key=lambda r: r[1] * r[2]) if fits else spare[0]
+        spare.remove(room)
+        chosen.append(room)
+        left -= room[1] * room[2]
+    return chosen + spare
+
+
+def plan_seating_in_rooms(rolls_by_year, rooms, strategy="cyclic"):
+    """
+    Plan seating using a room inventory: rooms is a sequence of (code,
+    capacity, columns). Rooms are opened per pack_rooms() and each keeps
+    its own layout (capacity // columns rows of columns seats).
+    """
+    get_allocator(strategy)
+    shaped = [(code, capacity // columns, columns) for code, capacity, columns in rooms
+              if columns and capacity >= columns]
+    total_students = sum(len(r) for r in rolls_by_year.values())
+    total_seats = sum(rows * columns for _, rows, columns in shaped)
+    if total_seats < total_students:
+        raise ValueError(f"Need {total_students} seats but only {total_seats} are available")
+
+    plan = _fill_plan(rolls_by_year, pack_rooms(total_students, shaped), strategy)
+    if plan.students < total_students:
+        raise ValueError(
+            f"Could only seat {plan.students} of {total_students} students in the available rooms"
+        )
+    return plan
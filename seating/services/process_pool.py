@@ -0,0 +1,33 @@
+"""
+Process pools for CPU-bound work (batch planning, room sheet rendering).
+
+Pools are started from gunicorn gthread request threads and from the job
+worker's threads, where forking copies a process holding other threads'
+locks and open database connections. Workers are therefore spawned (a
+fresh interpreter that sets Django up itself) rather than forked, and the
+calling thread's database connections are closed first. Tasks must be
+importable functions taking and returning plain data; they never touch
+the database.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import connections
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def process_pool(max_workers=None):
+    """A spawn-context ProcessPoolExecutor whose workers have Django set up."""
+    for conn in connections.all(initialized_only=True):
+        # a connection inside a transaction must stay open for the caller
+        if not conn.in_atomic_block:
+            conn.close()
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
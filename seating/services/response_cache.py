@@ -0,0 +1,222 @@
+"""
+Versioned response cache for the per-date seating read endpoints.
+
+Serialized JSON is stored in the "seating" cache under a key that
+includes the session and the SeatingVersion of the (date, session), so
+regeneration invalidates every worker's copy without any cross-process
+signalling. Responses carry
+ETag/Last-Modified so clients can revalidate with a 304, and are
+brotli/gzip compressed per Accept-Encoding.
+"""
+import gzip
+import json
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .versions import aget_seating_version, get_seating_version
+
+try:
+    import brotli
+except ImportError:   # optional: gzip only
+    brotli = None
+
+CACHE_ALIAS = "seating"
+CACHE_TIMEOUT = 60 * 60 * 24
+KINDS = ("rooms", "flat", "grouped", "summary")
+
+# response compression, best first; brotli only when the package is installed
+ENCODINGS = ("br", "gzip")
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+HITS_KEY = "seating:stats:hits"
+MISSES_KEY = "seating:stats:misses"
+
+
+def seating_cache():
+    return caches[CACHE_ALIAS]
+
+
+def cache_key(kind, exam_date, version, session=""):
+    return f"seating:{kind}:{exam_date}{session}:v{version}"
+
+
+def _incr(key):
+    cache = seating_cache()
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:   # evicted between add() and incr()
+            cache.set(key, 1, timeout=None)
+
+
+def _in_process(cache):
+    """
+    True for LocMemCache: its operations are plain dict work under a lock,
+    so async code can call them directly instead of paying a thread hop
+    for each through the a*() wrappers.
+    """
+    return isinstance(cache, LocMemCache)
+
+
+async def _aincr(key):
+    if _in_process(seating_cache()):
+        _incr(key)
+        return
+    cache = seating_cache()
+    if not await cache.aadd(key, 1, timeout=None):
+        try:
+            await cache.aincr(key)
+        except ValueError:
+            await cache.aset(key, 1, timeout=None)
+
+
+def cache_stats():
+    cache = seating_cache()
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / total, 4) if total else None,
+        "backend": f"{type(cache).__module__}.{type(cache).__name__}",
+    }
+
+
+def invalidate_seating_cache(exam_date, session=""):
+    """
+    Drop entries for superseded versions of (exam_date, session). Stale
+    keys can never be read again anyway (the version is part of the key);
+    this just frees the memory instead of waiting for them to expire.
+    """
+    version, _ = get_seating_version(exam_date, session)
+    seating_cache().delete_many([
+        cache_key(kind, exam_date, v, session) for kind in KINDS for v in range(max(version - 5, 0), version)
+    ])
+
+
+def accepted_encoding(request):
+    """Best of ENCODINGS the client accepts (Accept-Encoding, q=0 honoured), or None."""
+    accepted = {}
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    for encoding in ENCODINGS:
+        if encoding == "br" and brotli is None:
+            continue
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body, encoding):
+    if encoding is None:
+        return body
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _variant_key(key, encoding):
+    return f"{key}:{encoding}" if encoding else key
+
+
+def _validators(kind, exam_date, session, version, updated_at, encoding=None):
+    etag = quote_etag(f"{kind}-{exam_date}{session}-v{version}" + (f"-{encoding}" if encoding else ""))
+    last_modified = int(updated_at.timestamp()) if updated_at else None
+    return etag, last_modified
+
+
+def _finish(response, etag, last_modified, encoding=None):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified)
+    # always revalidate; the ETag makes that a cheap 304
+    response["Cache-Control"] = "private, no-cache"
+    if encoding and response.status_code == 200:
+        response["Content-Encoding"] = encoding
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+def cached_json_response(request, kind, exam_date, build, session=""):
+    """
+    Serve build() for (exam_date, session) as JSON through the versioned
+    cache. build is only called on a miss; its result must be JSON
+    serializable. Bodies are compressed (brotli or gzip, as the client
+    accepts) once per version and the compressed copy is cached too.
+    """
+    version, updated_at = get_seating_version(exam_date, session)
+    encoding = accepted_encoding(request)
+    etag, last_modified = _validators(kind, exam_date, session, version, updated_at, encoding)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        cache = seating_cache()
+        key = cache_key(kind, exam_date, version, session)
+        variant = _variant_key(key, encoding)
+        found = cache.get_many(list({key, variant}))
+        body = found.get(variant)
+        if body is None:
+            raw = found.get(key)
+            if raw is None:
+                _incr(MISSES_KEY)
+                raw = json.dumps(build(), separators=(",", ":")).encode()
+                cache.set(key, raw, CACHE_TIMEOUT)
+            else:
+                _incr(HITS_KEY)
+            body = compress(raw, encoding)
+            if variant != key:
+                cache.set(variant, body, CACHE_TIMEOUT)
+        else:
+            _incr(HITS_KEY)
+        response = HttpResponse(body, content_type="application/json")
+    return _finish(response, etag, last_modified, encoding)
+
+
+async def acached_json_response(request, kind, exam_date, build, session=""):
+    """cached_json_response() for async views; build is a coroutine function."""
+    version, updated_at = await aget_seating_version(exam_date, session)
+    encoding = accepted_encoding(request)
+    etag, last_modified = _validators(kind, exam_date, session, version, updated_at, encoding)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        cache = seating_cache()
+        in_process = _in_process(cache)
+        key = cache_key(kind, exam_date, version, session)
+        variant = _variant_key(key, encoding)
+        keys = list({key, variant})
+        found = cache.get_many(keys) if in_process else await cache.aget_many(keys)
+        body = found.get(variant)
+        if body is None:
+            raw = found.get(key)
+            if raw is None:
+                await _aincr(MISSES_KEY)
+                raw = json.dumps(await build(), separators=(",", ":")).encode()
+                entries = {key: raw}
+            else:
+                await _aincr(HITS_KEY)
+                entries = {}
+            body = compress(raw, encoding)
+            if variant != key:
+                entries[variant] = body
+            if in_process:
+                cache.set_many(entries, CACHE_TIMEOUT)
+            else:
+                await cache.aset_many(entries, CACHE_TIMEOUT)
+        else:
+            await _aincr(HITS_KEY)
+        response = HttpResponse(body, content_type="application/json")
+    return _finish(response, etag, last_modified, encoding)
@@ -0,0 +1,235 @@
+"""
+Printable per-room seating sheets for invigilators.
+
+Every room of a date's seating (the whole day's, or one session's) gets
+an HTML page to print from the browser (A4 landscape) and/or a one-room
+workbook, each with the seat grid and an alphabetical roll list. Seating
+is read once in the parent process; rendering needs no database and runs
+in a spawned process pool (see services/process_pool.py), a few rooms
+per task. A seating's sheets are zipped into MEDIA_ROOT/exports under
+its date, session and seating version, like the Excel export, so repeat
+downloads are served from disk. Several dates stream as one ZIP of the
+per-date archives.
+"""
+import html
+import io
+import os
+import re
+import zipfile
+from itertools import groupby
+
+from . import xlsx
+from .exam_calendar import sittings
+from .excel_export import export_dir, prune_exports, save_export, seating_title, sheet_title, write_room_sheet
+from .process_pool import process_pool
+from .storage import has_seating, room_grids
+from .versions import get_seating_version
+
+FORMATS = ("html", "xlsx")
+# rooms rendered per process-pool task
+ROOMS_PER_TASK = 8
+# below this many rooms the pool costs more to start than it saves
+# (spawning workers and setting Django up in them takes about a second)
+MIN_POOL_ROOMS = 64
+STREAM_CHUNK_SIZE = 1 << 20
+
+PAGE_STYLE = """
+@page { size: A4 landscape; margin: 10mm; }
+body { font: 11pt sans-serif; }
+h1 { font-size: 16pt; margin: 0 0 2mm; }
+p { margin: 0 0 4mm; }
+table.grid { border-collapse: collapse; width: 100%; margin-bottom: 6mm; }
+table.grid th, table.grid td { border: 1px solid #000; padding: 2mm; text-align: center; }
+table.grid td:empty { background: #eee; }
+ol { columns: 5; font-size: 10pt; margin: 0; }
+"""
+
+
+def parse_formats(value):
+    """"html,xlsx" -> ("html", "xlsx") in FORMATS order; raises ValueError on an unknown one."""
+    wanted = {f.strip().lower() for f in (value or "").split(",") if f.strip()} or set(FORMATS)
+    unknown = wanted - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown format(s): {', '.join(sorted(unknown))} (choose from {', '.join(FORMATS)})")
+    return tuple(f for f in FORMATS if f in wanted)
+
+
+def sheets_stem(exam_date, session=""):
+    """room-sheets-2025-11-20, or room-sheets-2025-11-20-FN for one session's seating."""
+    return f"room-sheets-{exam_date}-{session}" if session else f"room-sheets-{exam_date}"
+
+
+def sheets_path(exam_date, version, formats, session=""):
+    return os.path.join(export_dir(), f"{sheets_stem(exam_date, session)}-v{version}-{'-'.join(formats)}.zip")
+
+
+def seat_label(row, col):
+    return f"R{row + 1}C{col + 1}"
+
+
+def roll_list(grid):
+    """[(roll, seat label)] of a room's students, sorted by roll."""
+    return sorted(
+        (roll, seat_label(r, c)) for r, row in enumerate(grid) for c, roll in enumerate(row) if roll
+    )
+
+
+def day_papers(day_sittings, session=""):
+    """"FN Year 1: Maths" per (session, year, subject) of a day; only session's when given."""
+    return [f"{s} Year {year}: {subject}" for s, year, subject in day_sittings if not session or s == session]
+
+
+# ---------------------- RENDERING (process pool) ----------------------
+def render_html(exam_date, code, grid, papers, session=""):
+    title = seating_title(exam_date, session)
+    columns = max((len(row) for row in grid), default=0)
+    rolls = roll_list(grid)
+    esc = html.escape
+    head = "".join(f"<th>Column {c}</th>" for c in range(1, columns + 1))
+    body = "".join(
+        f"<tr><th>Row {r}</th>" + "".join(f"<td>{esc(roll)}</td>" for roll in row) + "</tr>"
+        for r, row in enumerate(grid, 1)
+    )
+    items = "".join(f"<li>{esc(roll)} <small>{seat}</small></li>" for roll, seat in rolls)
+    return (
+        f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{esc(code)} {title}</title>"
+        f"<style>{PAGE_STYLE}</style></head><body>"
+        f"<h1>Room {esc(code)} &middot; {title}</h1>"
+        f"<p>{esc(' | '.join(papers)) or 'No papers listed'} &middot; {len(rolls)} students</p>"
+        f"<table class=\"grid\"><tr><th></th>{head}</tr>{body}</table>"
+        f"<ol>{items}</ol></body></html>"
+    )
+
+
+def render_xlsx(exam_date, code, grid, papers, session=""):
+    wb = xlsx.new_workbook(write_only=True)
+    write_room_sheet(wb.create_sheet(sheet_title(code)), exam_date, code, grid, session)
+    ws = wb.create_sheet("Rolls")
+    ws.append([" | ".join(papers)])
+    ws.append(["Roll", "Seat"])
+    for roll, seat in roll_list(grid):
+        ws.append([roll, seat])
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def file_stem(code):
+    return re.sub(r"[^\w.-]", "_", code) or "room"
+
+
+def render_rooms(task):
+    """Process-pool entry point: (exam_date, [(file name, bytes)]) for a chunk of rooms."""
+    exam_date, session, papers, formats, rooms = task
+    files = []
+    for code, grid in rooms:
+        if "html" in formats:
+            html_page = render_html(exam_date, code, grid, papers, session)
+            files.append((f"{file_stem(code)}.html", html_page.encode()))
+        if "xlsx" in formats:
+            files.append((f"{file_stem(code)}.xlsx", render_xlsx(exam_date, code, grid, papers, session)))
+    return exam_date, files
+
+
+# ---------------------- ARCHIVES ----------------------
+def build_room_sheets(targets, formats=FORMATS, workers=None, session=""):
+    """
+    Render the sheets of session's seating on every date in targets
+    ([(exam_date, zip path)]) and write one ZIP per date. All rooms of all
+    dates share one process pool. Returns: number of rooms rendered.
+    """
+    papers = {d: day_papers(day, session) for d, day in sittings(dates=[d for d, _ in targets]).items()}
+    tasks = []
+    for d, _ in targets:
+        rooms = list(room_grids(d, session=session))
+        tasks.extend(
+            (d, session, papers.get(d, []), formats, rooms[i:i + ROOMS_PER_TASK])
+            for i in range(0, len(rooms), ROOMS_PER_TASK)
+        )
+    rendered = sum(len(t[4]) for t in tasks)
+
+    paths = dict(targets)
+    if rendered >= MIN_POOL_ROOMS and workers != 1:
+        with process_pool(workers) as pool:
+            _write_archives(pool.map(render_rooms, tasks), paths)
+    else:
+        _write_archives(map(render_rooms, tasks), paths)
+    return rendered
+
+
+def _write_archives(results, paths):
+    """
+    Zip results (ordered by date) into each date's path; dates without
+    rooms get an empty ZIP.
+    """
+    def write(tmp, chunks):
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zf:
+            for _, files in chunks:
+                for name, data in files:
+                    # workbooks are zip files already
+                    zf.writestr(name, data, zipfile.ZIP_STORED if name.endswith(".xlsx") else None)
+
+    pending = dict(paths)
+    for exam_date, chunks in groupby(results, key=lambda r: r[0]):
+        save_export(pending.pop(exam_date), lambda tmp: write(tmp, chunks))
+    for path in pending.values():
+        save_export(path, lambda tmp: write(tmp, []))
+
+
+def get_room_sheets(dates, formats=FORMATS, workers=None, session=""):
+    """
+    [(exam_date, path)] of the cached sheet archives for the dates with
+    seating for session ("FN"/"AN", or "" for the whole day's seating),
+    building the missing ones in a single pass.
+    """
+    found = []
+    missing = []
+    for d in dates:
+        version, _ = get_seating_version(d, session)
+        if not version and not has_seating(d, session):
+            continue
+        path = sheets_path(d, version, formats, session)
+        found.append((d, path))
+        if not os.path.exists(path):
+            missing.append((d, version, path))
+    if missing:
+        build_room_sheets([(d, path) for d, _, path in missing], formats, workers, session)
+        for d, version, _ in missing:
+            # drop archives of older versions of this seating
+            stem = sheets_stem(d, session)
+            prune_exports(f"{stem}-v", keep=f"{stem}-v{version}-")
+    return found
+
+
+def stream_archives(archives):
+    """Yield a ZIP holding the given [(file name, path)] archives, STREAM_CHUNK_SIZE at a time."""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as zf:
+        for name, path in archives:
+            with open(path, "rb") as src, zf.open(name, "w") as dst:
+                while chunk := src.read(STREAM_CHUNK_SIZE):
+                    dst.write(chunk)
+                    yield sink.drain()
+    yield sink.drain()   # the central directory
+
+
+class _Sink:
+    """
+    Write-only file object buffering a ZIP for streaming; zipfile
+    handles it being unseekable.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
@@ -0,0 +1,40 @@
+"""
+Room inventory: which stored rooms can be used on a date.
+
+Rooms come from the Room table (active rooms only, via the
+(is_active, capacity) index) minus those blocked in the availability
+calendar (RoomUnavailability, indexed on its date range).
+"""
+from ..models import Room, RoomUnavailability
+
+
+def available_rooms(exam_date):
+    """[(id, code, capacity, columns)] of rooms usable on exam_date, largest first."""
+    blocked = RoomUnavailability.objects.filter(start_date__lte=exam_date, end_date__gte=exam_date)
+    return list(
+        Room.objects.filter(is_active=True, capacity__gt=0)
+        .exclude(id__in=blocked.values("room_id"))
+        .order_by("-capacity", "code")
+        .values_list("id", "code", "capacity", "columns")
+    )
+
+
+def available_rooms_by_date(dates):
+    """{date: [(id, code, capacity, columns)]} for many dates in two queries."""
+    dates = list(dates)
+    if not dates:
+        return {}
+    rooms = list(
+        Room.objects.filter(is_active=True, capacity__gt=0)
+        .order_by("-capacity", "code")
+        .values_list("id", "code", "capacity", "columns")
+    )
+    blocks = list(
+        RoomUnavailability.objects.filter(start_date__lte=max(dates), end_date__gte=min(dates))
+        .values_list("room_id", "start_date", "end_date")
+    )
+    result = {}
+    for d in dates:
+        blocked = {room_id for room_id, start, end in blocks if start <= d <= end}
+        result[d] = [r for r in rooms if r[0] not in blocked]
+    return result
@@ -0,0 +1,56 @@
+"""
+Per-year student rosters for the generator, cached in-process.
+
+Each year's rolls are read with one values_list query, ordered by roll in
+the database, and kept as a tuple keyed by that year's RosterVersion.
+Anything that changes a year's students bumps its version
+(import_students does), so every worker reloads a cohort on its next use
+after a change, and years with no exam on a date are never read.
+"""
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import RosterVersion, Student
+
+# year -> ((version, updated_at), rolls)
+_ROSTERS = {}
+
+
+def bump_roster_version(*years):
+    """Mark the given years' students as changed; call after writing them."""
+    for year in years:
+        updated = RosterVersion.objects.filter(year=year).update(
+            version=F("version") + 1, updated_at=timezone.now()
+        )
+        if not updated:
+            RosterVersion.objects.get_or_create(year=year)
+
+
+def roster_versions(years):
+    """{year: (version, updated_at)} in one query; (0, None) for years never imported."""
+    found = {
+        year: (version, updated_at)
+        for year, version, updated_at in
+        RosterVersion.objects.filter(year__in=years).values_list("year", "version", "updated_at")
+    }
+    return {year: found.get(year, (0, None)) for year in years}
+
+
+def rolls_for_years(years):
+    """
+    {year: (roll, ...)} for the given years, sorted by roll.
+    Costs one query for the versions, plus one per year whose roster
+    changed since this process last read it.
+    """
+    rosters = {}
+    for year, version in roster_versions(sorted(set(years))).items():
+        cached = _ROSTERS.get(year)
+        if cached is None or cached[0] != version:
+            rolls = tuple(Student.objects.filter(year=year).order_by("roll").values_list("roll", flat=True))
+            cached = _ROSTERS[year] = (version, rolls)
+        rosters[year] = cached[1]
+    return rosters
+
+
+def clear_roster_cache():
+    _ROSTERS.clear()
@@ -0,0 +1,131 @@
+"""
+Per-student seat lookup, served from the (roll, exam_date, session) index
+(on Seating or SeatAssignment, depending on storage) with a small
+in-process LRU in front of it. Entries are keyed on the seating versions
+of the dates a lookup covers (every session of them), like the response
+cache, so a regeneration in any worker is seen on the next lookup.
+"""
+import datetime
+import threading
+import time
+from collections import OrderedDict
+
+from django.db.models import Count, Max, Q, Sum
+
+from ..models import SeatingVersion
+
+from .exam_calendar import session_rank
+from .storage import aroll_seats, roll_seats
+
+
+class LRUCache:
+    """Thread-safe LRU with a per-entry TTL."""
+
+    def __init__(self, maxsize=4096, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Entries carry the seating versions they were read at (see _versions_stamp);
+# the TTL only bounds memory held by rolls nobody looks up again.
+LOOKUP_CACHE = LRUCache(maxsize=4096, ttl=30)
+
+
+def _seat_filter(exam_date, today):
+    cond = Q(exam_date__gte=today)
+    if exam_date is not None:
+        cond |= Q(exam_date=exam_date)
+    return cond
+
+
+# aggregated over the SeatingVersion rows of the dates a lookup covers
+STAMP = {"dates": Count("pk"), "versions": Sum("version"), "updated_at": Max("updated_at")}
+
+
+def _versions_stamp(exam_date, today):
+    """Changes whenever seating for any date a lookup covers is (re)generated. One query."""
+    return tuple(SeatingVersion.objects.filter(_seat_filter(exam_date, today)).aggregate(**STAMP).values())
+
+
+async def _aversions_stamp(exam_date, today):
+    stamp = await SeatingVersion.objects.filter(_seat_filter(exam_date, today)).aaggregate(**STAMP)
+    return tuple(stamp.values())
+
+
+def _seat_result(roll, exam_date, today, rows, session=None):
+    seats = [
+        {"date": d.isoformat(), "session": s, "room": room, "row": row, "col": col}
+        for d, s, room, row, col in sorted(rows, key=lambda r: (r[0], session_rank(r[1])))
+    ]
+
+    if exam_date is not None:
+        seat = next((
+            s for s in seats
+            if s["date"] == exam_date.isoformat() and session in (None, s["session"])
+        ), None)
+    else:
+        seat = seats[0] if seats else None
+
+    return {
+        "roll": roll,
+        "seat": seat,
+        "upcoming": [s for s in seats if s["date"] >= today.isoformat()],
+    }
+
+
+def find_seats(roll, exam_date=None, today=None, session=None):
+    """
+    Seat for roll on exam_date (or the next upcoming exam when not given)
+    plus every upcoming seat from today on, in date then session order.
+    session ("FN"/"AN", or "" for whole-day seating) picks the seat on
+    exam_date from that session's seating; by default the earliest.
+    Returns: {"roll", "seat", "upcoming"}; seat is None when not seated.
+    """
+    today = today or datetime.date.today()
+    key = (roll, exam_date, session, today, _versions_stamp(exam_date, today))
+    result = LOOKUP_CACHE.get(key)
+    if result is None:
+        rows = roll_seats(_seat_filter(exam_date, today), roll)
+        result = _seat_result(roll, exam_date, today, rows, session)
+        LOOKUP_CACHE.set(key, result)
+    return result
+
+
+async def afind_seats(roll, exam_date=None, today=None, session=None):
+    """find_seats() through the async ORM; shares LOOKUP_CACHE."""
+    today = today or datetime.date.today()
+    key = (roll, exam_date, session, today, await _aversions_stamp(exam_date, today))
+    result = LOOKUP_CACHE.get(key)
+    if result is None:
+        rows = await aroll_seats(_seat_filter(exam_date, today), roll)
+        result = _seat_result(roll, exam_date, today, rows, session)
+        LOOKUP_CACHE.set(key, result)
+    return result
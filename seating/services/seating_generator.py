@@ -1,12 +1,21 @@
-import io
-from collections import deque
-from math import ceil
-import pandas as pd
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Alignment, Border, Side, Font
+from django.db import transaction
 
-from ..models import Student, Room, Seating
+from ..models import Room, Seating, TimetableRow
+from .planner import plan_seating, plan_seating_in_rooms
+from .process_pool import process_pool
+from .exam_calendar import sittings, years_sitting
+from .response_cache import invalidate_seating_cache
+from .roster import rolls_for_years
+from .rooms import available_rooms, available_rooms_by_date
+from .seat_lookup import LOOKUP_CACHE
+from .storage import grid_storage, plan_grids, write_room_grids
+from .summary import plan_summaries, write_summaries
+from .versions import bump_seating_version, lock_seating_date
+
+# rows per INSERT statement when bulk writing seats
+SEATING_BATCH_SIZE = 1000
+# below this many dates a batch is planned inline; spawning the pool takes about a second
+MIN_POOL_DATES = 8
 
 # helper utilities (ported)
 def parse_rolls_from_dataframe(df):
@@ -19,110 +28,252 @@ def parse_rolls_from_dataframe(df):
     vals = df[df.columns[0]].astype(str).str.strip()
     return [v for v in vals if v and v.lower() != "nan"]
 
-def has_exam(cell_value):
-    if pd.isna(cell_value): return False
-    if str(cell_value).strip() in ["", "-", "—"]: return False
-    return True
-
 
-def generate_seating_for_date(exam_date, capacity, num_rooms, start_room_code="MC101"):
+def resolve_rooms(codes, capacity):
     """
-    Generates seating in DB for given exam_date.
-    Returns: list of created Seating objects (or count).
+    Map room codes to Room ids in a constant number of queries,
+    creating any missing rooms with a single bulk insert.
     """
-    if capacity % 9 != 0 or capacity == 0:
-        raise ValueError("Room capacity must be a non-zero multiple of 9")
+    room_ids = dict(Room.objects.filter(code__in=codes).values_list("code", "id"))
+    missing = [Room(code=c, capacity=capacity) for c in codes if c not in room_ids]
+    if missing:
+        # ignore_conflicts: another request may create the same room concurrently
+        Room.objects.bulk_create(missing, ignore_conflicts=True)
+        room_ids.update(
+            Room.objects.filter(code__in=[r.code for r in missing]).values_list("code", "id")
+        )
+    return room_ids
 
-    ROWS_PER_ROOM = capacity // 9
-    TOTAL_COLUMNS = 9
 
-    # collect students by year
-    years_data = {1:[],2:[],3:[]}
-    for s in Student.objects.all():
-        years_data[s.year].append(s.roll)
+def no_exams_error(session=None):
+    if session:
+        return f"No exams in the {session} session on that date"
+    return "No exams for any year on that date"
 
+
+def plan_for_date(exam_date, capacity, num_rooms, start_room_code="MC101", strategy="cyclic", rooms=None,
+                  session=None):
+    """
+    Load the cohorts sitting on exam_date and plan them (no writes).
+    rooms, if given, is a room inventory as returned by available_rooms();
+    capacity, num_rooms and start_room_code are then ignored.
+    session ("FN"/"AN") seats only the years sitting that session.
+    """
     # figure which years have exam on date
-    from ..models import TimetableRow
-    try:
-        row = TimetableRow.objects.get(date=exam_date)
-    except TimetableRow.DoesNotExist:
+    day = sittings(dates=[exam_date]).get(exam_date)
+    if day is None:
         raise ValueError("No timetable entry for this date")
 
-    exam_years = []
-    if has_exam(row.i_year_subject): exam_years.append(1)
-    if has_exam(row.ii_year_subject): exam_years.append(2)
-    if has_exam(row.iii_year_subject): exam_years.append(3)
+    exam_years = years_sitting(day, session)
     if not exam_years:
-        raise ValueError("No exams for any year on that date")
-
-    selected_students = []
-    for y in exam_years:
-        selected_students.extend(years_data[y])
-
-    total_students = len(selected_students)
-    recommended_rooms = ceil(total_students / capacity)
-    if num_rooms < recommended_rooms:
-        raise ValueError(f"Need at least {recommended_rooms} rooms based on students and capacity")
-
-    queues = {y: deque(years_data[y]) for y in exam_years}
-
-    def build_pattern():
-        counts = {y: len(years_data[y]) for y in exam_years}
-        sorted_years = sorted(exam_years, key=lambda y: counts[y], reverse=True)
-        pattern = []
-        while len(pattern) < TOTAL_COLUMNS:
-            pattern.extend(sorted_years)
-        return pattern[:TOTAL_COLUMNS]
-
-    pattern = build_pattern()
-
-    def chunk_rooms():
-        while any(queues[y] for y in exam_years):
-            room_pairs = []
-            counts = {1:0,2:0,3:0}
-            for yr in pattern:
-                for _ in range(ROWS_PER_ROOM):
-                    if queues[yr]:
-                        roll = queues[yr].popleft()
-                        room_pairs.append((yr, roll))
-                        counts[yr] += 1
-                    else:
-                        room_pairs.append((yr, ""))
-            yield room_pairs, counts
-
-    # create or get Room objects
-    room_code = start_room_code
-    created_seatings = []
-    gen = chunk_rooms()
-    for _ in range(num_rooms):
-        try:
-            rp, cnt = next(gen)
-        except StopIteration:
-            break
-        # create Room if not exists
-        room_obj, _ = Room.objects.get_or_create(code=room_code, defaults={"capacity": capacity})
-        # save seatings
-        for idx, (yr, roll) in enumerate(rp[:TOTAL_COLUMNS * ROWS_PER_ROOM]):
-            col = idx // ROWS_PER_ROOM
-            row_idx = idx % ROWS_PER_ROOM
-            seating = Seating.objects.create(
-                room=room_obj,
-                exam_date=exam_date,
-                year=yr,
-                roll=roll or "",
-                row_index=row_idx,
-                col_index=col
-            )
-            created_seatings.append(seating)
-        # increment room code like MC101 -> MC102 (attempt numeric part)
-        # naive parse:
-        import re
-        m = re.search(r'(\D*)(\d+)$', room_code)
-        if m:
-            prefix, num = m.group(1), int(m.group(2))
-            room_code = f"{prefix}{num+1}"
+        raise ValueError(no_exams_error(session))
+
+    # only the cohorts sitting today, from the roster cache
+    rolls_by_year = rolls_for_years(exam_years)
+    if rooms is not None:
+        return plan_seating_in_rooms(rolls_by_year, [r[1:] for r in rooms], strategy)
+    return plan_seating(rolls_by_year, capacity, num_rooms, start_room_code, strategy)
+
+
+def persist_plan(plan, exam_date, capacity, progress=None, room_ids=None, session=None):
+    """
+    Make the stored seating for (exam_date, session) match a SeatingPlan.
+
+    The plan is diffed against what is already stored for the date and
+    session and only changed records are deleted, updated or inserted, in
+    one transaction holding their lock, so regeneration is idempotent and
+    concurrent runs for the same seating cannot interleave. Its
+    SeatingSummary rows are rewritten in the same transaction.
+    progress, if given, is called as progress(rooms_written, total_rooms)
+    after each batch. room_ids ({code: id}) skips room resolution when
+    the caller has already resolved every room in the plan. session is
+    the session the plan seats ("FN"/"AN"; None for the whole day), which
+    is stored apart from the day's other sessions.
+    Returns: counts {"rooms", "seats", "students", "inserted", "updated",
+    "deleted", "moved"}; the diff counts are in stored records (seats, or
+    rooms with grid storage) and moved counts students whose seat changed.
+    """
+    total_rooms = len(plan.room_codes)
+    session = session or ""
+    with transaction.atomic():
+        lock_seating_date(exam_date, session)
+        if room_ids is None:
+            room_ids = resolve_rooms(plan.room_codes, capacity)
+
+        if grid_storage():
+            counts = write_room_grids(exam_date, plan_grids(plan, room_ids), progress, session)
         else:
-            # fallback append index
-            room_code = f"{room_code}a"
+            counts = _write_seat_rows(plan, exam_date, room_ids, progress, session)
+        summary_changed = write_summaries(exam_date, plan_summaries(plan, room_ids), session)
+
+        if counts["inserted"] or counts["updated"] or counts["deleted"] or summary_changed:
+            bump_seating_version(exam_date, session)
+            transaction.on_commit(lambda: invalidate_seating_cache(exam_date, session))
+            transaction.on_commit(LOOKUP_CACHE.clear)
+
+    return {
+        "rooms": total_rooms,
+        "seats": len(plan),
+        "students": plan.students,
+        **counts,
+    }
+
+
+def _write_seat_rows(plan, exam_date, room_ids, progress, session=""):
+    """Diff the plan against the Seating rows of (exam_date, session) and write the changes."""
+    total_rooms = len(plan.room_codes)
+    existing = {}
+    stale = []
+    old_seat_of = {}
+    for pk, room_id, row, col, yr, roll in (
+        Seating.objects.filter(exam_date=exam_date, session=session)
+        .values_list("id", "room_id", "row_index", "col_index", "year", "roll")
+    ):
+        key = (room_id, row, col)
+        if key in existing:
+            stale.append(pk)   # duplicate left by an older non-idempotent run
+            continue
+        existing[key] = (pk, yr, roll)
+        if roll:
+            old_seat_of[roll] = key
+
+    to_create = []
+    to_update = []
+    inserted = updated = moved = 0
+    for i, (code, row, col, yr, roll) in enumerate(plan.seats()):
+        key = (room_ids[code], row, col)
+        if roll and old_seat_of.get(roll, key) != key:
+            moved += 1
+        current = existing.pop(key, None)
+        if current is None:
+            to_create.append(Seating(
+                room_id=key[0], exam_date=exam_date, session=session, year=yr, roll=roll,
+                row_index=row, col_index=col,
+            ))
+        elif current[1:] != (yr, roll):
+            to_update.append(Seating(id=current[0], year=yr, roll=roll))
+        if len(to_create) + len(to_update) >= SEATING_BATCH_SIZE:
+            inserted += len(to_create)
+            updated += len(to_update)
+            _write_seats(to_create, to_update)
+            if progress:
+                progress(plan.room[i], total_rooms)
+
+    stale.extend(pk for pk, _, _ in existing.values())
+    for start in range(0, len(stale), SEATING_BATCH_SIZE):
+        Seating.objects.filter(id__in=stale[start:start + SEATING_BATCH_SIZE]).delete()
+    inserted += len(to_create)
+    updated += len(to_update)
+    _write_seats(to_create, to_update)
+    if progress:
+        progress(total_rooms, total_rooms)
+
+    return {"inserted": inserted, "updated": updated, "deleted": len(stale), "moved": moved}
+
+
+def _write_seats(to_create, to_update):
+    """Flush pending inserts/updates and empty both lists."""
+    if to_create:
+        Seating.objects.bulk_create(to_create)
+    if to_update:
+        Seating.objects.bulk_update(to_update, ["year", "roll"])
+    to_create.clear()
+    to_update.clear()
+
+
+def generate_seating_for_date(exam_date, capacity, num_rooms, start_room_code="MC101", progress=None,
+                              strategy="cyclic", inventory=False, session=None):
+    """
+    Generates seating in DB for given exam_date.
+    strategy picks the seat allocator (see services/allocators.py).
+    inventory=True seats students in the stored rooms available on the
+    date (see services/rooms.py) instead of num_rooms rooms of capacity
+    named from start_room_code.
+    session ("FN"/"AN") seats only the years sitting that session, stored
+    alongside the day's other session.
+    All seats are planned in memory and diffed against the stored seating
+    for the date; only changed rows are written, inside one transaction.
+    Returns: dict of counts (see persist_plan).
+    """
+    if inventory:
+        rooms = available_rooms(exam_date)
+        plan = plan_for_date(exam_date, capacity, num_rooms, strategy=strategy, rooms=rooms, session=session)
+        room_ids = {code: pk for pk, code, _, _ in rooms}
+        return persist_plan(plan, exam_date, capacity, progress=progress, room_ids=room_ids, session=session)
+    plan = plan_for_date(exam_date, capacity, num_rooms, start_room_code, strategy, session=session)
+    return persist_plan(plan, exam_date, capacity, progress=progress, session=session)
+
+
+def timetable_dates(date_from=None, date_to=None):
+    """Timetable dates within [date_from, date_to]; either bound may be None."""
+    qs = TimetableRow.objects.order_by("date")
+    if date_from:
+        qs = qs.filter(date__gte=date_from)
+    if date_to:
+        qs = qs.filter(date__lte=date_to)
+    return list(qs.values_list("date", flat=True))
+
+
+def _plan_date(args):
+    exam_date, rolls_by_year, capacity, num_rooms, start_room_code, strategy, rooms = args
+    try:
+        if rooms is not None:
+            return exam_date, plan_seating_in_rooms(rolls_by_year, rooms, strategy), None
+        return exam_date, plan_seating(rolls_by_year, capacity, num_rooms, start_room_code, strategy), None
+    except ValueError as e:
+        return exam_date, None, str(e)
+
+
+def generate_seating_batch(dates=None, capacity=90, num_rooms=999, start_room_code="MC101",
+                           workers=None, progress=None, strategy="cyclic", inventory=False, session=None):
+    """
+    Generate seating for many dates in one pass.
+
+    The exam calendar and the rosters of the years sitting are loaded once
+    (see services/exam_calendar.py and services/roster.py), every date is
+    planned in a spawned process pool (see services/process_pool.py; the
+    planner is pure Python, so plans pickle cheaply), rooms are
+    resolved once for the whole batch and each date is then persisted in
+    its own transaction.
+    dates: iterable of dates, or None for every timetable date.
+    inventory=True plans each date into the stored rooms available on it.
+    session ("FN"/"AN") seats only the years sitting that session each day.
+    Returns: list of per-date summaries, in date order.
+    """
+    years_by_date = {d: years_sitting(day, session) for d, day in sittings(dates=dates).items()}
+    years_data = rolls_for_years({y for years in years_by_date.values() for y in years})
+    inventory_by_date = available_rooms_by_date(years_by_date) if inventory else {}
+
+    summary = {}
+    tasks = []
+    for d, exam_years in years_by_date.items():
+        if not exam_years:
+            summary[d] = {"date": d.isoformat(), "error": no_exams_error(session)}
+            continue
+        rooms = [r[1:] for r in inventory_by_date[d]] if inventory else None
+        tasks.append((d, {y: years_data[y] for y in exam_years}, capacity, num_rooms,
+                      start_room_code, strategy, rooms))
+
+    if len(tasks) >= MIN_POOL_DATES and workers != 1:
+        with process_pool(workers) as pool:
+            planned = list(pool.map(_plan_date, tasks))
+    else:
+        planned = [_plan_date(t) for t in tasks]
+
+    plans = [(d, plan) for d, plan, _ in planned if plan is not None]
+    for d, _, error in planned:
+        if error:
+            summary[d] = {"date": d.isoformat(), "error": error}
+
+    if inventory:
+        room_ids = {code: pk for rooms in inventory_by_date.values() for pk, code, _, _ in rooms}
+    else:
+        codes = sorted({code for _, plan in plans for code in plan.room_codes})
+        room_ids = resolve_rooms(codes, capacity)
+    for done, (d, plan) in enumerate(plans, 1):
+        counts = persist_plan(plan, d, capacity, room_ids=room_ids, session=session)
+        summary[d] = {"date": d.isoformat(), **counts}
+        if progress:
+            progress(done, len(plans))
 
-    return created_seatings
+    return [summary[d] for d in sorted(summary)]
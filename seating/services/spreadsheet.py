@@ -0,0 +1,106 @@
+"""
+Streaming readers for uploaded registers and timetables.
+
+Rows are yielded lazily as tuples of normalized strings, from openpyxl's
+read-only mode for .xlsx and the csv module for .csv, so memory stays
+flat regardless of file size.
+"""
+import codecs
+import csv
+import datetime
+
+from . import xlsx
+
+ROLL_COLUMN_KEYWORDS = ["roll", "rno", "reg", "register", "admission", "hall"]
+
+
+def normalize_cell(value):
+    """Render a cell the way it reads in the sheet ('' for blanks, 123.0 -> '123')."""
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if value != value:   # NaN
+            return ""
+        if value.is_integer():
+            return str(int(value))
+    if isinstance(value, datetime.datetime):
+        if value.time() == datetime.time(0):
+            return value.date().isoformat()
+        return value.isoformat()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return str(value).strip()
+
+
+def _iter_xlsx_rows(f):
+    wb = xlsx.load_workbook(f)
+    try:
+        # first sheet, like pd.read_excel
+        for row in wb.worksheets[0].iter_rows(values_only=True):
+            yield tuple(normalize_cell(v) for v in row)
+    finally:
+        wb.close()
+
+
+def _iter_csv_rows(f):
+    for row in csv.reader(codecs.iterdecode(f, "utf-8-sig")):
+        yield tuple(v.strip() for v in row)
+
+
+def iter_rows(f, name=None):
+    """Yield every row of an uploaded .xlsx/.csv file, header included."""
+    name = (name or getattr(f, "name", "") or "").lower()
+    if hasattr(f, "seek"):
+        f.seek(0)
+    if name.endswith(".csv"):
+        return _iter_csv_rows(f)
+    return _iter_xlsx_rows(f)
+
+
+def find_roll_column(header):
+    """Index of the roll-like column (same heuristics as parse_rolls_from_dataframe)."""
+    for idx, col in enumerate(header):
+        if any(k in str(col).lower() for k in ROLL_COLUMN_KEYWORDS):
+            return idx
+    # otherwise use first column
+    return 0
+
+
+def iter_rolls(rows):
+    """Yield non-empty rolls from rows whose first row is the header."""
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return
+    idx = find_roll_column(header)
+    for row in rows:
+        if idx < len(row):
+            v = row[idx]
+            if v and v.lower() != "nan":
+                yield v
+
+
+def iter_records(rows):
+    """Yield {HEADER: value} dicts; headers are stripped and upper-cased."""
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return
+    keys = [str(h).strip().upper() for h in header]
+    for row in rows:
+        if any(row):
+            yield dict(zip(keys, row))
+
+
+def parse_date(value):
+    """Parse ISO or day-first (20-11-2025, 20/11/2025, 20.11.2025) dates."""
+    try:
+        return datetime.date.fromisoformat(value[:10])
+    except ValueError:
+        pass
+    for fmt in ("%d-%m-%Y", "%d/%m/%Y", "%d.%m.%Y"):
+        try:
+            return datetime.datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date: {value!r}")
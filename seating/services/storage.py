@@ -0,0 +1,290 @@
+"""
+Seating storage back ends.
+
+settings.SEATING_STORAGE selects how generated seating is stored:
+
+"seat"  one Seating row per seat, empty seats included (default)
+"grid"  one RoomSeating record per (exam_date, session, room) with the
+        grid packed row-major, plus SeatAssignment rows (occupied seats
+        only) for per-roll lookups
+
+Either way seating is keyed on (exam_date, session), session being
+"FN"/"AN" or "" for seating generated for the whole day. Readers here
+return the same shapes for both, so views, exports and the seat lookup
+don't care which one is active.
+"""
+from itertools import groupby
+
+from django.conf import settings
+
+from ..models import Seating, RoomSeating, SeatAssignment
+
+SEAT = "seat"
+GRID = "grid"
+
+# rows per INSERT/UPDATE statement
+BATCH_SIZE = 1000
+
+
+def storage_mode():
+    return getattr(settings, "SEATING_STORAGE", SEAT)
+
+
+def grid_storage():
+    return storage_mode() == GRID
+
+
+# ---------------------- READERS ----------------------
+# rooms, where accepted, limits a reader to those room codes (one page).
+def _room_codes_query(exam_date, after=None, session=""):
+    model = RoomSeating if grid_storage() else Seating
+    qs = model.objects.filter(exam_date=exam_date, session=session)
+    if after is not None:
+        qs = qs.filter(room__code__gt=after)
+    return (
+        qs.order_by("room__code")
+        .values_list("room__code", flat=True)
+        .distinct()
+    )
+
+
+def _grid_records_query(exam_date, rooms=None, session=""):
+    qs = RoomSeating.objects.filter(exam_date=exam_date, session=session)
+    if rooms is not None:
+        qs = qs.filter(room__code__in=rooms)
+    return (
+        qs.order_by("room__code")
+        .values_list("room__code", "columns", "rolls")
+    )
+
+
+def _seats_query(exam_date, rooms=None, session="", extra=()):
+    """(code, row, col, roll, *extra fields) per seat."""
+    qs = Seating.objects.filter(exam_date=exam_date, session=session)
+    if rooms is not None:
+        qs = qs.filter(room__code__in=rooms)
+    return (
+        qs.order_by("room__code", "row_index", "col_index")
+        .values_list("room__code", "row_index", "col_index", "roll", *extra)
+    )
+
+
+def _split_grid(code, columns, rolls):
+    return code, [rolls[i:i + columns] for i in range(0, len(rolls), columns)]
+
+
+def _grids_from_seats(seats):
+    """
+    (room_code, grid) per room from (code, row, col, roll, room columns)
+    ordered by code, row, col; rows are as wide as the room.
+    """
+    for code, room_seats in groupby(seats, key=lambda s: s[0]):
+        grid = []
+        for _, row, col, roll, columns in room_seats:
+            while len(grid) <= row:
+                grid.append([""] * columns)
+            if col >= len(grid[row]):
+                grid[row].extend([""] * (col + 1 - len(grid[row])))
+            grid[row][col] = roll
+        yield code, grid
+
+
+def room_codes(exam_date, after=None, limit=None, session=""):
+    """Room codes in code order; after/limit select a page of them."""
+    qs = _room_codes_query(exam_date, after, session)
+    return list(qs[:limit] if limit is not None else qs)
+
+
+def room_grids(exam_date, rooms=None, session=""):
+    """Yield (room_code, grid) per room in code order; grid is a list of rows of rolls."""
+    if grid_storage():
+        for record in _grid_records_query(exam_date, rooms, session).iterator():
+            yield _split_grid(*record)
+        return
+    yield from _grids_from_seats(_seats_query(exam_date, rooms, session, ["room__columns"]).iterator())
+
+
+def seat_tuples(exam_date, rooms=None, session=""):
+    """(room_code, row, col, roll) for every seat, ordered by room, row, col."""
+    if not grid_storage():
+        return _seats_query(exam_date, rooms, session)
+    return [
+        (code, r, c, roll)
+        for code, grid in room_grids(exam_date, rooms, session)
+        for r, row in enumerate(grid)
+        for c, roll in enumerate(row)
+    ]
+
+
+def roll_seats(cond, roll):
+    """
+    (exam_date, session, room_code, row, col) for roll matching the Q
+    cond, by date; nothing for a blank roll.
+    """
+    model = SeatAssignment if grid_storage() else Seating
+    return (
+        model.objects.filter(cond, roll=roll).exclude(roll="")
+        .order_by("exam_date")
+        .values_list("exam_date", "session", "room__code", "row_index", "col_index")
+    )
+
+
+def has_seating(exam_date, session=""):
+    model = RoomSeating if grid_storage() else Seating
+    return model.objects.filter(exam_date=exam_date, session=session).exists()
+
+
+# ---------------------- ASYNC READERS ----------------------
+# Same results as the readers above, through the async ORM, for the
+# async views (seating/async_views.py).
+async def aroom_codes(exam_date, session=""):
+    return [code async for code in _room_codes_query(exam_date, session=session)]
+
+
+async def aroom_grids(exam_date, session=""):
+    """List of (room_code, grid), as room_grids()."""
+    if grid_storage():
+        return [_split_grid(*record) async for record in _grid_records_query(exam_date, session=session)]
+    seats = [seat async for seat in _seats_query(exam_date, None, session, ["room__columns"])]
+    return list(_grids_from_seats(seats))
+
+
+async def aseat_tuples(exam_date, session=""):
+    if not grid_storage():
+        return [seat async for seat in _seats_query(exam_date, session=session)]
+    return [
+        (code, r, c, roll)
+        for code, grid in await aroom_grids(exam_date, session)
+        for r, row in enumerate(grid)
+        for c, roll in enumerate(row)
+    ]
+
+
+async def aroll_seats(cond, roll):
+    return [seat async for seat in roll_seats(cond, roll)]
+
+
+# ---------------------- GRID WRITER ----------------------
+def plan_grids(plan, room_ids):
+    """{room_id: (rows, columns, rolls, years)} row-major, from a SeatingPlan."""
+    grids = {}
+    for code, (rows, columns) in zip(plan.room_codes, plan.room_shapes):
+        size = rows * columns
+        grids[room_ids[code]] = (rows, columns, [""] * size, [0] * size)
+    for code, row, col, yr, roll in plan.seats():
+        _, columns, rolls, years = grids[room_ids[code]]
+        rolls[row * columns + col] = roll
+        years[row * columns + col] = yr
+    return grids
+
+
+def write_room_grids(exam_date, grids, progress=None, session=""):
+    """
+    Make RoomSeating/SeatAssignment for (exam_date, session) match grids
+    (see plan_grids), touching only rooms whose grid changed. Call inside
+    a transaction. Returns diff counts in room records.
+    """
+    existing = {
+        room_id: (pk, rows, columns, rolls, years)
+        for pk, room_id, rows, columns, rolls, years in (
+            RoomSeating.objects.filter(exam_date=exam_date, session=session)
+            .values_list("id", "room_id", "rows", "columns", "rolls", "years")
+        )
+    }
+    old_seat_of = {}
+    for room_id, (_, _, columns, rolls, _) in existing.items():
+        for i, roll in enumerate(rolls):
+            if roll:
+                old_seat_of[roll] = (room_id, i // columns, i % columns)
+
+    to_create, to_update, changed_rooms = [], [], []
+    moved = 0
+    for room_id, (rows, columns, rolls, years) in grids.items():
+        for i, roll in enumerate(rolls):
+            if roll:
+                seat = (room_id, i // columns, i % columns)
+                if old_seat_of.get(roll, seat) != seat:
+                    moved += 1
+        current = existing.pop(room_id, None)
+        if current is None:
+            to_create.append(RoomSeating(
+                room_id=room_id, exam_date=exam_date, session=session, rows=rows, columns=columns,
+                rolls=rolls, years=years,
+            ))
+        elif current[1:] != (rows, columns, rolls, years):
+            to_update.append(RoomSeating(id=current[0], rows=rows, columns=columns, rolls=rolls, years=years))
+        else:
+            continue
+        changed_rooms.append(room_id)
+
+    deleted_rooms = list(existing)
+    RoomSeating.objects.filter(exam_date=exam_date, session=session, room_id__in=deleted_rooms).delete()
+    RoomSeating.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+    RoomSeating.objects.bulk_update(to_update, ["rows", "columns", "rolls", "years"], batch_size=BATCH_SIZE)
+
+    # rebuild the roll lookup for rooms that changed
+    SeatAssignment.objects.filter(
+        exam_date=exam_date, session=session, room_id__in=changed_rooms + deleted_rooms
+    ).delete()
+    assignments = []
+    for done, room_id in enumerate(changed_rooms, 1):
+        _, columns, rolls, _ = grids[room_id]
+        assignments.extend(
+            SeatAssignment(roll=roll, exam_date=exam_date, session=session, room_id=room_id,
+                           row_index=i // columns, col_index=i % columns)
+            for i, roll in enumerate(rolls) if roll
+        )
+        if len(assignments) >= BATCH_SIZE:
+            SeatAssignment.objects.bulk_create(assignments)
+            assignments = []
+            if progress:
+                progress(done, len(grids))
+    SeatAssignment.objects.bulk_create(assignments, batch_size=BATCH_SIZE)
+    if progress:
+        progress(len(grids), len(grids))
+
+    return {
+        "inserted": len(to_create),
+        "updated": len(to_update),
+        "deleted": len(deleted_rooms),
+        "moved": moved,
+    }
+
+
+# ---------------------- CONVERSION ----------------------
+def seat_rows_to_grids(exam_date, session=""):
+    """Grids (as for write_room_grids) built from the Seating rows of (exam_date, session)."""
+    grids = {}
+    seats = (
+        Seating.objects.filter(exam_date=exam_date, session=session)
+        .values_list("room_id", "room__columns", "row_index", "col_index", "year", "roll")
+    )
+    by_room = {}
+    widths = {}
+    for room_id, room_columns, row, col, yr, roll in seats:
+        by_room.setdefault(room_id, []).append((row, col, yr, roll))
+        widths[room_id] = room_columns
+    for room_id, room_seats in by_room.items():
+        rows = max(s[0] for s in room_seats) + 1
+        columns = max(max(s[1] for s in room_seats) + 1, widths[room_id])
+        rolls, years = [""] * (rows * columns), [0] * (rows * columns)
+        for row, col, yr, roll in room_seats:
+            rolls[row * columns + col] = roll
+            years[row * columns + col] = yr
+        grids[room_id] = (rows, columns, rolls, years)
+    return grids
+
+
+def grids_to_seat_rows(exam_date, session=""):
+    """Seating instances (unsaved) for every seat in the RoomSeating records of (exam_date, session)."""
+    seats = []
+    for room_id, columns, rolls, years in (
+        RoomSeating.objects.filter(exam_date=exam_date, session=session)
+        .values_list("room_id", "columns", "rolls", "years")
+    ):
+        seats.extend(
+            Seating(room_id=room_id, exam_date=exam_date, session=session, year=yr, roll=roll,
+                    row_index=i // columns, col_index=i % columns)
+            for i, (roll, yr) in enumerate(zip(rolls, years))
+        )
+    return seats
@@ -0,0 +1,68 @@
+from django.db import transaction
+
+from ..models import Student
+from .roster import bump_roster_version
+
+# rows per INSERT statement when bulk creating students
+STUDENT_BATCH_SIZE = 1000
+
+
+def guess_year(filename):
+    """Year from a register's file name (III_bsc.xlsx -> 3), defaulting to 1."""
+    name = filename.lower()
+    if 'iii' in name or '3' in name:
+        return 3
+    elif 'ii' in name or '2' in name:
+        return 2
+    return 1
+
+
+def _insert(pending, year, uploaded_file):
+    """
+    Bulk create pending students and return how many rows were actually
+    inserted. ignore_conflicts drops rolls a concurrent upload inserted
+    first, so the batch's (roll, year) pairs are re-queried for the rows
+    that carry this upload.
+    """
+    Student.objects.bulk_create(pending, ignore_conflicts=True)
+    return Student.objects.filter(
+        year=year, roll__in=[s.roll for s in pending], uploaded_file=uploaded_file
+    ).count()
+
+
+def import_students(rolls, year, uploaded_file=None, batch_size=STUDENT_BATCH_SIZE):
+    """
+    Set-based import of rolls for one year.
+
+    Existing (roll, year) pairs are loaded in a single query and diffed in
+    memory; only new students are inserted, in batches of batch_size,
+    and the year's roster version is bumped if any were. inserted counts
+    the rows actually written.
+    Returns: {"inserted", "skipped", "duplicates_in_file"}.
+    """
+    existing = set(Student.objects.filter(year=year).values_list("roll", flat=True))
+    seen = set()
+    pending = []
+    inserted = duplicates = 0
+
+    with transaction.atomic():
+        for roll in rolls:
+            roll = str(roll)
+            if roll in seen:
+                duplicates += 1
+                continue
+            seen.add(roll)
+            if roll in existing:
+                continue
+            pending.append(Student(roll=roll, year=year, uploaded_file=uploaded_file))
+            if len(pending) >= batch_size:
+                inserted += _insert(pending, year, uploaded_file)
+                pending = []
+        if pending:
+            inserted += _insert(pending, year, uploaded_file)
+        # rolls a concurrent upload inserted first count as skipped
+        skipped = len(seen) - inserted
+        if inserted:
+            bump_roster_version(year)
+
+    return {"inserted": inserted, "skipped": skipped, "duplicates_in_file": duplicates}
@@ -0,0 +1,186 @@
+"""
+Precomputed seating summary: one SeatingSummary row per (exam_date,
+session, room) with seat and student counts, students per year (any
+number of years, as {"1": n, ...}) and the lowest/highest roll seated.
+persist_plan() rewrites the rows in the same transaction as the seating,
+so the summary endpoints answer in O(rooms) and never see a
+half-written plan.
+"""
+from ..models import RoomSeating, Seating, SeatingSummary, TimetableRow
+from .exam_calendar import session_rank
+from .storage import BATCH_SIZE, grid_storage
+
+FIELDS = ("seats", "students", "years", "first_roll", "last_roll")
+
+
+def summarize(seats):
+    """
+    {room_id: (seats, students, {year: students}, first_roll, last_roll)}
+    from (room_id, year, roll) per seat, empty seats with roll "". Years
+    are string keys in ascending order, as they read back from JSON.
+    """
+    acc = {}
+    for room_id, yr, roll in seats:
+        room = acc.get(room_id)
+        if room is None:
+            room = acc[room_id] = [0, 0, {}, None, None]
+        room[0] += 1
+        if not roll:
+            continue
+        room[1] += 1
+        room[2][yr] = room[2].get(yr, 0) + 1
+        if room[3] is None or roll < room[3]:
+            room[3] = roll
+        if room[4] is None or roll > room[4]:
+            room[4] = roll
+    return {
+        room_id: (seats, students, year_counts(years), first or "", last or "")
+        for room_id, (seats, students, years, first, last) in acc.items()
+    }
+
+
+def year_counts(counts):
+    """{year: n} -> {"year": n} in ascending year order, for the JSON field and the API."""
+    return {str(y): counts[y] for y in sorted(counts, key=int)}
+
+
+def add_years(total, years):
+    for y, n in years.items():
+        total[y] = total.get(y, 0) + n
+    return total
+
+
+def plan_summaries(plan, room_ids):
+    """summarize() for a SeatingPlan, rooms keyed by Room id."""
+    return summarize((room_ids[code], yr, roll) for code, _, _, yr, roll in plan.seats())
+
+
+def stored_summaries(exam_date, session=""):
+    """summarize() for what is stored for (exam_date, session) in the active storage layout."""
+    if not grid_storage():
+        return summarize(
+            Seating.objects.filter(exam_date=exam_date, session=session)
+            .values_list("room_id", "year", "roll").iterator()
+        )
+    return summarize(
+        (room_id, yr, roll)
+        for room_id, years, rolls in (
+            RoomSeating.objects.filter(exam_date=exam_date, session=session)
+            .values_list("room_id", "years", "rolls")
+        )
+        for yr, roll in zip(years, rolls)
+    )
+
+
+def write_summaries(exam_date, summaries, session=""):
+    """
+    Make the SeatingSummary rows of (exam_date, session) match summaries
+    (see summarize()). Call inside the transaction that writes the
+    seating. Returns True if anything changed.
+    """
+    stored = SeatingSummary.objects.filter(exam_date=exam_date, session=session)
+    existing = {
+        room_id: (pk, *values)
+        for pk, room_id, *values in stored.values_list("id", "room_id", *FIELDS)
+    }
+    to_create, to_update = [], []
+    for room_id, values in summaries.items():
+        current = existing.pop(room_id, None)
+        if current is None:
+            to_create.append(SeatingSummary(
+                room_id=room_id, exam_date=exam_date, session=session, **dict(zip(FIELDS, values))
+            ))
+        elif tuple(current[1:]) != values:
+            to_update.append(SeatingSummary(id=current[0], **dict(zip(FIELDS, values))))
+    stored.filter(room_id__in=list(existing)).delete()
+    SeatingSummary.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+    SeatingSummary.objects.bulk_update(to_update, FIELDS, batch_size=BATCH_SIZE)
+    return bool(to_create or to_update or existing)
+
+
+# ---------------------- READERS ----------------------
+def _totals(rooms):
+    by_year = {}
+    for r in rooms:
+        add_years(by_year, r["by_year"])
+    return {
+        "rooms": len(rooms),
+        "seats": sum(r["seats"] for r in rooms),
+        "students": sum(r["students"] for r in rooms),
+        "empty_seats": sum(r["empty_seats"] for r in rooms),
+        "by_year": year_counts(by_year),
+    }
+
+
+def date_summary(exam_date, session=""):
+    """Per-room occupancy for (exam_date, session) plus totals; one query."""
+    rooms = [
+        {
+            "room": code,
+            "seats": seats,
+            "students": students,
+            "empty_seats": seats - students,
+            "by_year": years,
+            "first_roll": first,
+            "last_roll": last,
+        }
+        for code, seats, students, years, first, last in (
+            SeatingSummary.objects.filter(exam_date=exam_date, session=session)
+            .order_by("room__code")
+            .values_list("room__code", *FIELDS)
+        )
+    ]
+    return {"date": exam_date.isoformat(), "session": session, "rooms": rooms, "totals": _totals(rooms)}
+
+
+def timetable_overview(date_from=None, date_to=None):
+    """
+    One entry per timetable date in [date_from, date_to] with the date's
+    summary totals (zeros where seating has not been generated), added up
+    over the sessions seated ("" for the whole day). rooms counts each
+    room once however many sessions it seats.
+    """
+    rows = TimetableRow.objects.order_by("date")
+    summaries = SeatingSummary.objects.all()
+    if date_from:
+        rows = rows.filter(date__gte=date_from)
+        summaries = summaries.filter(exam_date__gte=date_from)
+    if date_to:
+        rows = rows.filter(date__lte=date_to)
+        summaries = summaries.filter(exam_date__lte=date_to)
+
+    # per-year counts live in JSON, so the rooms are added up here rather than in SQL
+    totals = {}
+    for d, session, room_id, seats, students, years in summaries.values_list(
+        "exam_date", "session", "room_id", "seats", "students", "years"
+    ):
+        t = totals.setdefault(d, {"sessions": set(), "rooms": set(), "seats": 0, "students": 0, "by_year": {}})
+        t["sessions"].add(session)
+        t["rooms"].add(room_id)
+        t["seats"] += seats
+        t["students"] += students
+        add_years(t["by_year"], years)
+    dates = []
+    for d in rows.values_list("date", flat=True).distinct():
+        t = totals.get(d, {})
+        seats, students = t.get("seats", 0), t.get("students", 0)
+        dates.append({
+            "date": d.isoformat(),
+            "generated": d in totals,
+            "sessions": sorted(t.get("sessions", ()), key=session_rank),
+            "rooms": len(t.get("rooms", ())),
+            "seats": seats,
+            "students": students,
+            "empty_seats": seats - students,
+            "by_year": year_counts(t.get("by_year", {})),
+        })
+    return {
+        "dates": dates,
+        "totals": {
+            "dates": len(dates),
+            "generated": sum(d["generated"] for d in dates),
+            "seats": sum(d["seats"] for d in dates),
+            "students": sum(d["students"] for d in dates),
+            "empty_seats": sum(d["empty_seats"] for d in dates),
+        },
+    }
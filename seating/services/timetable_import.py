@@ -0,0 +1,117 @@
+import re
+
+from django.db import transaction
+
+from ..models import ExamSession, TimetableRow
+from .exam_calendar import SESSION_ORDER, has_exam
+from .spreadsheet import iter_records, parse_date
+
+# rows per INSERT statement when bulk creating sessions
+SESSION_BATCH_SIZE = 1000
+
+ROMAN_YEARS = {"I": 1, "II": 2, "III": 3, "IV": 4, "V": 5, "VI": 6, "VII": 7, "VIII": 8}
+YEAR = r"([IVX]+|\d+)(?:ST|ND|RD|TH)?"
+# "I YEAR SUBJECT", "IV YEAR", "2ND YEAR SUBJECT", ...
+YEAR_COLUMN = re.compile(rf"^{YEAR} YEAR(?: SUBJECT)?$")
+# values of a YEAR column: 2, "III", "IV YEAR", ...
+YEAR_VALUE = re.compile(rf"^{YEAR}(?: YEAR)?$")
+SESSION_NAMES = {
+    "FN": ExamSession.FORENOON, "FORENOON": ExamSession.FORENOON, "MORNING": ExamSession.FORENOON,
+    "AM": ExamSession.FORENOON,
+    "AN": ExamSession.AFTERNOON, "AFTERNOON": ExamSession.AFTERNOON, "EVENING": ExamSession.AFTERNOON,
+    "PM": ExamSession.AFTERNOON,
+}
+
+
+def parse_year(value, pattern=YEAR_VALUE):
+    """1, "2", "III", "IV YEAR" -> int; None if value is not a year."""
+    match = pattern.match(str(value).strip().upper())
+    if not match:
+        return None
+    year = match.group(1)
+    return int(year) if year.isdigit() else ROMAN_YEARS.get(year)
+
+
+def parse_session(value):
+    """FN/AN (also forenoon, afternoon, AM, PM...); blank means forenoon."""
+    key = str(value or "").strip().upper().replace(".", "")
+    if not key:
+        return ExamSession.FORENOON
+    try:
+        return SESSION_NAMES[key]
+    except KeyError:
+        raise ValueError(f"Unrecognised session: {value!r}")
+
+
+def record_papers(record):
+    """
+    (year, subject) pairs of one sheet record, from either layout:
+    one "<year> YEAR SUBJECT" column per year, or YEAR and SUBJECT columns.
+    """
+    if "YEAR" in record and "SUBJECT" in record:
+        year = parse_year(record["YEAR"])
+        if year is None:
+            raise ValueError(f"Unrecognised year: {record['YEAR']!r}")
+        papers = [(year, record["SUBJECT"])]
+    else:
+        papers = [(parse_year(key, YEAR_COLUMN), value) for key, value in record.items()]
+    return [(year, str(subject).strip()) for year, subject in papers if year and has_exam(subject)]
+
+
+def import_timetable(rows):
+    """
+    Load the timetable sheet (header first) into ExamSession rows, in one
+    transaction: each DATE in the sheet gets exactly the sessions listed
+    for it. An optional SESSION column splits a day into forenoon and
+    afternoon; years come from "<year> YEAR SUBJECT" columns or from
+    YEAR/SUBJECT columns, any number of them. The per-date TimetableRow
+    (years I-III) is upserted alongside. Raises ValueError on an
+    unparseable date, session or year.
+    Returns: number of rows imported.
+    """
+    papers = {}   # (date, session, year) -> subject; a later row wins
+    dates = {}    # in sheet order
+    count = 0
+    for record in iter_records(rows):
+        if not record.get("DATE"):
+            continue
+        exam_date = parse_date(record["DATE"])
+        session = parse_session(record.get("SESSION"))
+        dates.setdefault(exam_date)
+        for year, subject in record_papers(record):
+            papers[(exam_date, session, year)] = subject
+        count += 1
+
+    with transaction.atomic():
+        # every date in the sheet, so a row listing no papers still clears the day
+        ExamSession.objects.filter(date__in=list(dates)).delete()
+        ExamSession.objects.bulk_create(
+            [ExamSession(date=d, session=s, year=y, subject=subject) for (d, s, y), subject in papers.items()],
+            batch_size=SESSION_BATCH_SIZE,
+        )
+        _upsert_timetable_rows(list(dates), papers)
+    return count
+
+
+def _upsert_timetable_rows(dates, papers):
+    """One TimetableRow per date, holding each of years I-III's earliest paper that day."""
+    subjects = {}
+    for (d, session, year), subject in sorted(papers.items(), key=lambda p: SESSION_ORDER.index(p[0][1])):
+        if year <= 3:
+            subjects.setdefault((d, year), subject)
+
+    fields = ["i_year_subject", "ii_year_subject", "iii_year_subject"]
+    existing = {row.date: row for row in TimetableRow.objects.filter(date__in=dates)}
+    to_create = []
+    to_update = []
+    for d in dates:
+        values = [subjects.get((d, year), "") for year in (1, 2, 3)]
+        row = existing.get(d)
+        if row is None:
+            to_create.append(TimetableRow(date=d, **dict(zip(fields, values))))
+        elif [getattr(row, f) for f in fields] != values:
+            for f, value in zip(fields, values):
+                setattr(row, f, value)
+            to_update.append(row)
+    TimetableRow.objects.bulk_create(to_create)
+    TimetableRow.objects.bulk_update(to_update, fields)
@@ -0,0 +1,152 @@
+"""
+Upload deduplication and parse cache.
+
+HashingUploadHandler (first in settings.FILE_UPLOAD_HANDLERS) computes a
+SHA-256 of every uploaded file while Django streams it to memory/disk,
+so an upload identical to an earlier one reuses that UploadedFile
+instead of storing another copy (uploads of a different kind never
+match). The first import of an upload writes its parsed rows next to the
+file as gzipped JSON lines, one row per line ("<upload>.rows.jsonl.gz");
+later imports of the same file read that instead of opening the workbook
+again. Rows stream through both ways, so memory stays flat.
+`manage.py clean_upload_artifacts` keeps the artifacts under a size budget.
+"""
+import gzip
+import hashlib
+import json
+import tempfile
+import zlib
+from itertools import islice
+
+from django.core.files import File
+from django.core.files.uploadhandler import FileUploadHandler
+from django.utils import timezone
+
+from ..models import UploadedFile
+from .spreadsheet import iter_rows
+
+ARTIFACT_SUFFIX = ".rows.jsonl.gz"
+# what a truncated or corrupt artifact raises while being read
+ARTIFACT_ERRORS = (OSError, EOFError, ValueError, zlib.error)
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """Pass-through handler recording request.upload_hashes = {field_name: sha256}."""
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.hashes = {}
+        self._sha = None
+        if request is not None:
+            request.upload_hashes = self.hashes
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self._sha = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self._sha.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        self.hashes[self.field_name] = self._sha.hexdigest()
+        return None   # let the next handler build the file
+
+
+def upload_digest(request, f, field_name="file"):
+    """SHA-256 of an uploaded file, from HashingUploadHandler or by reading it."""
+    digest = getattr(request, "upload_hashes", {}).get(field_name)
+    if digest:
+        return digest
+    sha = hashlib.sha256()
+    for chunk in f.chunks():
+        sha.update(chunk)
+    f.seek(0)
+    return sha.hexdigest()
+
+
+def store_upload(f, digest, kind, description=""):
+    """
+    (UploadedFile, duplicate): the earlier upload of this kind with the
+    same content if its file is still there, else a newly stored one.
+    """
+    previous = UploadedFile.objects.filter(kind=kind, sha256=digest).order_by("-id").first()
+    if previous is not None and previous.file.storage.exists(previous.file.name):
+        UploadedFile.objects.filter(pk=previous.pk).update(last_used_at=timezone.now())
+        return previous, True
+    uf = UploadedFile.objects.create(file=f, kind=kind, description=description, sha256=digest, size=f.size)
+    return uf, False
+
+
+def record_result(uf, result):
+    """Keep the latest import result on the upload, returned for duplicates."""
+    UploadedFile.objects.filter(pk=uf.pk).update(result=result)
+
+
+# ---------------------- PARSE ARTIFACTS ----------------------
+def artifact_name(uf):
+    return uf.file.name + ARTIFACT_SUFFIX
+
+
+def upload_rows(uf):
+    """
+    Yield every row of uf (header included) as lists of normalized
+    strings, from its artifact when there is one, else parsed from the
+    file and written to a new artifact as they go.
+    """
+    storage, name = uf.file.storage, artifact_name(uf)
+    done = 0
+    if storage.exists(name):
+        try:
+            with storage.open(name, "rb") as f, gzip.open(f, "rt", encoding="utf-8") as lines:
+                for line in lines:
+                    yield json.loads(line)
+                    done += 1
+            return
+        except ARTIFACT_ERRORS:
+            storage.delete(name)   # truncated or corrupt: parse again, past the rows already yielded
+    with uf.file.open("rb") as f:
+        yield from islice(_parse_to_artifact(iter_rows(f, uf.file.name), storage, name), done, None)
+
+
+def _parse_to_artifact(rows, storage, name):
+    """Yield rows while gzipping them to a temporary file; saved as the artifact once all are read."""
+    with tempfile.TemporaryFile() as tmp:
+        with gzip.GzipFile(fileobj=tmp, mode="wb", compresslevel=6) as gz:
+            for row in rows:
+                row = list(row)
+                gz.write(json.dumps(row, separators=(",", ":")).encode() + b"\n")
+                yield row
+        # only reached when the reader consumed every row
+        tmp.seek(0)
+        storage.save(name, File(tmp))
+
+
+def artifact_usage():
+    """[(uf, name, size, last_used)] for every upload with an artifact, least recently used first."""
+    found = []
+    for uf in UploadedFile.objects.exclude(sha256=""):
+        storage, name = uf.file.storage, artifact_name(uf)
+        if storage.exists(name):
+            found.append((uf, name, storage.size(name), uf.last_used_at or uf.uploaded_at))
+    found.sort(key=lambda a: a[3])
+    return found
+
+
+def evict_artifacts(max_bytes, older_than=None, dry_run=False):
+    """
+    Delete artifacts, least recently used first, until the rest fit in
+    max_bytes; artifacts last used before older_than go regardless.
+    Returns (evicted, freed_bytes, kept_bytes).
+    """
+    usage = artifact_usage()
+    total = sum(size for _, _, size, _ in usage)
+    evicted = freed = 0
+    for uf, name, size, last_used in usage:
+        if total - freed <= max_bytes and (older_than is None or last_used >= older_than):
+            continue
+        if not dry_run:
+            uf.file.storage.delete(name)
+        evicted += 1
+        freed += size
+    return evicted, freed, total - freed
@@ -0,0 +1,47 @@
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import SeatingVersion
+
+# Seating is stored per (exam_date, session); session is "FN"/"AN", or ""
+# for seating generated for the whole day.
+
+
+def lock_seating_date(exam_date, session=""):
+    """
+    Lock the SeatingVersion row of (exam_date, session) until the current
+    transaction ends, so two regenerations of the same seating run one
+    after the other. (SQLite ignores FOR UPDATE but only allows one
+    writer anyway.)
+    """
+    SeatingVersion.objects.get_or_create(exam_date=exam_date, session=session, defaults={"version": 0})
+    return SeatingVersion.objects.select_for_update().get(exam_date=exam_date, session=session)
+
+
+def bump_seating_version(exam_date, session=""):
+    """Mark seating for (exam_date, session) as changed; call inside the writing transaction."""
+    updated = SeatingVersion.objects.filter(exam_date=exam_date, session=session).update(
+        version=F("version") + 1, updated_at=timezone.now()
+    )
+    if not updated:
+        SeatingVersion.objects.create(exam_date=exam_date, session=session)
+
+
+def get_seating_version(exam_date, session=""):
+    """Returns (version, updated_at), or (0, None) if never generated."""
+    row = (
+        SeatingVersion.objects.filter(exam_date=exam_date, session=session)
+        .values_list("version", "updated_at")
+        .first()
+    )
+    return row or (0, None)
+
+
+async def aget_seating_version(exam_date, session=""):
+    """get_seating_version() for async callers."""
+    row = await (
+        SeatingVersion.objects.filter(exam_date=exam_date, session=session)
+        .values_list("version", "updated_at")
+        .afirst()
+    )
+    return row or (0, None)
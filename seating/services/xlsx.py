@@ -0,0 +1,47 @@
+"""
+Thin adapter over openpyxl, the only module that imports it.
+
+openpyxl is imported on first use (about 0.25 s and 12 MB), so gunicorn
+workers and manage.py commands that never read or write a workbook
+don't pay for it. Upload parsing (spreadsheet.py) and the Excel export
+(excel_export.py) go through here; pandas and numpy are likewise only
+imported inside the functions that need them.
+"""
+import functools
+
+
+@functools.cache
+def _openpyxl():
+    import openpyxl
+    import openpyxl.cell
+    import openpyxl.styles
+    import openpyxl.utils
+    return openpyxl
+
+
+def load_workbook(f, read_only=True, data_only=True):
+    return _openpyxl().load_workbook(f, read_only=read_only, data_only=data_only)
+
+
+def new_workbook(write_only=False):
+    return _openpyxl().Workbook(write_only=write_only)
+
+
+def write_only_cell(ws, value):
+    return _openpyxl().cell.WriteOnlyCell(ws, value=value)
+
+
+def column_letter(index):
+    return _openpyxl().utils.get_column_letter(index)
+
+
+@functools.cache
+def cell_styles():
+    """(border, center, bold): thin box border, centred text, bold font."""
+    styles = _openpyxl().styles
+    thin = styles.Side(style="thin")
+    return (
+        styles.Border(left=thin, right=thin, top=thin, bottom=thin),
+        styles.Alignment(horizontal="center", vertical="center"),
+        styles.Font(bold=True),
+    )
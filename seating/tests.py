@@ -1,3 +1,1212 @@
-from django.test import TestCase
+import datetime
+import gzip
+import hashlib
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from openpyxl import Workbook, load_workbook
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import (
+    UploadedFile, Student, TimetableRow, ExamSession, Room, RoomUnavailability, Seating, SeatingVersion, Job, RoomSeating,
+    SeatAssignment, SeatingSummary,
+)
+from .benchmarks import compare_results
+from .services.jobs import STALE_AFTER, claim_next_job, run_job
+from .services.metrics import METRICS
+from .services.planner import EMPTY, next_room_code, pack_rooms, plan_seating, plan_seating_in_rooms
+from .services.room_sheets import get_room_sheets
+from .services.roster import bump_roster_version, rolls_for_years
+from .services.seating_generator import generate_seating_for_date, generate_seating_batch
+from .services.response_cache import brotli, cache_stats, seating_cache
+from .services.seat_lookup import LOOKUP_CACHE, find_seats
+from .services.spreadsheet import iter_rolls, iter_rows, normalize_cell
+from .services.student_import import import_students
+from .services.uploads import ARTIFACT_SUFFIX, upload_rows
+
+EXAM_DATE = datetime.date(2025, 11, 20)
+
+# uploads and exports from tests must not land in the project's media/
+TEST_MEDIA_ROOT = tempfile.mkdtemp(prefix="seating-tests-")
+
+
+def tearDownModule():
+    shutil.rmtree(TEST_MEDIA_ROOT, ignore_errors=True)
+
+
+def xlsx_upload(name, rows):
+    wb = Workbook()
+    ws = wb.active
+    for row in rows:
+        ws.append(row)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return SimpleUploadedFile(name, buf.getvalue())
+
+
+def api_client():
+    client = APIClient()
+    client.force_authenticate(User.objects.create_user("staff"))
+    return client
+
+
+def make_students(year, count, prefix=None):
+    prefix = prefix or f"Y{year}-"
+    Student.objects.bulk_create(
+        [Student(roll=f"{prefix}{i:05d}", year=year) for i in range(count)]
+    )
+    bump_roster_version(year)
+
+
+class GenerateSeatingTests(TestCase):
+    def setUp(self):
+        TimetableRow.objects.create(
+            date=EXAM_DATE, i_year_subject="Maths", ii_year_subject="Physics", iii_year_subject="-"
+        )
+
+    def test_returns_counts_and_fills_rooms(self):
+        make_students(1, 50)
+        make_students(2, 40)
+        make_students(3, 30)   # no exam for year 3
+
+        counts = generate_seating_for_date(EXAM_DATE, 45, 5, "MC101")
+
+        self.assertEqual(
+            counts,
+            {"rooms": 2, "seats": 90, "students": 90, "inserted": 90, "updated": 0, "deleted": 0, "moved": 0},
+        )
+        self.assertEqual(
+            sorted(Room.objects.values_list("code", flat=True)), ["MC101", "MC102"]
+        )
+        self.assertEqual(Seating.objects.exclude(roll="").count(), 90)
+        self.assertFalse(Seating.objects.filter(year=3).exists())
+
+    def test_reuses_existing_rooms(self):
+        Room.objects.create(code="MC101", capacity=45)
+        make_students(1, 30)   # 5 year-I columns of 5 rows -> 2 rooms
+
+        generate_seating_for_date(EXAM_DATE, 45, 5, "MC101")
+
+        self.assertEqual(Room.objects.count(), 2)
+
+    def test_view_takes_strategy(self):
+        make_students(1, 20)
+        make_students(2, 20)
+        client = api_client()
+
+        bad = client.post("/api/seating/generate/", {"date": str(EXAM_DATE), "strategy": "nope"})
+        ok = client.post("/api/seating/generate/", {"date": str(EXAM_DATE), "capacity": 45,
+                                                     "strategy": "balanced"})
+
+        self.assertEqual(bad.status_code, 400)
+        self.assertEqual(ok.status_code, 200)
+        self.assertEqual(ok.json()["students"], 40)
+        self.assertEqual(client.post("/api/seating/generate/", {}).status_code, 400)
+        self.assertEqual(client.post("/api/seating/generate/", {"date": "2024-13-01"}).status_code, 400)
+
+    def test_regeneration_is_idempotent(self):
+        make_students(1, 30)
+        generate_seating_for_date(EXAM_DATE, 45, 5, "MC101")
+        version = SeatingVersion.objects.get(exam_date=EXAM_DATE).version
+
+        counts = generate_seating_for_date(EXAM_DATE, 45, 5, "MC101")
+
+        self.assertEqual((counts["inserted"], counts["updated"], counts["deleted"]), (0, 0, 0))
+        self.assertEqual(Seating.objects.count(), 90)
+        # nothing changed, so cached responses stay valid
+        self.assertEqual(SeatingVersion.objects.get(exam_date=EXAM_DATE).version, version)
+
+    def test_regeneration_writes_only_the_diff(self):
+        make_students(1, 30)
+        generate_seating_for_date(EXAM_DATE, 45, 5, "MC101")
+        Student.objects.create(roll="Y1-99999", year=1)   # takes the next empty seat
+        bump_roster_version(1)
+
+        counts = generate_seating_for_date(EXAM_DATE, 45, 5, "MC101")
+
+        self.assertEqual(
+            [counts[k] for k in ("inserted", "updated", "deleted", "moved")], [0, 1, 0, 0]
+        )
+        Student.objects.filter(roll="Y1-00000").delete()   # everyone shifts up a seat
+        bump_roster_version(1)
+
+        counts = generate_seating_for_date(EXAM_DATE, 45, 5, "MC101")
+
+        self.assertEqual(counts["moved"], 30)
+        self.assertEqual(Seating.objects.exclude(roll="").count(), 30)
+
+    def test_duplicates_from_earlier_runs_are_removed(self):
+        make_students(1, 5)
+        generate_seating_for_date(EXAM_DATE, 45, 5, "MC101")
+        Seating.objects.bulk_create([Seating(room=s.room, exam_date=s.exam_date, year=s.year, roll=s.roll,
+                                             row_index=s.row_index, col_index=s.col_index)
+                                     for s in Seating.objects.all()])
+
+        counts = generate_seating_for_date(EXAM_DATE, 45, 5, "MC101")
+
+        self.assertEqual(counts["deleted"], 45)
+        self.assertEqual(Seating.objects.count(), 45)
+
+    def test_query_count_does_not_grow_with_students(self):
+        def count_queries(students):
+            Seating.objects.all().delete()
+            SeatingVersion.objects.all().delete()
+            Student.objects.all().delete()
+            make_students(1, students)
+            with CaptureQueriesContext(connection) as ctx:
+                generate_seating_for_date(EXAM_DATE, 9, 999, "MC101")
+            return len(ctx.captured_queries)
+
+        # 1 room vs 12 rooms; both fit in a single bulk_create batch on SQLite
+        self.assertEqual(count_queries(5), count_queries(60))
+
+
+class PlannerTests(SimpleTestCase):
+    def test_columns_cycle_years_largest_first(self):
+        plan = plan_seating({1: ["a1", "a2"], 2: ["b1", "b2", "b3"]}, 18, 1, "R1")
+
+        self.assertEqual(plan.room_codes, ["R1"])
+        self.assertEqual(len(plan), 18)
+        self.assertEqual(plan.students, 5)
+        seats = list(plan.seats())
+        # column 0 is year 2 (larger cohort), column 1 year 1
+        self.assertEqual(seats[0], ("R1", 0, 0, 2, "b1"))
+        self.assertEqual(seats[1], ("R1", 1, 0, 2, "b2"))
+        self.assertEqual(seats[2], ("R1", 0, 1, 1, "a1"))
+        self.assertEqual(plan.roll[-1], EMPTY)
+
+    def test_rejects_too_few_rooms(self):
+        with self.assertRaises(ValueError):
+            plan_seating({1: ["x"] * 100}, 90, 1)
+        with self.assertRaises(ValueError):
+            plan_seating({1: ["x"]}, 50, 1)
+
+    def test_room_codes_increment(self):
+        self.assertEqual(next_room_code("MC109"), "MC110")
+        self.assertEqual(next_room_code("HALL"), "HALLa")
+
+    def test_large_plan(self):
+        rolls = {y: [f"{y}-{i}" for i in range(34000)] for y in (1, 2, 3)}
+        plan = plan_seating(rolls, 90, 2000)
+        self.assertEqual(plan.students, 102000)
+
+    def _neighbour_conflicts(self, plan):
+        grid = {(code, row, col): (yr, roll) for code, row, col, yr, roll in plan.seats()}
+        return sum(
+            1 for (code, row, col), (yr, roll) in grid.items()
+            if roll and grid.get((code, row, col + 1), (None, ""))[1] and grid[(code, row, col + 1)][0] == yr
+        )
+
+    def test_balanced_keeps_years_apart(self):
+        rolls = {1: [f"a{i}" for i in range(340)], 2: [f"b{i}" for i in range(330)],
+                 3: [f"c{i}" for i in range(330)]}
+        plan = plan_seating(rolls, 90, 50, strategy="balanced")
+
+        self.assertEqual(plan.students, 1000)
+        self.assertEqual(len(plan.room_codes), 12)
+        self.assertEqual(self._neighbour_conflicts(plan), 0)
+        seated = [roll for *_, roll in plan.seats() if roll]
+        self.assertEqual(sorted(seated), sorted(r for rs in rolls.values() for r in rs))
+        per_room = {}
+        for code, _, _, _, roll in plan.seats():
+            per_room[code] = per_room.get(code, 0) + bool(roll)
+        self.assertLessEqual(max(per_room.values()) - min(per_room.values()), 1)
+
+    def test_balanced_separates_a_dominant_year_with_empty_seats(self):
+        plan = plan_seating({1: [f"a{i}" for i in range(80)], 2: ["b1", "b2"]}, 90, 5, strategy="balanced")
+
+        # 80 year I students need two rooms to leave a gap between each
+        self.assertEqual(len(plan.room_codes), 2)
+        self.assertEqual(self._neighbour_conflicts(plan), 0)
+
+    def test_balanced_caps_each_room_of_a_mixed_inventory(self):
+        rooms = [("A", 135, 9), ("B", 135, 9), ("C", 30, 6), ("D", 135, 5), ("E", 135, 9)]
+        for rolls in ({1: [f"a{i}" for i in range(298)]},
+                      {1: [f"a{i}" for i in range(200)], 2: [f"b{i}" for i in range(150)], 4: ["d1"]}):
+            plan = plan_seating_in_rooms(rolls, rooms, "balanced")
+
+            self.assertEqual(plan.students, sum(map(len, rolls.values())))
+            self.assertEqual(self._neighbour_conflicts(plan), 0)
+
+    def test_pack_rooms_opens_fewest_halls(self):
+        rooms = [("A", 5, 9), ("B", 10, 9), ("C", 15, 9), ("D", 15, 9)]
+
+        # 140 students: two 135s leave 5, which the 45 holds
+        self.assertEqual([r[0] for r in pack_rooms(275, rooms)], ["C", "D", "A", "B"])
+        self.assertEqual([r[0] for r in pack_rooms(80, rooms)], ["B", "C", "D", "A"])
+
+    def test_plan_in_rooms_uses_each_layout(self):
+        rolls = {1: [f"a{i}" for i in range(60)], 2: [f"b{i}" for i in range(40)]}
+        plan = plan_seating_in_rooms(rolls, [("S", 45, 9), ("W", 60, 6), ("L", 135, 9)], "balanced")
+
+        self.assertEqual(plan.room_codes, ["L"])
+        self.assertEqual(plan.room_shapes, [(15, 9)])
+        self.assertEqual(plan.students, 100)
+        with self.assertRaises(ValueError):
+            plan_seating_in_rooms(rolls, [("S", 45, 9)])
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            plan_seating({1: ["x"]}, 9, 1, strategy="nope")
+
+
+class BenchmarkCompareTests(SimpleTestCase):
+    def report(self, **benches):
+        return {"results": {"1000": {
+            name: {"wall_s": wall, "queries": queries, "peak_mb": 1.0} for name, (wall, queries) in benches.items()
+        }}}
+
+    def test_flags_slower_runs_and_extra_queries(self):
+        baseline = self.report(generate=(1.0, 10), view=(0.001, 2), export=(0.5, 1))
+        current = self.report(generate=(1.3, 10), view=(0.004, 3), export=(0.55, 1), new=(9.0, 9))
+
+        regressions = compare_results(baseline, current, threshold=0.2)
+
+        # view: +300% but under the noise floor, so only the extra query counts
+        self.assertEqual(regressions, [
+            "generate @ 1000: 1.0000s -> 1.3000s (+30%)",
+            "view @ 1000: 2 -> 3 queries",
+        ])
+
+
+class StartupImportTests(SimpleTestCase):
+    def test_serving_app_does_not_import_heavy_libraries(self):
+        code = ("import sys, seatingbackend.wsgi; "
+                "print(','.join(m for m in ('pandas', 'numpy', 'openpyxl') if m in sys.modules))")
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": "seatingbackend.settings"}
+        env.pop("SEATING_PRELOAD_IMPORTS", None)
+
+        proc = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True,
+                              cwd=settings.BASE_DIR)
+
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(proc.stdout.strip(), "")
+
+
+class ImportStudentsTests(TestCase):
+    def test_reports_inserted_skipped_and_duplicates(self):
+        make_students(2, 3, prefix="R")   # R00000..R00002 already in year II
+
+        counts = import_students(["R00000", "R00001", "N1", "N2", "N1", 123], 2)
+
+        self.assertEqual(counts, {"inserted": 3, "skipped": 2, "duplicates_in_file": 1})
+        self.assertEqual(Student.objects.filter(year=2).count(), 6)
+        self.assertTrue(Student.objects.filter(roll="123", year=2).exists())
+
+    def test_same_roll_allowed_in_other_year(self):
+        make_students(1, 1, prefix="R")
+
+        counts = import_students(["R00000"], 2)
+
+        self.assertEqual(counts["inserted"], 1)
+
+    def test_query_count_is_batched(self):
+        bump_roster_version(1)
+        # select, savepoint, 3 x (insert, count), roster version, release
+        with self.assertNumQueries(10):
+            import_students([f"S{i}" for i in range(25)], 1, batch_size=10)
+
+    def test_rolls_inserted_concurrently_are_not_counted(self):
+        bulk_create = Student.objects.bulk_create
+
+        def race(objs, **kwargs):
+            Student.objects.create(roll="N1", year=2)   # another upload got there first
+            return bulk_create(objs, **kwargs)
+
+        upload = UploadedFile.objects.create(file="students.xlsx")
+        with mock.patch.object(Student.objects, "bulk_create", side_effect=race):
+            counts = import_students(["N1", "N2"], 2, uploaded_file=upload)
+
+        self.assertEqual(counts, {"inserted": 1, "skipped": 1, "duplicates_in_file": 0})
+
+
+class RosterCacheTests(TestCase):
+    def test_rolls_sorted_cached_and_reloaded_after_import(self):
+        import_students(["B", "C", "A"], 1)
+        make_students(2, 3)
+
+        self.assertEqual(rolls_for_years([1]), {1: ("A", "B", "C")})
+        with self.assertNumQueries(1):   # versions only
+            self.assertEqual(rolls_for_years([1])[1], ("A", "B", "C"))
+
+        import_students(["AA"], 1)
+        self.assertEqual(rolls_for_years([1])[1], ("A", "AA", "B", "C"))
+
+    def test_single_year_day_reads_only_that_cohort(self):
+        TimetableRow.objects.create(date=EXAM_DATE, i_year_subject="Maths", ii_year_subject="-")
+        make_students(1, 10)
+        make_students(2, 10)
+
+        with CaptureQueriesContext(connection) as ctx:
+            generate_seating_for_date(EXAM_DATE, 45, 5, "MC101")
+
+        student_queries = [q["sql"] for q in ctx.captured_queries if 'FROM "seating_student"' in q["sql"]]
+        self.assertEqual(len(student_queries), 1)
+        self.assertIn('"year" = 1', student_queries[0])
+        self.assertEqual(Seating.objects.exclude(roll="").count(), 10)
+
+
+class SpreadsheetTests(SimpleTestCase):
+    def test_normalize_cell(self):
+        self.assertEqual(normalize_cell(None), "")
+        self.assertEqual(normalize_cell(12345.0), "12345")
+        self.assertEqual(normalize_cell(float("nan")), "")
+        self.assertEqual(normalize_cell(datetime.datetime(2025, 11, 20)), "2025-11-20")
+        self.assertEqual(normalize_cell(" 23g101 "), "23g101")
+
+    def test_rolls_from_csv_use_roll_column(self):
+        f = io.BytesIO(b"\xef\xbb\xbfName,Reg No\nAsha,R1\nRavi,\nMeena,R3\n")
+        self.assertEqual(list(iter_rolls(iter_rows(f, "register.csv"))), ["R1", "R3"])
+
+    def test_rolls_from_xlsx_fall_back_to_first_column(self):
+        f = xlsx_upload("I_bsc.xlsx", [["ID", "Name"], [101, "Asha"], [None, None], [102, "Ravi"]])
+        self.assertEqual(list(iter_rolls(iter_rows(f))), ["101", "102"])
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class UploadViewTests(TestCase):
+    def setUp(self):
+        self.client = api_client()
+
+    def test_upload_students_csv(self):
+        f = SimpleUploadedFile("III_bsc.csv", b"rno,name\n23g101,A\n23g102,B\n23g101,A\n")
+
+        resp = self.client.post("/api/seating/upload/students/", {"file": f})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["inserted"], 2)
+        self.assertEqual(resp.data["duplicates_in_file"], 1)
+        self.assertEqual(set(Student.objects.values_list("year", flat=True)), {3})
+
+    def test_upload_timetable_xlsx(self):
+        f = xlsx_upload("timetable.xlsx", [
+            ["DATE", "I YEAR SUBJECT", "II YEAR SUBJECT", "III YEAR SUBJECT"],
+            [datetime.datetime(2025, 11, 20), "Maths", None, "Networks"],
+            ["21-11-2025", None, "Physics", None],
+        ])
+
+        resp = self.client.post("/api/seating/upload/timetable/", {"file": f})
+
+        self.assertEqual(resp.data, {"rows": 2})
+        row = TimetableRow.objects.get(date=EXAM_DATE)
+        self.assertEqual((row.i_year_subject, row.ii_year_subject), ("Maths", ""))
+        self.assertTrue(TimetableRow.objects.filter(date="2025-11-21").exists())
+
+    def test_identical_upload_reuses_file_and_parse_artifact(self):
+        content = b"rno\n23g101\n23g102\n"
+        first = self.client.post("/api/seating/upload/students/",
+                                 {"file": SimpleUploadedFile("III_bsc.csv", content)})
+        uf = UploadedFile.objects.get()
+        self.assertEqual(uf.sha256, hashlib.sha256(content).hexdigest())
+        self.assertNotIn("duplicate_of", first.data)
+        with open(uf.file.path, "wb") as f:   # only the artifact can still be read
+            f.write(b"garbage")
+        Student.objects.filter(roll="23g102").delete()
+
+        second = self.client.post("/api/seating/upload/students/",
+                                  {"file": SimpleUploadedFile("III_bsc.csv", content)})
+
+        self.assertEqual(UploadedFile.objects.count(), 1)
+        self.assertEqual(second.data["duplicate_of"], uf.pk)
+        self.assertEqual(second.data["previous_result"]["inserted"], 2)
+        self.assertEqual((second.data["inserted"], second.data["skipped"]), (1, 1))
+
+    def test_same_content_of_another_kind_is_not_a_duplicate(self):
+        content = b"DATE,I YEAR SUBJECT\n2025-11-20,Maths\n"
+        self.client.post("/api/seating/upload/students/", {"file": SimpleUploadedFile("I.csv", content)})
+
+        resp = self.client.post("/api/seating/upload/timetable/", {"file": SimpleUploadedFile("tt.csv", content)})
+
+        self.assertEqual(resp.data, {"rows": 1})
+        self.assertEqual(sorted(UploadedFile.objects.values_list("kind", flat=True)), ["students", "timetable"])
+
+    def test_truncated_artifact_falls_back_to_the_file(self):
+        content = b"rno\n" + b"\n".join(b"R%d" % i for i in range(5000)) + b"\n"
+        self.client.post("/api/seating/upload/students/", {"file": SimpleUploadedFile("I.csv", content)})
+        uf = UploadedFile.objects.get()
+        artifact = uf.file.path + ARTIFACT_SUFFIX
+        with open(artifact, "rb") as f:
+            data = f.read()
+        with open(artifact, "wb") as f:
+            f.write(data[:len(data) // 2])
+
+        rows = list(upload_rows(uf))
+
+        self.assertEqual(rows, [["rno"]] + [[f"R{i}"] for i in range(5000)])
+        with gzip.open(artifact) as f:   # rebuilt, one row per line
+            self.assertEqual(f.read().count(b"\n"), 5001)
+
+    def test_clean_upload_artifacts(self):
+        content = b"rno\n23g101\n"
+        self.client.post("/api/seating/upload/students/", {"file": SimpleUploadedFile("I.csv", content)})
+        uf = UploadedFile.objects.get()
+        artifact = uf.file.path + ARTIFACT_SUFFIX
+        self.assertTrue(os.path.exists(artifact))
+
+        out = io.StringIO()
+        call_command("clean_upload_artifacts", "--max-mb", "0", stdout=out)
+
+        self.assertIn("Evicted 1", out.getvalue())
+        self.assertFalse(os.path.exists(artifact))
+        self.client.post("/api/seating/upload/students/", {"file": SimpleUploadedFile("I.csv", content)})
+        self.assertTrue(os.path.exists(artifact))
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class DownloadSeatingExcelTests(TestCase):
+    def setUp(self):
+        self.client = api_client()
+        TimetableRow.objects.create(date=EXAM_DATE, i_year_subject="Maths")
+        make_students(1, 100)
+        generate_seating_for_date(EXAM_DATE, 90, 5, "MC101")
+
+    def test_one_sheet_per_room_plus_summary(self):
+        resp = self.client.get(f"/api/seating/download/{EXAM_DATE}/")
+
+        self.assertEqual(resp.status_code, 200)
+        wb = load_workbook(io.BytesIO(b"".join(resp.streaming_content)))
+        self.assertEqual(wb.sheetnames, ["Summary", "MC101", "MC102"])
+        self.assertEqual(wb["MC101"]["A3"].value, "Y1-00000")
+        self.assertEqual(wb["Summary"]["B5"].value, 100)
+
+    def test_repeat_download_served_from_cache(self):
+        self.client.get(f"/api/seating/download/{EXAM_DATE}/")
+        with self.assertNumQueries(1):   # version lookup only
+            self.client.get(f"/api/seating/download/{EXAM_DATE}/")
+
+    def test_unknown_date(self):
+        resp = self.client.get("/api/seating/download/2030-01-01/")
+        self.assertEqual(resp.status_code, 404)
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class RoomSheetsTests(TestCase):
+    def setUp(self):
+        self.client = api_client()
+        TimetableRow.objects.create(date=EXAM_DATE, i_year_subject="Maths")
+        make_students(1, 100)
+        generate_seating_for_date(EXAM_DATE, 18, 999, "MC101")   # 6 rooms
+
+    def get_zip(self, url):
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200, getattr(resp, "data", None))
+        return zipfile.ZipFile(io.BytesIO(b"".join(resp.streaming_content)))
+
+    def test_date_archive_has_html_and_xlsx_per_room(self):
+        archive = self.get_zip(f"/api/seating/sheets/{EXAM_DATE}/")
+
+        self.assertEqual(len(archive.namelist()), 12)
+        page = archive.read("MC101.html").decode()
+        self.assertIn("FN Year 1: Maths", page)
+        self.assertIn("<li>Y1-00000 <small>R1C1</small></li>", page)
+        wb = load_workbook(io.BytesIO(archive.read("MC101.xlsx")))
+        self.assertEqual(wb["MC101"]["A3"].value, "Y1-00000")
+        self.assertEqual(wb["Rolls"]["B3"].value, "R1C1")
+
+        with self.assertNumQueries(1):   # version lookup only
+            self.get_zip(f"/api/seating/sheets/{EXAM_DATE}/")
+
+    def test_pool_render_matches_inline_and_old_versions_are_dropped(self):
+        inline = get_room_sheets([EXAM_DATE], ("html",), workers=1)[0][1]
+        with open(inline, "rb") as f:
+            expected = {n: z.read(n) for z in [zipfile.ZipFile(f)] for n in z.namelist()}
+        make_students(1, 1, prefix="Z")
+        generate_seating_for_date(EXAM_DATE, 18, 999, "MC101")
+
+        with mock.patch("seating.services.room_sheets.MIN_POOL_ROOMS", 0):
+            pooled = get_room_sheets([EXAM_DATE], ("html",), workers=2)[0][1]
+
+        self.assertFalse(os.path.exists(inline))
+        archive = zipfile.ZipFile(pooled)
+        self.assertEqual(archive.namelist(), list(expected))
+        self.assertEqual(archive.read("MC101.html"), expected["MC101.html"])
+        self.assertIn(b"Z00000", archive.read("MC106.html"))
+
+    def test_timetable_archive_streams_a_zip_per_date(self):
+        archive = self.get_zip("/api/seating/sheets/?formats=xlsx")
+
+        self.assertEqual(archive.namelist(), [f"room_sheets_{EXAM_DATE}.zip"])
+        inner = zipfile.ZipFile(io.BytesIO(archive.read(f"room_sheets_{EXAM_DATE}.zip")))
+        self.assertEqual(inner.namelist()[0], "MC101.xlsx")
+        self.assertEqual(self.client.get("/api/seating/sheets/?formats=pdf").status_code, 400)
+        self.assertEqual(self.client.get("/api/seating/sheets/?from=2030-01-01").status_code, 404)
+
+    def test_sheets_of_one_sessions_seating(self):
+        day = datetime.date(2025, 11, 22)
+        TimetableRow.objects.create(date=day, i_year_subject="Maths", ii_year_subject="Physics")
+        ExamSession.objects.create(date=day, session="FN", year=1, subject="Maths")
+        ExamSession.objects.create(date=day, session="AN", year=2, subject="Physics")
+        make_students(2, 5)
+        generate_seating_for_date(day, 18, 999, "MC101", session="AN")
+
+        self.assertEqual(self.client.get(f"/api/seating/sheets/{day}/").status_code, 404)
+        resp = self.client.get(f"/api/seating/sheets/{day}/?session=AN&formats=html")
+        self.assertIn(f"room_sheets_{day}_AN.zip", resp["Content-Disposition"])
+        page = zipfile.ZipFile(io.BytesIO(b"".join(resp.streaming_content))).read("MC101.html").decode()
+        self.assertIn(f"Room MC101 &middot; {day} AN", page)
+        self.assertIn("AN Year 2: Physics", page)
+        self.assertNotIn("Maths", page)
+        archive = self.get_zip(f"/api/seating/sheets/?from={day}&session=AN")
+        self.assertEqual(archive.namelist(), [f"room_sheets_{day}_AN.zip"])
+
+
+class SeatingReadViewTests(TestCase):
+    def setUp(self):
+        seating_cache().clear()
+        self.client = api_client()
+        TimetableRow.objects.create(date=EXAM_DATE, i_year_subject="Maths", ii_year_subject="Physics")
+
+    def seat(self, year1, year2):
+        Seating.objects.all().delete()
+        Student.objects.all().delete()
+        make_students(1, year1)
+        make_students(2, year2)
+        generate_seating_for_date(EXAM_DATE, 18, 999, "MC101")
+
+    def test_grouped_grid(self):
+        self.seat(3, 1)
+
+        data = self.client.get(f"/api/seating/view_grouped/{EXAM_DATE}/").json()
+
+        self.assertEqual(list(data), ["MC101"])
+        self.assertEqual(data["MC101"][0][:3], ["Y1-00000", "Y2-00000", "Y1-00002"])
+        self.assertEqual(data["MC101"][1][:3], ["Y1-00001", "", ""])
+
+    def test_flat_list(self):
+        self.seat(1, 0)
+
+        data = self.client.get(f"/api/seating/view/{EXAM_DATE}/").json()
+
+        self.assertEqual(len(data), 18)
+        self.assertEqual(data[0], {"room": "MC101", "row": 0, "col": 0, "roll": "Y1-00000"})
+
+    def test_query_count_independent_of_seat_count(self):
+        for url in ("view", "view_grouped", "rooms"):
+            counts = []
+            for size in (2, 60):   # 1 room vs 7 rooms
+                self.seat(size, size)
+                with CaptureQueriesContext(connection) as ctx:
+                    self.client.get(f"/api/seating/{url}/{EXAM_DATE}/")
+                counts.append(len(ctx.captured_queries))
+            self.assertEqual(counts[0], counts[1], url)
+            self.assertEqual(counts[0], 2, url)   # version + seats on a cache miss
+
+    def test_cache_hit_and_invalidation(self):
+        self.seat(3, 0)
+        url = f"/api/seating/view_grouped/{EXAM_DATE}/"
+        first = self.client.get(url)
+
+        with self.assertNumQueries(1):   # version lookup only
+            second = self.client.get(url)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(cache_stats()["hits"], 1)
+
+        Seating.objects.all().delete()
+        make_students(1, 1, prefix="NEW")
+        generate_seating_for_date(EXAM_DATE, 18, 999, "MC101")
+        self.assertIn("NEW00000", self.client.get(url).content.decode())
+
+    def test_etag_revalidation(self):
+        self.seat(3, 0)
+        url = f"/api/seating/view/{EXAM_DATE}/"
+        resp = self.client.get(url)
+        self.assertTrue(resp["Last-Modified"])
+
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=resp["ETag"])
+
+        self.assertEqual(resp.status_code, 304)
+
+    def test_fields_projection_and_empty_seats(self):
+        self.seat(3, 0)
+
+        data = self.client.get(f"/api/seating/view/{EXAM_DATE}/", {"fields": "roll,room", "empty": "0"}).json()
+
+        self.assertEqual(data, [{"roll": f"Y1-0000{i}", "room": "MC101"} for i in (0, 2, 1)])   # row-major
+        resp = self.client.get(f"/api/seating/view/{EXAM_DATE}/", {"fields": "roll,seat"})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_columnar_layout_keeps_every_seat(self):
+        self.seat(30, 10)
+        flat = self.client.get(f"/api/seating/view/{EXAM_DATE}/").json()
+
+        data = self.client.get(f"/api/seating/view/{EXAM_DATE}/", {"layout": "columnar"}).json()
+
+        rebuilt = [
+            {"room": room, "row": i // r["columns"], "col": i % r["columns"], "roll": roll}
+            for room, r in data.items()
+            for i, roll in enumerate(r["rolls"])
+        ]
+        self.assertEqual(rebuilt, flat)
+
+    def test_cursor_pagination_by_room(self):
+        self.seat(40, 40)   # 5 rooms
+        url, rooms = f"/api/seating/view/{EXAM_DATE}/?limit=2&empty=0&utm_source=mail", []
+        while url:
+            page = self.client.get(url).json()
+            rooms.append(sorted({s["room"] for s in page["results"]}))
+            url = page["next"]
+
+        self.assertEqual([len(r) for r in rooms], [2, 2, 1])
+        # the first page is cached; its next link must not carry the first requester's extra params
+        first = self.client.get(f"/api/seating/view/{EXAM_DATE}/", {"empty": 0, "limit": 2}).json()
+        self.assertNotIn("utm_source", first["next"])
+        self.assertEqual(sum(rooms, []), self.client.get(f"/api/seating/rooms/{EXAM_DATE}/").json())
+        bad = self.client.get(f"/api/seating/view/{EXAM_DATE}/", {"limit": 2, "cursor": "%%%"})
+        self.assertEqual(bad.status_code, 400)
+
+    def test_compressed_responses(self):
+        self.seat(30, 10)
+        url = f"/api/seating/view/{EXAM_DATE}/"
+        plain = self.client.get(url)
+
+        resp = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+        self.assertEqual(resp["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", resp["Vary"])
+        self.assertEqual(gzip.decompress(resp.content), plain.content)
+        self.assertNotEqual(resp["ETag"], plain["ETag"])
+        refused = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip;q=0")
+        self.assertFalse(refused.has_header("Content-Encoding"))
+
+    @skipUnless(brotli, "brotli not installed")
+    def test_brotli_preferred(self):
+        self.seat(3, 0)
+
+        resp = self.client.get(f"/api/seating/view/{EXAM_DATE}/", HTTP_ACCEPT_ENCODING="gzip, br")
+
+        self.assertEqual(resp["Content-Encoding"], "br")
+        self.assertEqual(len(brotli.decompress(resp.content).decode().split("MC101")), 19)
+
+    def test_cache_stats_requires_admin(self):
+        self.assertEqual(self.client.get("/api/seating/cache/stats/").status_code, 403)
+        admin = APIClient()
+        admin.force_authenticate(User.objects.create_superuser("admin"))
+        self.assertIn("hits", admin.get("/api/seating/cache/stats/").json())
+
+
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        seating_cache().clear()
+        LOOKUP_CACHE.clear()
+        TimetableRow.objects.create(date=EXAM_DATE, i_year_subject="Maths", ii_year_subject="Physics")
+        make_students(1, 12)
+        make_students(2, 6)
+        generate_seating_for_date(EXAM_DATE, 9, 999, "MC101")
+        user = User.objects.create_user("staff")
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+        self.sync = APIClient()
+        self.sync.force_authenticate(user)
+
+    def test_same_bodies_as_sync_views(self):
+        for path in ("rooms", "view", "view_grouped"):
+            url = f"/api/seating/{path}/{EXAM_DATE}/"
+            async_resp = self.client.get(url.replace("/seating/", "/seating/async/"), **self.auth)
+            self.assertEqual(async_resp.status_code, 200)
+            self.assertEqual(async_resp.json(), self.sync.get(url).json())
+            self.assertEqual(async_resp["ETag"], self.sync.get(url)["ETag"])
+
+    def test_find_seat(self):
+        resp = self.client.get(f"/api/seating/async/find/Y1-00000/?date={EXAM_DATE}", **self.auth)
+
+        self.assertEqual(resp.json(), self.sync.get(f"/api/seating/find/Y1-00000/?date={EXAM_DATE}").json())
+        self.assertEqual(self.client.get("/api/seating/async/find/NOPE/", **self.auth).status_code, 404)
+        self.assertEqual(self.client.get("/api/seating/async/find/%20/", **self.auth).status_code, 404)
+
+    def test_requires_token(self):
+        self.assertEqual(self.client.get(f"/api/seating/async/view/{EXAM_DATE}/").status_code, 401)
+        bad = self.client.get(f"/api/seating/async/view/{EXAM_DATE}/", HTTP_AUTHORIZATION="Bearer nope")
+        self.assertEqual(bad.status_code, 401)
+
+    async def test_served_under_asgi_with_metrics(self):
+        METRICS.reset()
+        resp = await AsyncClient().get(
+            f"/api/seating/async/view_grouped/{EXAM_DATE}/",
+            headers={"Authorization": self.auth["HTTP_AUTHORIZATION"]},
+        )
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("MC101", resp.json())
+        self.assertGreater(METRICS.queries["view_seating_grouped"], 0)
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        METRICS.reset()
+        seating_cache().clear()
+        self.admin = APIClient()
+        self.admin.force_authenticate(User.objects.create_superuser("admin"))
+
+    def test_records_views_in_prometheus_format(self):
+        TimetableRow.objects.create(date=EXAM_DATE, i_year_subject="Maths")
+        make_students(1, 5)
+        generate_seating_for_date(EXAM_DATE, 9, 999, "MC101")
+        self.admin.get(f"/api/seating/view_grouped/{EXAM_DATE}/")
+
+        resp = self.admin.get("/api/seating/metrics/")
+
+        self.assertTrue(resp["Content-Type"].startswith("text/plain"))
+        body = resp.content.decode()
+        self.assertIn(
+            'seating_requests_total{view="ViewSeatingGroupedView",method="GET",status="200"} 1', body
+        )
+        self.assertIn('seating_request_duration_seconds_count{view="ViewSeatingGroupedView"} 1', body)
+        self.assertIn('seating_response_size_bytes_bucket{view="ViewSeatingGroupedView",le="+Inf"} 1', body)
+        queries = next(l for l in body.splitlines()
+                       if l.startswith('seating_db_queries_total{view="ViewSeatingGroupedView"}'))
+        self.assertGreater(int(queries.split()[-1]), 0)
+
+    def test_requires_admin(self):
+        self.assertEqual(api_client().get("/api/seating/metrics/").status_code, 403)
+
+    @override_settings(SEATING_SLOW_REQUEST_MS=0)
+    def test_slow_requests_log_top_sql(self):
+        with self.assertLogs("seating.slow", "WARNING") as logs:
+            self.admin.get(f"/api/seating/rooms/{EXAM_DATE}/")
+
+        self.assertIn("RoomsForDateView", logs.output[0])
+        self.assertIn("SELECT", logs.output[0])
+
+
+class FindSeatTests(TestCase):
+    def setUp(self):
+        LOOKUP_CACHE.clear()
+        self.client = api_client()
+        make_students(1, 20)
+        for day in (20, 21):
+            TimetableRow.objects.create(date=datetime.date(2025, 11, day), i_year_subject="Maths")
+            generate_seating_for_date(datetime.date(2025, 11, day), 9, 999, "MC101")
+
+    def test_next_and_upcoming_seats(self):
+        result = find_seats("Y1-00010", today=datetime.date(2025, 11, 1))
+
+        self.assertEqual(result["seat"], {"date": "2025-11-20", "session": "", "room": "MC102", "row": 0, "col": 1})
+        self.assertEqual([s["date"] for s in result["upcoming"]], ["2025-11-20", "2025-11-21"])
+
+    def test_past_date_requested_explicitly(self):
+        result = find_seats("Y1-00000", EXAM_DATE, today=datetime.date(2025, 11, 21))
+
+        self.assertEqual(result["seat"]["date"], "2025-11-20")
+        self.assertEqual([s["date"] for s in result["upcoming"]], ["2025-11-21"])
+
+    def test_repeat_lookup_served_from_lru(self):
+        find_seats("Y1-00003", today=EXAM_DATE)
+        with self.assertNumQueries(1):   # the versions stamp
+            find_seats("Y1-00003", today=EXAM_DATE)
+
+    def test_regeneration_elsewhere_invalidates_lru(self):
+        # on_commit never fires in a TestCase, like a regeneration in another worker
+        self.assertEqual(find_seats("Y1-00001", EXAM_DATE, today=EXAM_DATE)["seat"]["room"], "MC101")
+        generate_seating_for_date(EXAM_DATE, 9, 999, "MC201")
+        self.assertEqual(find_seats("Y1-00001", EXAM_DATE, today=EXAM_DATE)["seat"]["room"], "MC201")
+
+    def test_endpoint(self):
+        resp = self.client.get("/api/seating/find/Y1-00001/", {"date": "2025-11-21"})
+        self.assertEqual(resp.data["seat"]["room"], "MC101")
+        self.assertEqual(self.client.get("/api/seating/find/NOPE/").status_code, 404)
+
+    def test_blank_roll_matches_no_empty_seat(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/seating/find/%20/").status_code, 404)
+        self.assertEqual(find_seats("", EXAM_DATE, today=EXAM_DATE)["upcoming"], [])
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.client = api_client()
+
+    def run_next(self):
+        job = claim_next_job()
+        run_job(job)
+        return self.client.get(f"/api/seating/jobs/{job.pk}/").data
+
+    def test_async_upload_then_generate(self):
+        f = SimpleUploadedFile("I_bsc.csv", b"rno\n" + b"\n".join(b"R%d" % i for i in range(20)))
+        resp = self.client.post("/api/seating/upload/students/?async=1", {"file": f})
+        self.assertEqual(resp.status_code, 202)
+        self.assertFalse(Student.objects.exists())
+
+        status = self.run_next()
+        self.assertEqual(status["status"], Job.DONE)
+        self.assertEqual(status["result"]["inserted"], 20)
+
+        TimetableRow.objects.create(date=EXAM_DATE, i_year_subject="Maths")
+        resp = self.client.post(
+            "/api/seating/generate/", {"date": str(EXAM_DATE), "capacity": 9, "async": "true"}
+        )
+        self.assertEqual(resp.status_code, 202)
+
+        status = self.run_next()
+        self.assertEqual(status["status"], Job.DONE)
+        self.assertEqual((status["progress"], status["total"]), (3, 3))
+        self.assertEqual(Seating.objects.exclude(roll="").count(), 20)
+
+    def test_failed_job_records_error(self):
+        Job.objects.create(
+            kind=Job.GENERATE_SEATING,
+            payload={"date": str(EXAM_DATE), "capacity": 9, "rooms": 0, "start": "MC101"},
+        )
+
+        with self.assertLogs("seating.services.jobs", "ERROR"):
+            status = self.run_next()
+
+        self.assertEqual(status["status"], Job.FAILED)
+        self.assertEqual(status["error"], "No timetable entry for this date")
+        self.assertIsNone(claim_next_job())
+
+    def test_orphaned_running_job_is_reclaimed(self):
+        payload = {"date": str(EXAM_DATE), "capacity": 9, "rooms": 0, "start": "MC101"}
+        beat = timezone.now() - datetime.timedelta(minutes=1)
+        Job.objects.create(kind=Job.GENERATE_SEATING, status=Job.RUNNING, payload=payload, heartbeat_at=beat)
+        self.assertIsNone(claim_next_job())   # still alive
+
+        orphan = Job.objects.create(
+            kind=Job.GENERATE_SEATING, status=Job.RUNNING, payload=payload,
+            heartbeat_at=timezone.now() - STALE_AFTER - datetime.timedelta(seconds=1),
+        )
+        with self.assertLogs("seating.services.jobs", "WARNING"):
+            job = claim_next_job()
+        self.assertEqual(job.pk, orphan.pk)
+        self.assertGreater(job.heartbeat_at, beat)
+        self.assertIsNone(claim_next_job())
+
+
+class GenerateSeatingBatchTests(TestCase):
+    def setUp(self):
+        make_students(1, 20)
+        make_students(2, 10)
+        for day, subjects in ((20, ("Maths", "")), (21, ("", "Physics")), (22, ("-", "-"))):
+            TimetableRow.objects.create(
+                date=datetime.date(2025, 11, day), i_year_subject=subjects[0], ii_year_subject=subjects[1]
+            )
+
+    def test_plans_every_timetable_date(self):
+        with mock.patch("seating.services.seating_generator.MIN_POOL_DATES", 0):
+            results = generate_seating_batch(None, 9, 999, "MC101", workers=2)
+
+        self.assertEqual([r["date"] for r in results], ["2025-11-20", "2025-11-21", "2025-11-22"])
+        self.assertEqual(results[0]["students"], 20)
+        self.assertEqual(results[1]["students"], 10)
+        self.assertIn("error", results[2])
+        self.assertEqual(Seating.objects.filter(exam_date="2025-11-21").exclude(roll="").count(), 10)
+
+    def test_endpoint_date_range(self):
+        resp = api_client().post(
+            "/api/seating/generate/batch/", {"from": "2025-11-21", "to": "2025-11-30", "capacity": 9}
+        )
+
+        self.assertEqual([r["date"] for r in resp.data["dates"]], ["2025-11-21", "2025-11-22"])
+        self.assertFalse(Seating.objects.filter(exam_date="2025-11-20").exists())
+
+    def test_endpoint_rejects_invalid_bound(self):
+        resp = api_client().post(
+            "/api/seating/generate/batch/", {"from": "2025-11-21", "to": "2025-13-01", "capacity": 9}
+        )
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertFalse(Seating.objects.exists())
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class ExamCalendarTests(TestCase):
+    def setUp(self):
+        self.client = api_client()
+
+    def upload(self, content):
+        return self.client.post("/api/seating/upload/timetable/",
+                                {"file": SimpleUploadedFile("timetable.csv", content)})
+
+    def test_sessions_upload_calendar_and_per_session_generation(self):
+        resp = self.upload(b"DATE,SESSION,YEAR,SUBJECT\n"
+                           b"2025-11-20,AN,II,Physics\n"
+                           b"2025-11-20,FN,I,Maths\n"
+                           b"2025-11-20,afternoon,4th year,Project\n"
+                           b"2025-11-21,FN,III,-\n")
+        self.assertEqual(resp.data, {"rows": 4})
+        row = TimetableRow.objects.get(date=EXAM_DATE)
+        self.assertEqual((row.i_year_subject, row.ii_year_subject, row.iii_year_subject), ("Maths", "Physics", ""))
+
+        calendar = self.client.get("/api/seating/calendar/?to=2025-11-30").json()["dates"]
+        self.assertEqual(calendar, [
+            {"date": "2025-11-20", "sessions": [
+                {"session": "FN", "years": [{"year": 1, "subject": "Maths"}]},
+                {"session": "AN", "years": [{"year": 2, "subject": "Physics"}, {"year": 4, "subject": "Project"}]},
+            ]},
+            {"date": "2025-11-21", "sessions": []},
+        ])
+
+        make_students(1, 10)
+        make_students(2, 5)
+        make_students(4, 3)
+        resp = self.client.post("/api/seating/generate/",
+                                {"date": "2025-11-20", "capacity": 45, "rooms": 5, "session": "AN"})
+        self.assertEqual(resp.data["students"], 8)
+        self.assertEqual(set(Seating.objects.exclude(roll="").values_list("year", flat=True)), {2, 4})
+        summary = self.client.get("/api/seating/summary/2025-11-20/?session=AN").json()
+        self.assertEqual(summary["totals"]["by_year"], {"2": 5, "4": 3})
+
+        # each session is stored under its own key, beside the other one
+        resp = self.client.post("/api/seating/generate/",
+                                {"date": "2025-11-20", "capacity": 45, "rooms": 5, "session": "FN"})
+        self.assertEqual(resp.data["students"], 10)
+        seated = Seating.objects.exclude(roll="")
+        self.assertEqual((seated.filter(session="FN").count(), seated.filter(session="AN").count()), (10, 8))
+        forenoon = self.client.get("/api/seating/view/2025-11-20/?session=FN&empty=0").json()
+        self.assertEqual({s["roll"][:2] for s in forenoon}, {"Y1"})
+        self.assertEqual(self.client.get("/api/seating/view/2025-11-20/").json(), [])
+        self.assertEqual(self.client.get("/api/seating/view/2025-11-20/?session=XX").status_code, 400)
+        seat = self.client.get("/api/seating/find/Y2-00000/?date=2025-11-20&session=AN").json()["seat"]
+        self.assertEqual(seat["session"], "AN")
+        resp = self.client.post("/api/seating/generate/", {"date": "2025-11-20", "capacity": 45, "rooms": 5})
+        self.assertEqual(resp.data["students"], 18)
+        overview = self.client.get("/api/seating/summary/?to=2025-11-20").json()["dates"][0]
+        self.assertEqual((overview["sessions"], overview["students"]), (["", "FN", "AN"], 36))
+
+        resp = self.client.post("/api/seating/generate/", {"date": "2025-11-21", "session": "FN"})
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data["detail"], "No exams in the FN session on that date")
+
+    def test_reupload_replaces_a_days_sessions(self):
+        self.upload(b"DATE,I YEAR SUBJECT,II YEAR SUBJECT,V YEAR SUBJECT\n2025-11-20,Maths,Physics,Law\n")
+        self.upload(b"DATE,SESSION,I YEAR SUBJECT\n2025-11-20,AN,Statistics\n")
+
+        self.assertEqual(list(ExamSession.objects.values_list("session", "year", "subject")),
+                         [("AN", 1, "Statistics")])
+        self.assertEqual(TimetableRow.objects.get(date=EXAM_DATE).ii_year_subject, "")
+
+    def test_rejects_unknown_session(self):
+        resp = self.upload(b"DATE,SESSION,I YEAR SUBJECT\n2025-11-20,night,Maths\n")
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertFalse(ExamSession.objects.exists())
+
+    def test_rejects_a_bound_that_does_not_parse(self):
+        for url in ("calendar", "summary", "sheets"):
+            resp = self.client.get(f"/api/seating/{url}/", {"from": "2025-11-01", "to": "2025-11-31"})
+            self.assertEqual(resp.status_code, 400, url)
+
+
+class RoomInventoryTests(TestCase):
+    def setUp(self):
+        TimetableRow.objects.create(date=EXAM_DATE, i_year_subject="Maths", ii_year_subject="Physics")
+        make_students(1, 50)
+        make_students(2, 50)
+        self.small = Room.objects.create(code="S1", capacity=45)
+        self.hall = Room.objects.create(code="H1", capacity=90)
+        self.wide = Room.objects.create(code="W1", capacity=60, columns=6)
+        Room.objects.create(code="OLD", capacity=135, is_active=False)
+
+    def test_generation_uses_stored_rooms(self):
+        counts = generate_seating_for_date(EXAM_DATE, 90, 999, inventory=True)
+
+        # 90 + 45 seats is the fewest halls (and fewest seats) for 100
+        self.assertEqual(counts["students"], 100)
+        self.assertEqual(counts["rooms"], 2)
+        self.assertEqual(Room.objects.count(), 4)
+        used = set(Seating.objects.values_list("room__code", flat=True))
+        self.assertEqual(used, {"H1", "S1"})
+
+    def test_unavailable_rooms_are_skipped(self):
+        RoomUnavailability.objects.create(room=self.hall, start_date=EXAM_DATE, end_date=EXAM_DATE)
+
+        generate_seating_for_date(EXAM_DATE, 90, 999, strategy="balanced", inventory=True)
+
+        used = set(Seating.objects.values_list("room__code", flat=True))
+        self.assertEqual(used, {"S1", "W1"})
+        # the 60-seat room keeps its own 10 x 6 layout
+        self.assertEqual(Seating.objects.filter(room=self.wide).count(), 60)
+        self.assertFalse(Seating.objects.filter(room=self.wide, col_index__gt=5).exists())
+
+    def test_batch_checks_availability_per_date(self):
+        next_day = EXAM_DATE + datetime.timedelta(days=1)
+        TimetableRow.objects.create(date=next_day, i_year_subject="Chemistry", ii_year_subject="Biology")
+        RoomUnavailability.objects.create(room=self.hall, start_date=next_day, end_date=next_day)
+
+        generate_seating_batch(None, 90, 999, workers=1, strategy="balanced", inventory=True)
+
+        used = lambda d: set(Seating.objects.filter(exam_date=d).values_list("room__code", flat=True))
+        self.assertEqual(used(EXAM_DATE), {"H1", "S1"})
+        self.assertEqual(used(next_day), {"S1", "W1"})
+
+    def test_not_enough_rooms(self):
+        RoomUnavailability.objects.create(
+            room=self.hall, start_date=EXAM_DATE - datetime.timedelta(days=1), end_date=EXAM_DATE
+        )
+        self.small.delete()
+
+        resp = api_client().post("/api/seating/generate/", {"date": str(EXAM_DATE), "inventory": "true"})
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertFalse(Seating.objects.exists())
+
+
+@override_settings(SEATING_STORAGE="grid")
+class GridStorageTests(TestCase):
+    def setUp(self):
+        seating_cache().clear()
+        LOOKUP_CACHE.clear()
+        self.client = api_client()
+        TimetableRow.objects.create(date=EXAM_DATE, i_year_subject="Maths", ii_year_subject="Physics")
+        make_students(1, 3)
+        make_students(2, 1)
+
+    def test_one_record_per_room(self):
+        counts = generate_seating_for_date(EXAM_DATE, 18, 999, "MC101")
+
+        self.assertEqual(counts["inserted"], 1)
+        self.assertFalse(Seating.objects.exists())
+        record = RoomSeating.objects.get()
+        self.assertEqual((record.rows, record.columns), (2, 9))
+        self.assertEqual(record.rolls[:3], ["Y1-00000", "Y2-00000", "Y1-00002"])
+        self.assertEqual(SeatAssignment.objects.count(), 4)
+
+        counts = generate_seating_for_date(EXAM_DATE, 18, 999, "MC101")
+        self.assertEqual((counts["inserted"], counts["updated"], counts["deleted"]), (0, 0, 0))
+
+    def test_read_endpoints_match_seat_storage(self):
+        generate_seating_for_date(EXAM_DATE, 18, 999, "MC101")
+        grid = self.client.get(f"/api/seating/view_grouped/{EXAM_DATE}/").json()
+        flat = self.client.get(f"/api/seating/view/{EXAM_DATE}/").json()
+        found = find_seats("Y1-00001", EXAM_DATE)
+
+        with override_settings(SEATING_STORAGE="seat"):
+            seating_cache().clear()
+            LOOKUP_CACHE.clear()
+            generate_seating_for_date(EXAM_DATE, 18, 999, "MC101")
+            self.assertEqual(self.client.get(f"/api/seating/view_grouped/{EXAM_DATE}/").json(), grid)
+            self.assertEqual(self.client.get(f"/api/seating/view/{EXAM_DATE}/").json(), flat)
+            self.assertEqual(find_seats("Y1-00001", EXAM_DATE), found)
+
+    def test_narrow_room_keeps_its_width_in_both_storages(self):
+        Room.objects.create(code="N1", capacity=12, columns=6)
+        generate_seating_for_date(EXAM_DATE, 18, 999, inventory=True)
+        grid = self.client.get(f"/api/seating/view_grouped/{EXAM_DATE}/").json()
+        columnar = self.client.get(f"/api/seating/view/{EXAM_DATE}/", {"layout": "columnar"}).json()
+
+        self.assertEqual([len(row) for row in grid["N1"]], [6, 6])
+        self.assertEqual(columnar["N1"]["columns"], 6)
+        with override_settings(SEATING_STORAGE="seat"):
+            seating_cache().clear()
+            generate_seating_for_date(EXAM_DATE, 18, 999, inventory=True)
+            self.assertEqual(self.client.get(f"/api/seating/view_grouped/{EXAM_DATE}/").json(), grid)
+            self.assertEqual(
+                self.client.get(f"/api/seating/view/{EXAM_DATE}/", {"layout": "columnar"}).json(), columnar
+            )
+
+    def test_sessions_share_rooms_and_survive_conversion(self):
+        ExamSession.objects.create(date=EXAM_DATE, session="FN", year=1, subject="Maths")
+        ExamSession.objects.create(date=EXAM_DATE, session="AN", year=2, subject="Physics")
+        generate_seating_for_date(EXAM_DATE, 18, 999, "MC101", session="FN")
+        generate_seating_for_date(EXAM_DATE, 18, 999, "MC101", session="AN")
+
+        self.assertEqual(sorted(RoomSeating.objects.values_list("session", "room__code")),
+                         [("AN", "MC101"), ("FN", "MC101")])
+        self.assertEqual(self.client.get(f"/api/seating/rooms/{EXAM_DATE}/?session=AN").json(), ["MC101"])
+        self.assertEqual(find_seats("Y2-00000", EXAM_DATE, session="AN")["seat"]["session"], "AN")
+
+        call_command("convert_seating_storage", "--to", "seat", stdout=io.StringIO())
+        self.assertEqual(
+            sorted(Seating.objects.exclude(roll="").values_list("session", "roll")),
+            [("AN", "Y2-00000"), ("FN", "Y1-00000"), ("FN", "Y1-00001"), ("FN", "Y1-00002")],
+        )
+
+    def test_convert_command_round_trip(self):
+        with override_settings(SEATING_STORAGE="seat"):
+            generate_seating_for_date(EXAM_DATE, 18, 999, "MC101")
+
+        call_command("convert_seating_storage", "--to", "grid", "--drop-source", stdout=io.StringIO())
+
+        self.assertFalse(Seating.objects.exists())
+        self.assertEqual(RoomSeating.objects.get().rolls[1], "Y2-00000")
+
+        call_command("convert_seating_storage", "--to", "seat", stdout=io.StringIO())
+
+        self.assertEqual(Seating.objects.count(), 18)
+        self.assertEqual(Seating.objects.get(row_index=0, col_index=1).roll, "Y2-00000")
+
+
+class SeatingSummaryTests(TestCase):
+    def setUp(self):
+        seating_cache().clear()
+        self.client = api_client()
+        TimetableRow.objects.create(date=EXAM_DATE, i_year_subject="Maths", ii_year_subject="Physics")
+        TimetableRow.objects.create(date=EXAM_DATE + datetime.timedelta(days=1), iii_year_subject="Chemistry")
+        make_students(1, 20)
+        make_students(2, 5)
+
+    def test_summary_matches_seating(self):
+        generate_seating_for_date(EXAM_DATE, 18, 999, "MC101")
+
+        data = self.client.get(f"/api/seating/summary/{EXAM_DATE}/").json()
+
+        for room in data["rooms"]:
+            seats = Seating.objects.filter(exam_date=EXAM_DATE, room__code=room["room"])
+            occupied = seats.exclude(roll="")
+            self.assertEqual(room["seats"], seats.count())
+            self.assertEqual(room["students"], occupied.count())
+            self.assertEqual(room["by_year"].get("2", 0), occupied.filter(year=2).count())
+            self.assertEqual(room["first_roll"], occupied.order_by("roll").first().roll)
+            self.assertEqual(room["last_roll"], occupied.order_by("roll").last().roll)
+        self.assertEqual(data["totals"]["students"], 25)
+        self.assertEqual(data["totals"]["by_year"], {"1": 20, "2": 5})
+        self.assertEqual(data["totals"]["empty_seats"], data["totals"]["seats"] - 25)
+
+    def test_regeneration_keeps_summary_consistent(self):
+        generate_seating_for_date(EXAM_DATE, 18, 999, "MC101")
+        url = f"/api/seating/summary/{EXAM_DATE}/"
+        self.assertEqual(self.client.get(url).json()["totals"]["rooms"], 2)
+
+        Student.objects.filter(year=1).delete()
+        bump_roster_version(1)
+        generate_seating_for_date(EXAM_DATE, 18, 999, "MC101")
+
+        data = self.client.get(url).json()
+        self.assertEqual(data["totals"]["rooms"], 1)
+        self.assertEqual(data["totals"]["students"], 5)
+        self.assertEqual(SeatingSummary.objects.count(), 1)
+
+    @override_settings(SEATING_STORAGE="grid")
+    def test_grid_storage_and_rebuild_command(self):
+        generate_seating_for_date(EXAM_DATE, 18, 999, "MC101")
+        expected = list(SeatingSummary.objects.order_by("room_id").values_list("room_id", "students", "last_roll"))
+        SeatingSummary.objects.all().delete()
+
+        call_command("rebuild_seating_summary", stdout=io.StringIO())
+
+        self.assertEqual(
+            list(SeatingSummary.objects.order_by("room_id").values_list("room_id", "students", "last_roll")),
+            expected,
+        )
+
+    def test_summary_reads_one_row_per_room(self):
+        generate_seating_for_date(EXAM_DATE, 18, 999, "MC101")
+        with self.assertNumQueries(2):   # version + summary rows
+            self.client.get(f"/api/seating/summary/{EXAM_DATE}/")
+
+    def test_timetable_overview(self):
+        generate_seating_for_date(EXAM_DATE, 18, 999, "MC101")
+
+        data = self.client.get("/api/seating/summary/").json()
+
+        self.assertEqual([d["generated"] for d in data["dates"]], [True, False])
+        self.assertEqual(data["dates"][0]["students"], 25)
+        self.assertEqual(data["dates"][1]["seats"], 0)
+        self.assertEqual(data["totals"]["generated"], 1)
+        later = self.client.get("/api/seating/summary/", {"from": EXAM_DATE + datetime.timedelta(days=1)})
+        self.assertEqual(len(later.json()["dates"]), 1)
+        self.assertEqual(self.client.get("/api/seating/summary/", {"to": "nope"}).status_code, 400)
@@ -1,20 +1,49 @@
 from django.urls import path
+from . import async_views
 from .views import (
     UploadStudentsView,
     UploadTimetableView,
     GenerateSeatingView,
+    GenerateSeatingBatchView,
     RoomsForDateView,
     ViewSeatingView,
     ViewSeatingGroupedView,
     DownloadSeatingExcelView,
+    FindSeatView,
+    JobStatusView,
+    SeatingCacheStatsView,
+    SeatingMetricsView,
+    SeatingSummaryView,
+    SeatingOverviewView,
+    HealthView,
+    ExamCalendarView,
+    RoomSheetsView,
+    TimetableRoomSheetsView,
 )
 
 urlpatterns = [
     path("upload/students/", UploadStudentsView.as_view()),
     path("upload/timetable/", UploadTimetableView.as_view()),
     path("generate/", GenerateSeatingView.as_view()),
+    path("generate/batch/", GenerateSeatingBatchView.as_view()),
     path("rooms/<date>/", RoomsForDateView.as_view()),
     path("view/<date>/", ViewSeatingView.as_view()),
     path("view_grouped/<date>/", ViewSeatingGroupedView.as_view()),
     path("download/<date>/", DownloadSeatingExcelView.as_view()),
+    path("sheets/", TimetableRoomSheetsView.as_view()),
+    path("sheets/<date>/", RoomSheetsView.as_view()),
+    path("summary/", SeatingOverviewView.as_view()),
+    path("summary/<date>/", SeatingSummaryView.as_view()),
+    path("calendar/", ExamCalendarView.as_view()),
+    path("jobs/<int:pk>/", JobStatusView.as_view()),
+    path("find/<str:roll>/", FindSeatView.as_view()),
+    path("cache/stats/", SeatingCacheStatsView.as_view()),
+    path("metrics/", SeatingMetricsView.as_view()),
+    path("health/", HealthView.as_view()),
+
+    # async read endpoints (serve these from an ASGI worker, see seatingbackend/asgi.py)
+    path("async/rooms/<date>/", async_views.rooms_for_date),
+    path("async/view/<date>/", async_views.view_seating),
+    path("async/view_grouped/<date>/", async_views.view_seating_grouped),
+    path("async/find/<str:roll>/", async_views.find_seat),
 ]
@@ -1,13 +1,48 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions
-from django.shortcuts import render
-from django.db.models import Max
-import pandas as pd
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.db import DatabaseError, connection
+import base64
 import datetime
-
-from .models import UploadedFile, Student, TimetableRow, Seating, Room
-from .services.seating_generator import parse_rolls_from_dataframe, generate_seating_for_date
+from urllib.parse import urlencode
+
+from .models import UploadedFile, Job
+from .services.allocators import get_allocator
+from .services.exam_calendar import SESSION_ORDER, exam_calendar
+from .services.seating_generator import generate_seating_for_date, generate_seating_batch, timetable_dates
+from .services.student_import import import_students, guess_year
+from .services.timetable_import import import_timetable
+from .services.jobs import enqueue, job_status
+from .services.metrics import METRICS
+from .services.excel_export import get_seating_export
+from .services.response_cache import cached_json_response, cache_stats
+from .services.room_sheets import get_room_sheets, parse_formats, stream_archives
+from .services.seat_lookup import find_seats
+from .services.spreadsheet import iter_rolls
+from .services.uploads import store_upload, upload_digest, upload_rows, record_result
+from .services.storage import room_codes, room_grids, seat_tuples
+from .services.summary import date_summary, timetable_overview
+
+
+def wants_async(request):
+    """?async=1 (or async=true in the body) queues the work as a Job."""
+    value = request.query_params.get("async", request.data.get("async", ""))
+    return str(value).lower() in ("1", "true", "yes")
+
+
+def duplicate_info(uf, duplicate, previous):
+    """Extra response fields when an upload matched an earlier identical file."""
+    if not duplicate:
+        return {}
+    return {"duplicate_of": uf.pk, "previous_result": previous}
+
+
+def job_accepted(job):
+    return Response(
+        {"job_id": job.pk, "status": job.status, "status_url": f"/api/seating/jobs/{job.pk}/"},
+        status=202,
+    )
 
 
 # ---------------------- UPLOAD STUDENTS ----------------------
@@ -21,24 +56,19 @@ class UploadStudentsView(APIView):
         if not f:
             return Response({"detail": "No file"}, status=400)
 
-        uf = UploadedFile.objects.create(file=f)
-
-        df = pd.read_excel(f)
-        rolls = parse_rolls_from_dataframe(df)
+        uf, duplicate = store_upload(f, upload_digest(request, f), UploadedFile.STUDENTS)
 
         if year is None:
-            name = f.name.lower()
-            if 'iii' in name or '3' in name:
-                year = 3
-            elif 'ii' in name or '2' in name:
-                year = 2
-            else:
-                year = 1
+            year = guess_year(f.name)
+
+        if wants_async(request):
+            return job_accepted(enqueue(Job.UPLOAD_STUDENTS, {"uploaded_file": uf.pk, "year": year}))
 
-        for r in rolls:
-            Student.objects.get_or_create(roll=str(r), year=year, defaults={'uploaded_file': uf})
+        previous = uf.result
+        counts = import_students(iter_rolls(upload_rows(uf)), year, uploaded_file=uf)
+        record_result(uf, counts)
 
-        return Response({"created": len(rolls)})
+        return Response({"created": counts["inserted"], **counts, **duplicate_info(uf, duplicate, previous)})
 
 
 # ---------------------- UPLOAD TIMETABLE ----------------------
@@ -50,20 +80,21 @@ class UploadTimetableView(APIView):
         if not f:
             return Response({"detail": "No file"}, status=400)
 
-        df = pd.read_excel(f)
-        df["DATE"] = pd.to_datetime(df["DATE"]).dt.date
+        uf, duplicate = store_upload(
+            f, upload_digest(request, f), UploadedFile.TIMETABLE, description="timetable"
+        )
+
+        if wants_async(request):
+            return job_accepted(enqueue(Job.UPLOAD_TIMETABLE, {"uploaded_file": uf.pk}))
 
-        for _, row in df.iterrows():
-            TimetableRow.objects.update_or_create(
-                date=row["DATE"],
-                defaults={
-                    "i_year_subject": row.get("I YEAR SUBJECT", ""),
-                    "ii_year_subject": row.get("II YEAR SUBJECT", ""),
-                    "iii_year_subject": row.get("III YEAR SUBJECT", "")
-                }
-            )
+        previous = uf.result
+        try:
+            count = import_timetable(upload_rows(uf))
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+        record_result(uf, {"rows": count})
 
-        return Response({"rows": len(df)})
+        return Response({"rows": count, **duplicate_info(uf, duplicate, previous)})
 
 
 # ---------------------- GENERATE SEATING ----------------------
@@ -75,11 +106,237 @@ class GenerateSeatingView(APIView):
         capacity = int(request.data.get('capacity', 90))
         rooms = int(request.data.get('rooms', 0))
         start = request.data.get('start', 'MC101')
+        strategy = request.data.get('strategy', 'cyclic')
+        inventory = str(request.data.get('inventory', '')).lower() in ("1", "true", "yes")
+        session = request.data.get('session') or None
+        if session not in (None, *SESSION_ORDER):
+            return invalid_session()
+
+        exam_date = parse_exam_date(date)
+        if exam_date is None:
+            return Response({"detail": "Invalid date"}, status=400)
+        try:
+            get_allocator(strategy)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+        if wants_async(request):
+            payload = {"date": exam_date.isoformat(), "capacity": capacity, "rooms": rooms, "start": start,
+                       "strategy": strategy, "inventory": inventory, "session": session}
+            return job_accepted(enqueue(Job.GENERATE_SEATING, payload))
+
+        try:
+            counts = generate_seating_for_date(exam_date, capacity, rooms or 999, start,
+                                               strategy=strategy, inventory=inventory, session=session)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+        return Response({"created_entries": counts["seats"], **counts})
+
+
+# ---------------------- GENERATE SEATING (MANY DATES) ----------------------
+class GenerateSeatingBatchView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, format=None):
+        capacity = int(request.data.get('capacity', 90))
+        rooms = int(request.data.get('rooms', 0))
+        start = request.data.get('start', 'MC101')
+        strategy = request.data.get('strategy', 'cyclic')
+        inventory = str(request.data.get('inventory', '')).lower() in ("1", "true", "yes")
+        session = request.data.get('session') or None
+        if session not in (None, *SESSION_ORDER):
+            return invalid_session()
+        try:
+            get_allocator(strategy)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+        dates = None
+        if str(request.data.get('all', '')).lower() not in ("1", "true", "yes"):
+            bounds = date_range(request.data)
+            if isinstance(bounds, Response):
+                return bounds
+            if bounds == (None, None):
+                return Response({"detail": "Pass all=true or a from/to date range"}, status=400)
+            dates = timetable_dates(*bounds)
+
+        if wants_async(request):
+            payload = {
+                "dates": [d.isoformat() for d in dates] if dates is not None else None,
+                "capacity": capacity, "rooms": rooms, "start": start, "strategy": strategy,
+                "inventory": inventory, "session": session,
+            }
+            return job_accepted(enqueue(Job.GENERATE_BATCH, payload))
+
+        results = generate_seating_batch(dates, capacity, rooms or 999, start, strategy=strategy,
+                                         inventory=inventory, session=session)
+        return Response({"dates": results})
+
 
-        exam_date = datetime.date.fromisoformat(date)
-        created = generate_seating_for_date(exam_date, capacity, rooms or 999, start)
+# ---------------------- JOB STATUS ----------------------
+class JobStatusView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
 
-        return Response({"created_entries": len(created)})
+    def get(self, request, pk, format=None):
+        job = Job.objects.filter(pk=pk).first()
+        if job is None:
+            return Response({"detail": "Not found"}, status=404)
+        return Response(job_status(job))
+
+
+def parse_exam_date(date):
+    try:
+        return datetime.date.fromisoformat(date)
+    except (TypeError, ValueError):
+        return None
+
+
+def invalid_session():
+    return Response({"detail": f"session must be one of: {', '.join(SESSION_ORDER)}"}, status=400)
+
+
+def seating_key(date, params):
+    """
+    (exam_date, session) of the stored seating a read endpoint serves: the
+    URL's date and ?session=FN/AN, or "" (the whole day's seating) when no
+    session is given; a 400 Response instead if either does not parse.
+    """
+    exam_date = parse_exam_date(date)
+    if exam_date is None:
+        return Response({"detail": "Invalid date"}, status=400)
+    session = params.get("session") or ""
+    if session not in ("", *SESSION_ORDER):
+        return invalid_session()
+    return exam_date, session
+
+
+def date_range(params):
+    """
+    (from, to) exam dates from params, None where not given; a 400
+    Response instead if a given bound does not parse.
+    """
+    bounds = []
+    for name in ("from", "to"):
+        value = params.get(name)
+        bounds.append(parse_exam_date(str(value)) if value else None)
+        if value and bounds[-1] is None:
+            return Response({"detail": "Invalid date"}, status=400)
+    return tuple(bounds)
+
+
+SEAT_FIELDS = ("room", "row", "col", "roll")
+LAYOUTS = ("flat", "columnar")
+MAX_PAGE_ROOMS = 200
+
+
+def flat_seating(date, rooms=None, fields=SEAT_FIELDS, empty=True, session=""):
+    """One {"room", "row", "col", "roll"} per seat, keeping only fields; empty=False drops empty seats."""
+    if fields == SEAT_FIELDS and empty:
+        return [
+            {"room": room, "row": row, "col": col, "roll": roll}
+            for room, row, col, roll in seat_tuples(date, rooms, session)
+        ]
+    picks = [(name, SEAT_FIELDS.index(name)) for name in fields]
+    return [
+        {name: seat[i] for name, i in picks}
+        for seat in seat_tuples(date, rooms, session)
+        if empty or seat[3]
+    ]
+
+
+def columnar_seating(date, rooms=None, session=""):
+    """{room: {"columns", "rolls"}} with every seat's roll row-major, "" for empty seats."""
+    return {
+        code: {"columns": len(grid[0]) if grid else 0, "rolls": [roll for row in grid for roll in row]}
+        for code, grid in room_grids(date, rooms, session)
+    }
+
+
+def encode_cursor(room_code):
+    return base64.urlsafe_b64encode(room_code.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        return base64.b64decode(cursor + "=" * (-len(cursor) % 4), altchars=b"-_", validate=True).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def seating_options(params):
+    """
+    Read ViewSeatingView's query parameters; raises ValueError with the
+    message for a 400 on bad values.
+    """
+    layout = params.get("layout", "flat")
+    if layout not in LAYOUTS:
+        raise ValueError(f"layout must be one of: {', '.join(LAYOUTS)}")
+    fields = SEAT_FIELDS
+    if params.get("fields"):
+        fields = tuple(f.strip() for f in params["fields"].split(",") if f.strip())
+        unknown = [f for f in fields if f not in SEAT_FIELDS]
+        if unknown or not fields:
+            raise ValueError(f"fields must be a comma-separated subset of: {', '.join(SEAT_FIELDS)}")
+    limit = None
+    if params.get("limit"):
+        try:
+            limit = int(params["limit"])
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_PAGE_ROOMS:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_ROOMS} rooms")
+    cursor = decode_cursor(params["cursor"]) if params.get("cursor") else None
+    return {
+        "layout": layout,
+        "fields": fields,
+        "empty": str(params.get("empty", "1")).lower() not in ("0", "false", "no"),
+        "limit": limit,
+        "cursor": cursor,
+    }
+
+
+def page_url(request, options, cursor, session=""):
+    """
+    URL of another page with the same options, built from the parsed
+    options and session alone (the cache key's inputs), not the request's
+    query string.
+    """
+    params = {}
+    if session:
+        params["session"] = session
+    if options["layout"] != "flat":
+        params["layout"] = options["layout"]
+    if options["fields"] != SEAT_FIELDS:
+        params["fields"] = ",".join(options["fields"])
+    if not options["empty"]:
+        params["empty"] = "0"
+    if options["limit"] is not None:
+        params["limit"] = options["limit"]
+    params["cursor"] = encode_cursor(cursor)
+    return f"{request.path}?{urlencode(params)}"
+
+
+def seating_page(request, exam_date, options, session=""):
+    """Body for ViewSeatingView: the whole seating, or one cursor page of rooms."""
+    def body(rooms=None):
+        if options["layout"] == "columnar":
+            return columnar_seating(exam_date, rooms, session)
+        return flat_seating(exam_date, rooms, options["fields"], options["empty"], session)
+
+    if options["limit"] is None and options["cursor"] is None:
+        return body()
+    limit = options["limit"] or MAX_PAGE_ROOMS
+    rooms = room_codes(exam_date, after=options["cursor"], limit=limit + 1, session=session)
+    next_url = None
+    if len(rooms) > limit:
+        rooms = rooms[:limit]
+        next_url = page_url(request, options, rooms[-1], session)
+    return {"results": body(rooms), "next": next_url}
+
+
+def grouped_seating(date, session=""):
+    return dict(room_grids(date, session=session))
 
 
 # ---------------------- ROOMS FOR DATE ----------------------
@@ -87,59 +344,160 @@ class RoomsForDateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, date, format=None):
-        rooms = (
-            Seating.objects.filter(exam_date=date)
-            .values_list("room__code", flat=True)
-            .distinct()
+        key = seating_key(date, request.query_params)
+        if isinstance(key, Response):
+            return key
+        exam_date, session = key
+        return cached_json_response(
+            request, "rooms", exam_date, lambda: room_codes(exam_date, session=session), session
         )
-        return Response(list(rooms))
 
 
 # ---------------------- VIEW SEATING (FLAT LIST) ----------------------
 class ViewSeatingView(APIView):
+    """
+    Every seat of the date. Optional query parameters:
+    session=FN|AN      that session's seating (default: the whole day's)
+    fields=room,roll   only these keys per seat
+    empty=0            leave out empty seats
+    layout=columnar    {room: {"columns", "rolls"}}, rolls row-major
+    limit=N, cursor=   N rooms per page as {"results", "next"}
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, date, format=None):
-        qs = Seating.objects.filter(exam_date=date).order_by(
-            "room__code", "row_index", "col_index"
+        key = seating_key(date, request.query_params)
+        if isinstance(key, Response):
+            return key
+        exam_date, session = key
+        try:
+            options = seating_options(request.query_params)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+        kind = "flat"
+        if options != seating_options({}):
+            kind = "flat:" + ":".join([
+                options["layout"], ",".join(options["fields"]), str(int(options["empty"])),
+                str(options["limit"] or ""), encode_cursor(options["cursor"] or ""),
+            ])
+        return cached_json_response(
+            request, kind, exam_date, lambda: seating_page(request, exam_date, options, session), session
         )
 
-        data = [
-            {
-                "room": seat.room.code,
-                "row": seat.row_index,
-                "col": seat.col_index,
-                "roll": seat.roll,
-            }
-            for seat in qs
-        ]
-
-        return Response(data)
-
 
 # ---------------------- VIEW SEATING GROUPED (TABLE FORMAT) ----------------------
 class ViewSeatingGroupedView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, date, format=None):
-        qs = Seating.objects.filter(exam_date=date).order_by(
-            "room__code", "row_index", "col_index"
+        key = seating_key(date, request.query_params)
+        if isinstance(key, Response):
+            return key
+        exam_date, session = key
+        return cached_json_response(
+            request, "grouped", exam_date, lambda: grouped_seating(exam_date, session), session
         )
 
-        grouped = {}
 
-        for seat in qs:
-            room_code = seat.room.code
+# ---------------------- SEATING SUMMARY ----------------------
+class SeatingSummaryView(APIView):
+    """Students, empty seats and students per year in each room, from SeatingSummary."""
+    permission_classes = [permissions.IsAuthenticated]
 
-            if room_code not in grouped:
-                grouped[room_code] = []
+    def get(self, request, date, format=None):
+        key = seating_key(date, request.query_params)
+        if isinstance(key, Response):
+            return key
+        exam_date, session = key
+        return cached_json_response(
+            request, "summary", exam_date, lambda: date_summary(exam_date, session), session
+        )
+
+
+# ---------------------- TIMETABLE OVERVIEW ----------------------
+class SeatingOverviewView(APIView):
+    """Summary totals for every timetable date (?from= / ?to= to narrow)."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, format=None):
+        bounds = date_range(request.query_params)
+        if isinstance(bounds, Response):
+            return bounds
+        return Response(timetable_overview(*bounds))
 
-            while len(grouped[room_code]) <= seat.row_index:
-                grouped[room_code].append(["" for _ in range(9)])  # 9 columns fixed
 
-            grouped[room_code][seat.row_index][seat.col_index] = seat.roll
+# ---------------------- EXAM CALENDAR ----------------------
+class ExamCalendarView(APIView):
+    """Which years sit which session on each timetable date (?from= / ?to= to narrow)."""
+    permission_classes = [permissions.IsAuthenticated]
 
-        return Response(grouped)
+    def get(self, request, format=None):
+        bounds = date_range(request.query_params)
+        if isinstance(bounds, Response):
+            return bounds
+        return Response(exam_calendar(*bounds))
+
+
+# ---------------------- FIND SEAT BY ROLL ----------------------
+class FindSeatView(APIView):
+    """Seats of a roll; ?date= (and ?session=FN|AN) picks the seat to return."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, roll, format=None):
+        roll = roll.strip()
+        if not roll:
+            return Response({"detail": "No seating found for this roll"}, status=404)
+        exam_date = None
+        if request.query_params.get("date"):
+            exam_date = parse_exam_date(request.query_params["date"])
+            if exam_date is None:
+                return Response({"detail": "Invalid date"}, status=400)
+        session = request.query_params.get("session") or None
+        if session not in (None, *SESSION_ORDER):
+            return invalid_session()
+
+        result = find_seats(roll, exam_date, session=session)
+        if result["seat"] is None and not result["upcoming"]:
+            return Response({"detail": "No seating found for this roll"}, status=404)
+        return Response(result)
+
+
+# ---------------------- CACHE STATS ----------------------
+class SeatingCacheStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, format=None):
+        return Response(cache_stats())
+
+
+# ---------------------- HEALTH ----------------------
+class HealthView(APIView):
+    """Liveness/readiness probe for the load balancer: 200 when the database answers."""
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def get(self, request, format=None):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except DatabaseError as e:
+            return Response({"status": "unavailable", "detail": type(e).__name__}, status=503)
+        return Response({"status": "ok"})
+
+
+# ---------------------- METRICS ----------------------
+class SeatingMetricsView(APIView):
+    """Request metrics of this worker process, Prometheus text format."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, format=None):
+        stats = cache_stats()
+        body = METRICS.render(extra=[
+            ("seating_cache_hits_total", "counter", "Seating response cache hits.", stats["hits"]),
+            ("seating_cache_misses_total", "counter", "Seating response cache misses.", stats["misses"]),
+        ])
+        return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 # ---------------------- DOWNLOAD EXCEL ----------------------
@@ -147,4 +505,80 @@ class DownloadSeatingExcelView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, date, format=None):
-        return Response({"detail": "Not implemented"})
+        key = seating_key(date, request.query_params)
+        if isinstance(key, Response):
+            return key
+        exam_date, session = key
+
+        path = get_seating_export(exam_date, session)
+        if path is None:
+            return Response({"detail": "No seating for this date"}, status=404)
+
+        return FileResponse(
+            open(path, "rb"),
+            as_attachment=True,
+            filename=f"seating_{exam_date}{'_' + session if session else ''}.xlsx",
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+
+
+# ---------------------- ROOM SHEETS ----------------------
+def sheets_name(exam_date, session):
+    return f"room_sheets_{exam_date}{'_' + session if session else ''}.zip"
+
+
+class RoomSheetsView(APIView):
+    """
+    Printable sheets of every room on a date, as a ZIP (?formats=html,xlsx;
+    default both). ?session=FN|AN for that session's seating.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, date, format=None):
+        key = seating_key(date, request.query_params)
+        if isinstance(key, Response):
+            return key
+        exam_date, session = key
+        try:
+            formats = parse_formats(request.query_params.get("formats"))
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+        archives = get_room_sheets([exam_date], formats, session=session)
+        if not archives:
+            return Response({"detail": "No seating for this date"}, status=404)
+
+        return FileResponse(open(archives[0][1], "rb"), as_attachment=True,
+                            filename=sheets_name(exam_date, session), content_type="application/zip")
+
+
+class TimetableRoomSheetsView(APIView):
+    """
+    Room sheets of every seated timetable date (?from= / ?to= to narrow,
+    ?session=FN|AN for that session's seating), streamed as a ZIP of
+    per-date ZIPs.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, format=None):
+        bounds = date_range(request.query_params)
+        if isinstance(bounds, Response):
+            return bounds
+        session = request.query_params.get("session") or ""
+        if session not in ("", *SESSION_ORDER):
+            return invalid_session()
+        try:
+            formats = parse_formats(request.query_params.get("formats"))
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+        archives = get_room_sheets(timetable_dates(*bounds), formats, session=session)
+        if not archives:
+            return Response({"detail": "No seating for these dates"}, status=404)
+
+        response = StreamingHttpResponse(
+            stream_archives((sheets_name(d, session), path) for d, path in archives),
+            content_type="application/zip",
+        )
+        response["Content-Disposition"] = 'attachment; filename="room_sheets.zip"'
+        return response
@@ -2,6 +2,12 @@
 ASGI config for seatingbackend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with uvicorn workers under gunicorn, e.g.
+
+    gunicorn seatingbackend.asgi:application -k uvicorn_worker.UvicornWorker -w 2
+
+or ``uvicorn seatingbackend.asgi:application`` for a single process. The
+async read endpoints live under /api/seating/async/ (seating/async_views.py).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -57,6 +57,19 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-view latency / query / size metrics, served at /api/seating/metrics/.
+# Set SEATING_METRICS=0 to switch off.
+if os.environ.get("SEATING_METRICS", "1") != "0":
+    MIDDLEWARE.insert(0, "seating.middleware.MetricsMiddleware")
+
+# Import numpy/openpyxl at startup instead of on first use. Only worth it
+# with `gunicorn --preload`, where workers then share those pages with the
+# master; otherwise every worker pays for them whether it needs them or not.
+SEATING_PRELOAD_IMPORTS = os.environ.get("SEATING_PRELOAD_IMPORTS") == "1"
+
+# Requests slower than this are logged to "seating.slow" with their top SQL.
+SEATING_SLOW_REQUEST_MS = int(os.environ.get("SEATING_SLOW_REQUEST_MS", "1000"))
+
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
 
@@ -84,21 +97,62 @@ WSGI_APPLICATION = 'seatingbackend.wsgi.application'
 
 # -------------------------------------------------------
 # DATABASE (Railway PostgreSQL)
+# DB_CONN_MAX_AGE       seconds to keep a connection open for the next
+#                       request (default 60; 0 = close after each request)
+# DB_CONN_HEALTH_CHECKS check a reused connection before each request (default 1)
 # -------------------------------------------------------
 DATABASE_URL = os.environ.get("DATABASE_URL")
+DB_CONN_MAX_AGE = int(os.environ.get("DB_CONN_MAX_AGE", "60"))
+DB_CONN_HEALTH_CHECKS = os.environ.get("DB_CONN_HEALTH_CHECKS", "1") == "1"
 
 if DATABASE_URL:
     DATABASES = {
-        'default': dj_database_url.parse(DATABASE_URL)
+        'default': dj_database_url.parse(
+            DATABASE_URL, conn_max_age=DB_CONN_MAX_AGE, conn_health_checks=DB_CONN_HEALTH_CHECKS,
+        )
     }
 else:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": DB_CONN_HEALTH_CHECKS,
         }
     }
 
+# -------------------------------------------------------
+# SEATING STORAGE
+# "seat": one Seating row per seat (default)
+# "grid": one RoomSeating record per (exam_date, room) + SeatAssignment
+# Convert existing data with `manage.py convert_seating_storage`.
+# -------------------------------------------------------
+SEATING_STORAGE = os.environ.get("SEATING_STORAGE", "seat")
+
+# -------------------------------------------------------
+# CACHE (seating read endpoints)
+# SEATING_CACHE=file stores responses on disk in SEATING_CACHE_DIR,
+# shared by every worker on the host; default is per-process memory.
+# -------------------------------------------------------
+if os.environ.get("SEATING_CACHE") == "file":
+    SEATING_CACHE = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("SEATING_CACHE_DIR", os.path.join(BASE_DIR, ".cache", "seating")),
+    }
+else:
+    SEATING_CACHE = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "seating",
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    }
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "seating": SEATING_CACHE,
+}
+
 # -------------------------------------------------------
 # STATIC & MEDIA
 # -------------------------------------------------------
@@ -108,6 +162,13 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# hash uploads while they stream in, for duplicate detection (seating/services/uploads.py)
+FILE_UPLOAD_HANDLERS = [
+    "seating.services.uploads.HashingUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # -------------------------------------------------------
@@ -2,6 +2,13 @@
 WSGI config for seatingbackend project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
+The URLconf (and with it the views and services) is imported here rather
+than on the first request, so with ``gunicorn --preload`` it is loaded
+once in the master and shared by the forked workers:
+
+    SEATING_PRELOAD_IMPORTS=1 gunicorn seatingbackend.wsgi:application --preload -w 3
+
+`manage.py benchmark_startup` measures import time and per-worker memory.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
@@ -10,7 +17,9 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 import os
 
 from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'seatingbackend.settings')
 
 application = get_wsgi_application()
+get_resolver().url_patterns   # import views now, see above